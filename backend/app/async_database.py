@@ -0,0 +1,129 @@
+"""
+Async Supabase access for request handlers.
+
+The sync client from `database.get_supabase()` blocks the event loop on every
+PostgREST round-trip. Handlers that take `get_async_supabase` as a dependency
+instead share one pooled HTTP/2 connection per process and `await` queries,
+so a slow query only stalls its own request.
+
+Usage:
+    async def endpoint(db: Annotated[AsyncDatabase, Depends(get_async_supabase)]):
+        result = await db.table("businesses").select("*").eq("id", x).execute()
+"""
+
+import asyncio
+
+import httpx
+from supabase import AsyncClient, acreate_client
+from supabase.lib.client_options import AsyncClientOptions
+
+from .config import get_settings
+
+
+class QueryTimeoutError(TimeoutError):
+    """A database query did not finish within its timeout."""
+
+
+class _TimedQuery:
+    """
+    Wraps a postgrest async request builder.
+
+    Builder methods (select, eq, order, not_, ...) pass through and keep the
+    wrapper, so the surface is the same as the plain client. `execute()` is
+    bounded by the per-request timeout.
+    """
+
+    def __init__(self, builder, timeout: float):
+        self._builder = builder
+        self._timeout = timeout
+
+    def _wrap(self, value):
+        if hasattr(value, "execute"):
+            return _TimedQuery(value, self._timeout)
+        return value
+
+    def __getattr__(self, name: str):
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return self._wrap(attr)
+
+        def call(*args, **kwargs):
+            return self._wrap(attr(*args, **kwargs))
+
+        return call
+
+    async def execute(self, timeout: float | None = None):
+        """Run the query, raising QueryTimeoutError after `timeout` seconds."""
+        limit = timeout if timeout is not None else self._timeout
+        try:
+            return await asyncio.wait_for(self._builder.execute(), limit)
+        except asyncio.TimeoutError:
+            raise QueryTimeoutError(f"Database query exceeded {limit:.1f}s")
+
+
+class AsyncDatabase:
+    """Drop-in async counterpart of the supabase client's table()/rpc() surface."""
+
+    def __init__(self, client: AsyncClient, timeout: float):
+        self.client = client
+        self.timeout = timeout
+
+    def table(self, table_name: str) -> _TimedQuery:
+        return _TimedQuery(self.client.table(table_name), self.timeout)
+
+    def rpc(self, fn: str, params: dict | None = None, **kwargs) -> _TimedQuery:
+        return _TimedQuery(self.client.rpc(fn, params or {}, **kwargs), self.timeout)
+
+    @property
+    def storage(self):
+        return self.client.storage
+
+
+_http_client: httpx.AsyncClient | None = None
+_database: AsyncDatabase | None = None
+_init_lock = asyncio.Lock()
+
+
+def _create_http_client() -> httpx.AsyncClient:
+    """Shared keep-alive HTTP/2 pool used by every async query in this process."""
+    settings = get_settings()
+    return httpx.AsyncClient(
+        http2=True,
+        follow_redirects=True,
+        limits=httpx.Limits(
+            max_connections=settings.db_pool_max_connections,
+            max_keepalive_connections=settings.db_pool_max_keepalive,
+        ),
+        timeout=httpx.Timeout(settings.db_request_timeout, connect=5.0),
+    )
+
+
+async def get_async_supabase() -> AsyncDatabase:
+    """Get the process-wide async Supabase client (FastAPI dependency)."""
+    global _http_client, _database
+
+    if _database is not None:
+        return _database
+
+    async with _init_lock:
+        if _database is None:
+            settings = get_settings()
+            _http_client = _create_http_client()
+            client = await acreate_client(
+                settings.supabase_url,
+                settings.supabase_service_role_key,
+                options=AsyncClientOptions(httpx_client=_http_client),
+            )
+            _database = AsyncDatabase(client, settings.db_request_timeout)
+
+    return _database
+
+
+async def close_async_supabase() -> None:
+    """Close the shared connection pool (called on app shutdown)."""
+    global _http_client, _database
+
+    if _http_client is not None:
+        await _http_client.aclose()
+    _http_client = None
+    _database = None
@@ -1,3 +1,6 @@
+import os
+from typing import Literal
+
 from pydantic_settings import BaseSettings
 from functools import lru_cache
 
@@ -11,6 +14,21 @@ class Settings(BaseSettings):
     jwt_secret_key: str
     jwt_algorithm: str = "HS256"
     access_token_expire_minutes: int = 60
+    user_cache_ttl_seconds: float = 30.0  # auth user-context cache, 0 disables
+    seller_cache_ttl: float = 60.0  # seller name lookup cache (seconds)
+
+    # Async database pool (see app/async_database.py)
+    db_pool_max_connections: int = 100
+    db_pool_max_keepalive: int = 20
+    db_request_timeout: float = 10.0  # seconds per query
+
+    # Invoice PDF rendering pool (see app/services/pdf_executor.py)
+    pdf_workers: int = min(4, os.cpu_count() or 1)  # 0 = render in a thread
+    pdf_max_queue: int = 32  # renders queued or running at once
+    pdf_queue_timeout: float = 10.0  # seconds to wait for a queue slot
+    pdf_upload_concurrency: int = 8  # batch invoice PDFs: storage uploads at once
+    pdf_qr_format: Literal["png", "svg"] = "png"  # payment QR code image
+    pdf_qr_cache_size: int = 1024  # encoded QR codes kept per process
 
     # CORS
     cors_origins: str = (
@@ -1,3 +1,4 @@
+import time
 from datetime import datetime, timedelta, timezone
 from typing import Annotated
 
@@ -9,6 +10,7 @@ from passlib.context import CryptContext
 from .config import get_settings, Settings
 from .database import get_supabase
 from .schemas.auth import TokenData, User, UserInDB
+from .services.sellers import invalidate_seller_cache
 
 # Password hashing context
 pwd_context = CryptContext(
@@ -18,6 +20,9 @@ pwd_context = CryptContext(
 # OAuth2 scheme
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
+# Authenticated user context: user_id -> (expires_at, User)
+_user_cache: dict[str, tuple[float, User]] = {}
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against its hash."""
@@ -137,6 +142,42 @@ async def get_user_by_id(user_id: str) -> User | None:
     )
 
 
+async def get_cached_user(user_id: str, ttl: float) -> User | None:
+    """
+    Get user by ID, serving repeated lookups from the user-context cache.
+
+    Args:
+        user_id: Seller ID from the token
+        ttl: Cache lifetime in seconds (0 disables caching)
+
+    Returns:
+        User or None if the user does not exist
+    """
+    if ttl > 0:
+        entry = _user_cache.get(user_id)
+        if entry and entry[0] > time.monotonic():
+            return entry[1].model_copy()
+
+    user = await get_user_by_id(user_id)
+    if user is not None and ttl > 0:
+        _user_cache[user_id] = (time.monotonic() + ttl, user.model_copy())
+    return user
+
+
+def invalidate_user_cache(user_id: str | None = None) -> None:
+    """
+    Drop cached data for a seller after its row in `sellers` changed.
+
+    Clears both the auth user context and the cached display name, so the
+    next request sees the update. user_id=None clears everything.
+    """
+    if user_id is None:
+        _user_cache.clear()
+    else:
+        _user_cache.pop(user_id, None)
+    invalidate_seller_cache(user_id)
+
+
 async def authenticate_user(username: str, password: str) -> UserInDB | None:
     """Authenticate a user with username and password."""
     user = await get_user_by_username(username)
@@ -181,7 +222,7 @@ async def get_current_user(
     except JWTError:
         raise credentials_exception
 
-    user = await get_user_by_id(token_data.user_id)
+    user = await get_cached_user(token_data.user_id, settings.user_cache_ttl_seconds)
     if user is None:
         raise credentials_exception
 
@@ -1,17 +1,52 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
+from .async_database import QueryTimeoutError, close_async_supabase
 from .config import get_settings
 from .routers import auth, admin, crm, upload, website, web_project, preview, feedback
+from .services.browser_pool import close_browser_pool
+from .services.pdf_executor import PdfRenderQueueFull, close_pdf_executor
+from .services.vercel_client import close_vercel_client
 
 settings = get_settings()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await close_async_supabase()
+    await close_vercel_client()
+    await close_pdf_executor()
+    await close_browser_pool()
+
+
 app = FastAPI(
     title="Webomat API",
     description="CRM & Business Discovery System API",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
+
+@app.exception_handler(QueryTimeoutError)
+async def query_timeout_handler(request: Request, exc: QueryTimeoutError):
+    return JSONResponse(
+        status_code=504, content={"detail": "Databáze neodpověděla včas"}
+    )
+
+
+@app.exception_handler(PdfRenderQueueFull)
+async def pdf_queue_full_handler(request: Request, exc: PdfRenderQueueFull):
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Generování PDF je přetížené, zkuste to prosím za chvíli"},
+        headers={"Retry-After": "5"},
+    )
+
+
 # CORS middleware
 app.add_middleware(
     CORSMiddleware,
@@ -3,8 +3,10 @@ Account endpoints for balance and transactions.
 Extended for better dashboard functionality.
 """
 
+from datetime import datetime, timedelta
 from typing import Annotated
-from fastapi import APIRouter, Query, HTTPException
+from fastapi import APIRouter, Depends, Query, HTTPException
+from fastapi.responses import StreamingResponse
 from ..database import get_supabase
 from ..dependencies import get_current_active_user, require_sales_or_admin
 from ..schemas.crm import (
@@ -18,6 +20,8 @@ from ..schemas.crm import (
     ProjectUpdate,
     ProjectResponse,
 )
+from ..schemas.auth import User
+from ..services.ledger_export import iter_ledger_csv
 from ..utils.balance_calculator import calculate_seller_balance
 
 router = APIRouter(prefix="/account", tags=["Account"])
@@ -137,63 +141,32 @@ async def get_transactions(
 
 @router.post("/export/csv")
 async def export_transactions_csv(
-    current_user: Annotated[dict, Depends(get_current_active_user)],
+    current_user: Annotated[User, Depends(get_current_active_user)],
     range: str = Query("3m"),
     format_type: str = Query("daily", description="Format: daily, monthly, yearly"),
 ):
     """
     Export transactions to CSV for accounting purposes.
+
+    Rows are streamed oldest first; admins get reference columns and the
+    running balance.
     """
-    from fastapi.responses import Response
-    import csv
-    from io import StringIO
-    
     supabase = get_supabase()
-    
-    # Get transactions based on format and range
-    if range == "3m":
-        ledger_query = supabase.table("ledger_entries").select("*").gte("created_at", "now", "interval", "-3 months")
-    elif range == "6m":
-        ledger_query = supabase.table("ledger_entries").select("*").gte("created_at", "now", "interval", "-6 months")
-    elif range == "12m":
-        ledger_query = supabase.table("ledger_entries").select("*").gte("created_at", "now", "interval", "-12 months")
-    
-    ledger_query = ledger_query.eq("seller_id", current_user["id"]).order("created_at", desc=True)
-    result = ledger_query.execute()
-    
-    # Generate CSV
-    output = StringIO()
-    writer = csv.writer(output)
-    
-    # CSV headers
-    if current_user.get("role") == "admin":
-        writer.writerow(["Datum", "Typ", "Popis", "Částka", "ID faktury", "ID projektu", "Zůstatek"])
-    else:
-        writer.writerow(["Datum", "Typ", "Popis", "Částka", "Zůstatek"])
-    
-    # Data rows
-    for entry in result.data or []:
-        row = [
-            entry["created_at"].split("T")[0],
-            entry["entry_type"],
-            entry.get("description", ""),
-            entry["amount"],
-            entry.get("related_invoice_id", ""),
-            entry.get("related_project_id", ""),
-        ]
-        
-        # Add balance column for admin
-        if current_user.get("role") == "admin":
-            balance_data = calculate_seller_balance([e for e in result.data if e["created_at"] <= entry["created_at"]])
-            row.append(balance_data["available_balance"])
-        else:
-            row.append("") # Empty balance column for sales
-        
-        writer.writerow(row)
-    
-    output.seek(0)
-    return Response(
-        content=output.getvalue(),
-        headers={"Content-Disposition": f"attachment; filename=transactions_{range}_{current_user['id']}.csv"},
-        "Content-Type": "text/csv; charset=utf-8"
-    )
\ No newline at end of file
+
+    days = {"3m": 90, "6m": 180, "12m": 365}.get(range)
+    since = datetime.utcnow() - timedelta(days=days) if days else None
+    is_admin = current_user.role == "admin"
+
+    return StreamingResponse(
+        iter_ledger_csv(
+            supabase,
+            current_user.id,
+            since=since,
+            include_references=is_admin,
+            include_balance=is_admin,
+        ),
+        media_type="text/csv; charset=utf-8",
+        headers={
+            "Content-Disposition": f"attachment; filename=transactions_{range}_{current_user.id}.csv"
+        },
+    )
@@ -7,7 +7,12 @@ from pydantic import BaseModel
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from ..database import get_supabase
-from ..dependencies import require_admin, get_password_hash, get_current_active_user
+from ..dependencies import (
+    require_admin,
+    get_password_hash,
+    get_current_active_user,
+    invalidate_user_cache,
+)
 from ..schemas.auth import (
     User,
     UserListItem,
@@ -15,6 +20,7 @@ from ..schemas.auth import (
     LanguageUpdate,
     SellerEarningsResponse,
 )
+from ..services.time_series import aggregate_buckets, last_buckets
 
 router = APIRouter(prefix="/admin", tags=["admin"])
 
@@ -69,43 +75,19 @@ async def get_admin_dashboard_stats(
 
     total_active = projects_won + projects_in_production + projects_delivered
 
-    # Týdenní fakturace za poslední 12 týdnů (3 měsíce)
-    weekly_invoices = []
-    today = datetime.utcnow().date()
-
-    # Začátek aktuálního týdne (pondělí)
-    current_week_start = today - timedelta(days=today.weekday())
-
-    for i in range(12):  # 12 týdnů zpětně
-        week_start = current_week_start - timedelta(weeks=i)
-        week_end = week_start + timedelta(days=6)
-
-        # Dotaz na faktury v tomto týdnu
-        invoices_result = (
-            supabase.table("invoices_issued")
-            .select("amount_total")
-            .gte("issue_date", week_start.isoformat())
-            .lte("issue_date", week_end.isoformat())
-            .in_("status", ["issued", "paid"])
-            .execute()
-        )
-
-        total_amount = sum(
-            inv.get("amount_total", 0) or 0 for inv in (invoices_result.data or [])
+    # Týdenní fakturace za posledních 12 týdnů (3 měsíce) - jeden dotaz
+    start, end = last_buckets(12, "week", datetime.utcnow().date())
+    weekly_invoices = [
+        WeeklyInvoice(
+            week_start=b["bucket_start"].isoformat(),
+            week_end=b["bucket_end"].isoformat(),
+            total_amount=b["total"],
+            invoice_count=b["count"],
         )
-        invoice_count = len(invoices_result.data or [])
-
-        weekly_invoices.append(
-            WeeklyInvoice(
-                week_start=week_start.isoformat(),
-                week_end=week_end.isoformat(),
-                total_amount=total_amount,
-                invoice_count=invoice_count,
-            )
+        for b in aggregate_buckets(
+            supabase, "invoices_issued", "week", start, end, statuses=["issued", "paid"]
         )
-
-    # Obrátit pořadí - od nejstaršího po nejnovější
-    weekly_invoices.reverse()
+    ]
 
     return AdminDashboardStats(
         projects_in_production=projects_in_production,
@@ -219,6 +201,7 @@ async def reset_user_password(
     supabase.table("sellers").update(
         {"password_hash": password_hash, "must_change_password": True}
     ).eq("id", user_id).execute()
+    invalidate_user_cache(user_id)
 
     return {
         "message": f"Heslo pro uživatele {user_info['first_name']} {user_info['last_name']} bylo resetováno",
@@ -295,6 +278,7 @@ async def toggle_user_active(
     supabase.table("sellers").update({"is_active": new_status}).eq(
         "id", user_id
     ).execute()
+    invalidate_user_cache(user_id)
 
     status_text = "aktivován" if new_status else "deaktivován"
     return {
@@ -339,6 +323,7 @@ async def update_user_language_admin(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update user language",
         )
+    invalidate_user_cache(user_id)
 
     from ..audit import log_entity_change
 
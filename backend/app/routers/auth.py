@@ -11,6 +11,7 @@ from ..dependencies import (
     create_access_token,
     get_current_active_user,
     get_password_hash,
+    invalidate_user_cache,
     verify_password,
 )
 from ..schemas.auth import (
@@ -163,6 +164,7 @@ async def update_current_user(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update user",
         )
+    invalidate_user_cache(current_user.id)
 
     if result.data:
         updated = result.data[0]
@@ -239,6 +241,7 @@ async def change_password(
     supabase.table("sellers").update(
         {"password_hash": new_hash, "must_change_password": False}
     ).eq("id", current_user.id).execute()
+    invalidate_user_cache(current_user.id)
 
     return {"message": "Heslo bylo úspěšně změněno"}
 
@@ -288,6 +291,7 @@ async def complete_onboarding(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Nepodařilo se dokončit onboarding",
         )
+    invalidate_user_cache(current_user.id)
 
     updated = result.data[0]
     return UserResponse(
@@ -353,6 +357,7 @@ async def update_user_profile(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update user profile",
         )
+    invalidate_user_cache(current_user.id)
     
     # Log the change
     log_entity_change(
@@ -389,5 +394,6 @@ async def update_user_language(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail="Failed to update language",
         )
+    invalidate_user_cache(current_user.id)
 
     return {"message": "Language updated successfully"}
@@ -16,7 +16,9 @@ from fastapi import (
     Body,
 )
 from fastapi.responses import Response
+from postgrest.exceptions import APIError
 
+from ..async_database import AsyncDatabase, get_async_supabase
 from ..database import get_supabase
 from ..dependencies import (
     require_admin,
@@ -84,6 +86,7 @@ InvoiceIssuedCreate,
     AdminInvoiceListResponse,
     AdminInvoiceListItem,
     InvoiceRejectRequest,
+    InvoicePdfBatchRequest,
     SellerClaimsResponse,
 )
 from ..schemas.crm import (
@@ -128,30 +131,16 @@ from ..schemas.crm import (
     AdminDashboardStats,
     WeeklyInvoice,
 )
-from ..utils.balance_calculator import calculate_seller_balance
+from ..services.balances import get_seller_balance, get_seller_balance_async
+from ..services.invoice_numbers import allocate_invoice_number
+from ..services.sellers import get_seller_name, get_seller_names, get_seller_names_async
+from ..services.time_series import aggregate_buckets, last_buckets
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/crm", tags=["CRM"])
 
 
-def get_seller_name(supabase, seller_id: str | None) -> str | None:
-    """Get seller name by ID."""
-    if not seller_id:
-        return None
-    result = (
-        supabase.table("sellers")
-        .select("first_name, last_name")
-        .eq("id", seller_id)
-        .limit(1)
-        .execute()
-    )
-    if result.data:
-        s = result.data[0]
-        return f"{s.get('first_name', '')} {s.get('last_name', '')}".strip() or None
-    return None
-
-
 def types_to_string(types) -> str | None:
     """Convert types array to comma-separated string."""
     if not types:
@@ -281,6 +270,7 @@ async def check_duplicate(
 @router.get("/businesses", response_model=BusinessListResponse)
 async def list_businesses(
     current_user: Annotated[User, Depends(require_sales_or_admin)],
+    db: Annotated[AsyncDatabase, Depends(get_async_supabase)],
     status_crm: str | None = Query(None, description="Comma-separated statuses"),
     search: str | None = Query(None, description="Search in name"),
     owner_seller_id: str | None = Query(None, description="Filter by owner seller"),
@@ -291,10 +281,8 @@ async def list_businesses(
     limit: int = Query(20, ge=1, le=100),
 ):
     """List businesses with filters and pagination. Sales see only their own."""
-    supabase = get_supabase()
-
     # Base query
-    query = supabase.table("businesses").select("*", count="exact")
+    query = db.table("businesses").select("*", count="exact")
 
     # RBAC: Sales see only their own or unassigned
     if current_user.role == "sales":
@@ -326,7 +314,10 @@ async def list_businesses(
     offset = (page - 1) * limit
     query = query.range(offset, offset + limit - 1)
 
-    result = query.execute()
+    result = await query.execute()
+    seller_names = await get_seller_names_async(
+        db, [row.get("owner_seller_id") for row in result.data]
+    )
 
     # Transform response
     items = []
@@ -343,7 +334,7 @@ async def list_businesses(
                 notes=row.get("editorial_summary"),
                 status_crm=row.get("status_crm", "new"),
                 owner_seller_id=row.get("owner_seller_id"),
-                owner_seller_name=get_seller_name(supabase, row.get("owner_seller_id")),
+                owner_seller_name=seller_names.get(row.get("owner_seller_id")),
                 next_follow_up_at=row.get("next_follow_up_at"),
                 created_at=row.get("created_at"),
                 updated_at=row.get("updated_at"),
@@ -822,6 +813,8 @@ async def list_activities(
         .execute()
     )
 
+    seller_names = get_seller_names(supabase, [row.get("seller_id") for row in result.data])
+
     activities = []
     for row in result.data:
         activities.append(
@@ -829,7 +822,7 @@ async def list_activities(
                 id=row["id"],
                 business_id=row["business_id"],
                 seller_id=row.get("seller_id", ""),
-                seller_name=get_seller_name(supabase, row.get("seller_id")),
+                seller_name=seller_names.get(row.get("seller_id")),
                 activity_type=row["type"],  # DB column is 'type'
                 description=row.get("content", ""),  # DB column is 'content'
                 outcome=row.get("outcome"),
@@ -1173,32 +1166,61 @@ async def get_sellers_list(
     return sellers
 
 
+def _weekly_rewards_placeholder() -> list[dict]:
+    """Weekly rewards (placeholder)."""
+    return [
+        {"week": "Tento týden", "amount": 0},
+        {"week": "Minulý týden", "amount": 0},
+        {"week": "Před 2 týdny", "amount": 0},
+        {"week": "Před 3 týdny", "amount": 0},
+    ]
+
+
 @router.get("/seller/dashboard", response_model=SellerDashboard)
 async def get_seller_dashboard(
     current_user: Annotated[User, Depends(require_sales_or_admin)],
+    db: Annotated[AsyncDatabase, Depends(get_async_supabase)],
 ):
     """Get dashboard data for seller including available balance, pending projects, unpaid invoices."""
-    supabase = get_supabase()
     today = date.today()
 
-    # Calculate available balance using proper logic
-    # Positive entries: commission_earned, admin_adjustment
-    # Negative entries: payout_reserved, payout_paid (stored as negative amounts)
-    ledger_result = (
-        supabase.table("ledger_entries")
-        .select("amount, entry_type")
-        .eq("seller_id", current_user.id)
-        .execute()
-    )
+    # All aggregates in one round-trip (supabase/migrations/006)
+    try:
+        result = await db.rpc(
+            "get_seller_dashboard",
+            {"p_seller_id": current_user.id, "p_today": today.isoformat()},
+        ).execute()
+    except APIError as e:
+        if e.code not in ("PGRST202", "42883"):
+            raise
+        logger.warning("get_seller_dashboard function missing, using table queries")
+        return await _seller_dashboard_from_tables(db, current_user, today)
 
-    available_balance = 0
-    if ledger_result.data:
-        balance_calc = calculate_seller_balance(ledger_result.data)
-        available_balance = balance_calc["available_balance"]
+    data = result.data
+    return SellerDashboard(
+        available_balance=data["available_balance"],
+        pending_projects_amount=data["pending_projects_amount"],
+        recent_invoices=data["recent_invoices"],
+        weekly_rewards=_weekly_rewards_placeholder(),
+        pending_projects=[PendingProjectInfo(**p) for p in data["pending_projects"]],
+        unpaid_client_invoices=[
+            UnpaidClientInvoice(**inv) for inv in data["unpaid_client_invoices"]
+        ],
+        total_leads=data["total_leads"],
+        follow_ups_today=data["follow_ups_today"],
+    )
+
+
+async def _seller_dashboard_from_tables(
+    db: AsyncDatabase, current_user: User, today: date
+) -> SellerDashboard:
+    """Build the seller dashboard from per-table queries (database without migration 006)."""
+    balance = await get_seller_balance_async(db, current_user.id)
+    available_balance = balance["available_balance"]
 
     # Get businesses owned by this seller OR without owner (accessible to all)
     businesses_result = (
-        supabase.table("businesses")
+        await db.table("businesses")
         .select("id, name, status_crm, next_follow_up_at, owner_seller_id")
         .or_(f"owner_seller_id.eq.{current_user.id},owner_seller_id.is.null")
         .execute()
@@ -1226,7 +1248,7 @@ async def get_seller_dashboard(
     # Get projects from businesses owned by this seller or without owner
     if business_ids:
         projects_result = (
-            supabase.table("website_projects")
+            await db.table("website_projects")
             .select(
                 "id, business_id, seller_id, status, package, price_setup, created_at"
             )
@@ -1241,7 +1263,7 @@ async def get_seller_dashboard(
 
     # Also get projects where seller_id matches (even if business not owned by this seller)
     seller_projects_result = (
-        supabase.table("website_projects")
+        await db.table("website_projects")
         .select("id, business_id, seller_id, status, package, price_setup, created_at")
         .eq("seller_id", current_user.id)
         .in_("status", ["offer", "won", "in_production"])
@@ -1269,7 +1291,7 @@ async def get_seller_dashboard(
     ]
     if missing_business_ids:
         extra_businesses = (
-            supabase.table("businesses")
+            await db.table("businesses")
             .select("id, name")
             .in_("id", missing_business_ids)
             .execute()
@@ -1277,26 +1299,30 @@ async def get_seller_dashboard(
         for b in extra_businesses.data or []:
             business_names[b["id"]] = b["name"]
 
+    # Latest version per project (one query for all projects)
+    latest_versions: dict = {}
+    if projects_data:
+        versions_result = (
+            await db.table("website_versions")
+            .select("project_id, version_number, created_at")
+            .in_("project_id", [p["id"] for p in projects_data])
+            .order("version_number", desc=True)
+            .execute()
+        )
+        for v in versions_result.data or []:
+            latest_versions.setdefault(v.get("project_id"), v)
+
     # Process projects
     for project in projects_data:
         if project.get("price_setup"):
             pending_amount += project["price_setup"]
 
-        # Get latest version for this project
-        version_result = (
-            supabase.table("website_versions")
-            .select("version_number, created_at")
-            .eq("project_id", project["id"])
-            .order("version_number", desc=True)
-            .limit(1)
-            .execute()
-        )
-
         latest_version = None
         latest_version_date = None
-        if version_result.data:
-            latest_version = version_result.data[0]["version_number"]
-            latest_version_date = version_result.data[0]["created_at"]
+        version = latest_versions.get(project["id"])
+        if version:
+            latest_version = version["version_number"]
+            latest_version_date = version["created_at"]
 
         pending_projects.append(
             PendingProjectInfo(
@@ -1317,7 +1343,7 @@ async def get_seller_dashboard(
 
     if business_ids:
         invoices_issued_result = (
-            supabase.table("invoices_issued")
+            await db.table("invoices_issued")
             .select("id, business_id, invoice_number, amount_total, due_date, status")
             .in_("business_id", business_ids)
             .in_("status", ["issued", "overdue"])
@@ -1351,7 +1377,7 @@ async def get_seller_dashboard(
 
     # Get recent invoices (invoices_received = invoices from sellers for commissions)
     invoices_result = (
-        supabase.table("invoices_received")
+        await db.table("invoices_received")
         .select("id, invoice_number, amount_total, status, issue_date")
         .eq("seller_id", current_user.id)
         .order("created_at", desc=True)
@@ -1360,19 +1386,11 @@ async def get_seller_dashboard(
     )
     recent_invoices = invoices_result.data if invoices_result.data else []
 
-    # Weekly rewards (placeholder)
-    weekly_rewards = [
-        {"week": "Tento týden", "amount": 0},
-        {"week": "Minulý týden", "amount": 0},
-        {"week": "Před 2 týdny", "amount": 0},
-        {"week": "Před 3 týdny", "amount": 0},
-    ]
-
     return SellerDashboard(
         available_balance=available_balance,
         pending_projects_amount=pending_amount,
         recent_invoices=recent_invoices,
-        weekly_rewards=weekly_rewards,
+        weekly_rewards=_weekly_rewards_placeholder(),
         pending_projects=pending_projects,
         unpaid_client_invoices=unpaid_client_invoices,
         total_leads=total_leads,
@@ -1920,8 +1938,6 @@ async def get_seller_account_ledger(
 
     # Apply date range filter
     if range != "all":
-        from datetime import datetime, timedelta
-
         now = datetime.utcnow()
         if range == "month":
             start_date = (now - timedelta(days=30)).isoformat()
@@ -1942,18 +1958,7 @@ async def get_seller_account_ledger(
     # Execute query
     result = query.order("created_at", desc=True).execute()
 
-    # Calculate available balance using proper logic
-    all_ledger_result = (
-        supabase.table("ledger_entries")
-        .select("amount, entry_type")
-        .eq("seller_id", current_user.id)
-        .execute()
-    )
-
-    available_balance = 0
-    if all_ledger_result.data:
-        balance_calc = calculate_seller_balance(all_ledger_result.data)
-        available_balance = balance_calc["available_balance"]
+    available_balance = get_seller_balance(supabase, current_user.id)["available_balance"]
 
     # Convert to response format
     ledger_entries = []
@@ -1975,34 +1980,26 @@ async def get_seller_account_ledger(
             )
         )
 
-    # Generate weekly rewards summary (simplified)
+    # Weekly rewards summary for the last 12 weeks (one grouped query)
     weekly_rewards = []
     if range in ["all", "quarter", "year"]:
-        # Get last 12 weeks of data
-        for i in range(12):
-            week_date = datetime.utcnow() - timedelta(weeks=i)
-            week_start = week_date.replace(
-                hour=0, minute=0, second=0, microsecond=0
-            ) - timedelta(days=week_date.weekday())
-            week_end = week_start + timedelta(days=6)
-
-            week_result = (
-                supabase.table("ledger_entries")
-                .select("amount")
-                .eq("seller_id", current_user.id)
-                .eq("entry_type", "commission_earned")
-                .gte("created_at", week_start.isoformat())
-                .lte("created_at", week_end.isoformat())
-                .execute()
-            )
-
-            week_total = sum(
-                entry.get("amount", 0) for entry in (week_result.data or [])
-            )
-            if week_total > 0:
+        start, end = last_buckets(12, "week", datetime.utcnow().date())
+        buckets = aggregate_buckets(
+            supabase,
+            "ledger_entries",
+            "week",
+            start,
+            end,
+            seller_id=current_user.id,
+            entry_types=["commission_earned"],
+        )
+        for bucket in reversed(buckets):
+            if bucket["total"] > 0:
                 weekly_rewards.append(
                     WeeklyRewardSummary(
-                        week_start=week_start, week_end=week_end, amount=week_total
+                        week_start=datetime.combine(bucket["bucket_start"], datetime.min.time()),
+                        week_end=datetime.combine(bucket["bucket_end"], datetime.min.time()),
+                        amount=bucket["total"],
                     )
                 )
 
@@ -2252,17 +2249,7 @@ async def generate_project_invoice(
 
     # Generate invoice number using database function
     # Format: YYYY-NNNN (e.g., 2025-0001)
-    current_year = datetime.utcnow().year
-
-    # Get the count of invoices this year to generate next number
-    count_result = (
-        supabase.table("invoices_issued")
-        .select("id", count="exact")
-        .like("invoice_number", f"{current_year}-%")
-        .execute()
-    )
-    next_number = (count_result.count or 0) + 1
-    invoice_number = f"{current_year}-{next_number:04d}"
+    invoice_number = allocate_invoice_number(supabase)
 
     # Calculate dates
     issue_date = date.today()
@@ -2614,22 +2601,7 @@ async def get_admin_invoices(
 
     result = query.execute()
 
-    # Get all seller IDs from results to fetch names
-    seller_ids = list(
-        set(row.get("seller_id") for row in result.data if row.get("seller_id"))
-    )
-    seller_names = {}
-    if seller_ids:
-        sellers_result = (
-            supabase.table("sellers")
-            .select("id, first_name, last_name")
-            .in_("id", seller_ids)
-            .execute()
-        )
-        for s in sellers_result.data or []:
-            seller_names[s["id"]] = (
-                f"{s.get('first_name', '')} {s.get('last_name', '')}".strip()
-            )
+    seller_names = get_seller_names(supabase, [row.get("seller_id") for row in result.data])
 
     # Transform response
     items = []
@@ -2658,6 +2630,95 @@ async def get_admin_invoices(
     )
 
 
+@router.post("/admin/invoices/generate-pdfs")
+async def generate_invoice_pdfs_batch(
+    data: InvoicePdfBatchRequest,
+    current_user: Annotated[User, Depends(require_admin)],
+    db: Annotated[AsyncDatabase, Depends(get_async_supabase)],
+):
+    """
+    Hromadně vygenerovat PDF vydaných faktur (uzávěrka měsíce).
+
+    Faktury se vybírají podle období vystavení a/nebo stavu a generují se
+    souběžně v jednom background jobu; průběh a chyby jednotlivých faktur
+    vrací GET /crm/admin/invoices/generate-pdfs/{job_id}.
+    Admin only.
+    """
+    from ..services.invoice_pdf_batch import filter_invoices
+    from ..services.jobs import enqueue_job
+
+    if not (data.date_from or data.date_to or data.statuses):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Zadejte období vystavení nebo alespoň jeden stav faktury",
+        )
+
+    invoice_filter = data.model_dump(exclude_none=True)
+
+    # Only the count here; the job selects the invoices itself
+    count_result = await filter_invoices(
+        db.table("invoices_issued").select("id", count="exact"), **invoice_filter
+    ).limit(1).execute()
+    invoice_count = count_result.count or 0
+
+    if not invoice_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Filtru neodpovídá žádná faktura",
+        )
+
+    job_id = await enqueue_job(
+        "generate_invoice_pdfs",
+        payload={
+            "filter": invoice_filter,
+            "requested_by": current_user.id,
+        },
+    )
+
+    return {
+        "message": "Generování PDF faktur bylo zařazeno do fronty",
+        "job_id": job_id,
+        "invoice_count": invoice_count,
+    }
+
+
+@router.get("/admin/invoices/generate-pdfs/{job_id}")
+async def get_invoice_pdfs_batch_status(
+    job_id: str,
+    current_user: Annotated[User, Depends(require_admin)],
+):
+    """
+    Průběh hromadného generování PDF faktur.
+
+    Během běhu vrací průběžné počty (progress), po dokončení i seznam
+    faktur, u kterých generování selhalo (failures).
+    """
+    from ..services.jobs import get_job_status
+
+    job = await get_job_status(job_id)
+
+    if not job or job.get("job_type") != "generate_invoice_pdfs":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job nenalezen",
+        )
+
+    result = job.get("result") or {}
+    progress = result.get("progress") or {
+        key: result[key]
+        for key in ("total", "done", "generated", "skipped", "failed")
+        if key in result
+    }
+
+    return {
+        "job_id": job_id,
+        "status": job.get("status"),
+        "progress": progress or None,
+        "failures": result.get("failures"),
+        "error_message": job.get("error_message"),
+    }
+
+
 @router.put(
     "/invoices-issued/{invoice_id}/approve", response_model=InvoiceIssuedResponse
 )
@@ -2833,19 +2894,7 @@ async def get_seller_claims(
     """
     supabase = get_supabase()
 
-    # Calculate total earned from ledger entries
-    ledger_result = (
-        supabase.table("ledger_entries")
-        .select("amount")
-        .eq("seller_id", current_user.id)
-        .eq("entry_type", "commission_earned")
-        .execute()
-    )
-
-    total_earned = 0
-    if ledger_result.data:
-        for entry in ledger_result.data:
-            total_earned += entry.get("amount", 0)
+    total_earned = get_seller_balance(supabase, current_user.id)["total_earned"]
 
     # Calculate already invoiced (approved + paid invoices from invoices_received)
     invoiced_result = (
@@ -2884,7 +2933,16 @@ async def generate_invoice_issued_pdf_endpoint(
     Uploads to Supabase Storage and updates pdf_path in database.
     Returns the public URL of the generated PDF.
     """
-    from ..services.pdf import generate_invoice_issued_pdf, generate_placeholder_pdf, upload_pdf_to_storage
+    from ..services.pdf import (
+        generate_invoice_issued_pdf,
+        generate_placeholder_pdf,
+        invoice_issued_fingerprint,
+        invoice_issued_storage_path,
+        save_pdf_path,
+        stored_pdf_url,
+        upload_pdf_to_storage,
+    )
+    from ..services.pdf_executor import PdfRenderQueueFull, render_pdf
 
     supabase = get_supabase()
 
@@ -2949,21 +3007,36 @@ async def generate_invoice_issued_pdf_endpoint(
     if settings_result.data and settings_result.data.get("value"):
         platform_billing = settings_result.data["value"]
 
+    storage_path = invoice_issued_storage_path(invoice)
+
+    # Stored PDF is current - nothing to render
+    fingerprint = invoice_issued_fingerprint(invoice, business, platform_billing, project)
+    pdf_url = stored_pdf_url(invoice, fingerprint)
+    if pdf_url:
+        return {"pdf_url": pdf_url, "storage_path": storage_path}
+
     # Generate PDF - try full template, fallback to placeholder
     try:
-        pdf_bytes = generate_invoice_issued_pdf(
+        pdf_bytes = await render_pdf(
+            generate_invoice_issued_pdf,
             invoice=invoice,
             business=business,
             platform_billing=platform_billing,
             project=project,
         )
+    except PdfRenderQueueFull:
+        raise
     except Exception as e:
         logger.warning(f"Full PDF generation failed, using placeholder: {e}")
+        fingerprint = None  # Render the full PDF again next time
         try:
-            pdf_bytes = generate_placeholder_pdf(
+            pdf_bytes = await render_pdf(
+                generate_placeholder_pdf,
                 invoice_number=invoice.get("invoice_number", ""),
                 business_name=business.get("name", ""),
             )
+        except PdfRenderQueueFull:
+            raise
         except Exception as e2:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -2971,13 +3044,6 @@ async def generate_invoice_issued_pdf_endpoint(
             )
 
     # Upload to storage
-    year = (
-        invoice["invoice_number"].split("-")[0]
-        if "-" in invoice["invoice_number"]
-        else str(date.today().year)
-    )
-    storage_path = f"invoices/issued/{year}/{invoice['invoice_number']}.pdf"
-
     pdf_url = await upload_pdf_to_storage(
         supabase_client=supabase,
         pdf_bytes=pdf_bytes,
@@ -2991,12 +3057,7 @@ async def generate_invoice_issued_pdf_endpoint(
         )
 
     # Update invoice with pdf_path
-    supabase.table("invoices_issued").update(
-        {
-            "pdf_path": pdf_url,
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-    ).eq("id", invoice_id).execute()
+    save_pdf_path(supabase, "invoices_issued", invoice_id, pdf_url, fingerprint)
 
     return {"pdf_url": pdf_url, "storage_path": storage_path}
 
@@ -3008,9 +3069,22 @@ async def download_invoice_issued_pdf(
 ):
     """
     Download PDF for an issued invoice.
-    If PDF doesn't exist, generates it first.
+    Redirects to the stored PDF while it is current; otherwise renders it
+    and stores it for the next download.
     """
-    from ..services.pdf import generate_invoice_issued_pdf, generate_placeholder_pdf
+    from fastapi.responses import RedirectResponse
+
+    from ..services.pdf import (
+        generate_invoice_issued_pdf,
+        generate_placeholder_pdf,
+        has_pdf_fingerprint,
+        invoice_issued_fingerprint,
+        invoice_issued_storage_path,
+        save_pdf_path,
+        stored_pdf_url,
+        upload_pdf_to_storage,
+    )
+    from ..services.pdf_executor import PdfRenderQueueFull, render_pdf
 
     supabase = get_supabase()
 
@@ -3033,13 +3107,10 @@ async def download_invoice_issued_pdf(
     # Check access to business
     await get_business(invoice["business_id"], current_user)
 
-    # If PDF already exists, redirect to it
-    if invoice.get("pdf_path"):
-        from fastapi.responses import RedirectResponse
-
+    # Without migration 015 the stored PDF cannot be checked - keep using it
+    if invoice.get("pdf_path") and not has_pdf_fingerprint(invoice):
         return RedirectResponse(url=invoice["pdf_path"])
 
-    # Generate PDF on-the-fly
     business_result = (
         supabase.table("businesses")
         .select("*")
@@ -3079,25 +3150,47 @@ async def download_invoice_issued_pdf(
     if settings_result.data and settings_result.data.get("value"):
         platform_billing = settings_result.data["value"]
 
+    # If the stored PDF is current, redirect to it
+    fingerprint = invoice_issued_fingerprint(invoice, business, platform_billing, project)
+    pdf_url = stored_pdf_url(invoice, fingerprint)
+    if pdf_url:
+        return RedirectResponse(url=pdf_url)
+
+    # Generate PDF on-the-fly
     try:
-        pdf_bytes = generate_invoice_issued_pdf(
+        pdf_bytes = await render_pdf(
+            generate_invoice_issued_pdf,
             invoice=invoice,
             business=business,
             platform_billing=platform_billing,
             project=project,
         )
+    except PdfRenderQueueFull:
+        raise
     except Exception as e:
         logger.warning(f"Full PDF generation failed, using placeholder: {e}")
         try:
-            pdf_bytes = generate_placeholder_pdf(
+            pdf_bytes = await render_pdf(
+                generate_placeholder_pdf,
                 invoice_number=invoice.get("invoice_number", ""),
                 business_name=business.get("name", ""),
             )
+        except PdfRenderQueueFull:
+            raise
         except Exception as e2:
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Chyba při generování PDF: {str(e2)}",
             )
+    else:
+        # Store it so the next download is a redirect
+        pdf_url = await upload_pdf_to_storage(
+            supabase_client=supabase,
+            pdf_bytes=pdf_bytes,
+            storage_path=invoice_issued_storage_path(invoice),
+        )
+        if pdf_url:
+            save_pdf_path(supabase, "invoices_issued", invoice_id, pdf_url, fingerprint)
 
     filename = f"faktura-{invoice['invoice_number']}.pdf"
     return Response(
@@ -3116,7 +3209,15 @@ async def generate_invoice_received_pdf_endpoint(
     Generate PDF for a received invoice (Seller -> Webomat).
     Only the seller who owns the invoice or admin can generate it.
     """
-    from ..services.pdf import generate_invoice_received_pdf, upload_pdf_to_storage
+    from ..services.pdf import (
+        generate_invoice_received_pdf,
+        invoice_received_fingerprint,
+        invoice_received_storage_path,
+        save_pdf_path,
+        stored_pdf_url,
+        upload_pdf_to_storage,
+    )
+    from ..services.pdf_executor import PdfRenderQueueFull, render_pdf
 
     supabase = get_supabase()
 
@@ -3172,13 +3273,24 @@ async def generate_invoice_received_pdf_endpoint(
     if settings_result.data and settings_result.data.get("value"):
         platform_billing = settings_result.data["value"]
 
+    storage_path = invoice_received_storage_path(invoice)
+
+    # Stored PDF is current - nothing to render
+    fingerprint = invoice_received_fingerprint(invoice, seller, platform_billing)
+    pdf_url = stored_pdf_url(invoice, fingerprint)
+    if pdf_url:
+        return {"pdf_url": pdf_url, "storage_path": storage_path}
+
     # Generate PDF
     try:
-        pdf_bytes = generate_invoice_received_pdf(
+        pdf_bytes = await render_pdf(
+            generate_invoice_received_pdf,
             invoice=invoice,
             seller=seller,
             platform_billing=platform_billing,
         )
+    except PdfRenderQueueFull:
+        raise
     except ImportError as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
@@ -3191,8 +3303,6 @@ async def generate_invoice_received_pdf_endpoint(
         )
 
     # Upload to storage
-    storage_path = f"invoices/received/{seller['id']}/{invoice['invoice_number']}.pdf"
-
     pdf_url = await upload_pdf_to_storage(
         supabase_client=supabase,
         pdf_bytes=pdf_bytes,
@@ -3206,12 +3316,7 @@ async def generate_invoice_received_pdf_endpoint(
         )
 
     # Update invoice with pdf_path
-    supabase.table("invoices_received").update(
-        {
-            "pdf_path": pdf_url,
-            "updated_at": datetime.utcnow().isoformat(),
-        }
-    ).eq("id", invoice_id).execute()
+    save_pdf_path(supabase, "invoices_received", invoice_id, pdf_url, fingerprint)
 
     return {"pdf_url": pdf_url, "storage_path": storage_path}
 
@@ -3223,9 +3328,21 @@ async def download_invoice_received_pdf(
 ):
     """
     Download PDF for a received invoice.
-    If PDF doesn't exist, generates it first.
+    Redirects to the stored PDF while it is current; otherwise renders it
+    and stores it for the next download.
     """
-    from ..services.pdf import generate_invoice_received_pdf
+    from fastapi.responses import RedirectResponse
+
+    from ..services.pdf import (
+        generate_invoice_received_pdf,
+        has_pdf_fingerprint,
+        invoice_received_fingerprint,
+        invoice_received_storage_path,
+        save_pdf_path,
+        stored_pdf_url,
+        upload_pdf_to_storage,
+    )
+    from ..services.pdf_executor import PdfRenderQueueFull, render_pdf
 
     supabase = get_supabase()
 
@@ -3252,10 +3369,8 @@ async def download_invoice_received_pdf(
             detail="Nemáte oprávnění k této faktuře",
         )
 
-    # If PDF already exists, redirect to it
-    if invoice.get("pdf_path"):
-        from fastapi.responses import RedirectResponse
-
+    # Without migration 015 the stored PDF cannot be checked - keep using it
+    if invoice.get("pdf_path") and not has_pdf_fingerprint(invoice):
         return RedirectResponse(url=invoice["pdf_path"])
 
     # Get seller data
@@ -3287,18 +3402,36 @@ async def download_invoice_received_pdf(
     if settings_result.data and settings_result.data.get("value"):
         platform_billing = settings_result.data["value"]
 
+    # If the stored PDF is current, redirect to it
+    fingerprint = invoice_received_fingerprint(invoice, seller, platform_billing)
+    pdf_url = stored_pdf_url(invoice, fingerprint)
+    if pdf_url:
+        return RedirectResponse(url=pdf_url)
+
     try:
-        pdf_bytes = generate_invoice_received_pdf(
+        pdf_bytes = await render_pdf(
+            generate_invoice_received_pdf,
             invoice=invoice,
             seller=seller,
             platform_billing=platform_billing,
         )
+    except PdfRenderQueueFull:
+        raise
     except Exception as e:
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Chyba při generování PDF: {str(e)}",
         )
 
+    # Store it so the next download is a redirect
+    pdf_url = await upload_pdf_to_storage(
+        supabase_client=supabase,
+        pdf_bytes=pdf_bytes,
+        storage_path=invoice_received_storage_path(invoice),
+    )
+    if pdf_url:
+        save_pdf_path(supabase, "invoices_received", invoice_id, pdf_url, fingerprint)
+
     filename = f"faktura-{invoice['invoice_number']}.pdf"
     return Response(
         content=pdf_bytes,
@@ -2,6 +2,8 @@
 # Invoices Received Management (faktury od obchodníků)
 # ============================================
 
+from ..services.sellers import format_seller_name, get_sellers
+
 
 @router.post("/invoices-received", response_model=InvoiceReceivedResponse)
 async def create_seller_invoice(
@@ -185,20 +187,14 @@ async def list_admin_invoices(
         .execute()
     )
 
+    sellers = get_sellers(supabase, [inv["seller_id"] for inv in result.data or []])
+
     invoices = []
     for invoice in result.data or []:
         # Add seller info
-        seller_result = (
-            supabase.table("sellers")
-            .select("first_name, last_name, email")
-            .eq("id", invoice["seller_id"])
-            .single()
-            .execute()
-        )
-        
-        if seller_result.data:
-            seller = seller_result.data
-            invoice["seller_name"] = f"{seller['first_name']} {seller['last_name']}"
+        seller = sellers.get(invoice["seller_id"])
+        if seller:
+            invoice["seller_name"] = format_seller_name(seller)
             invoice["seller_email"] = seller["email"]
 
         invoices.append(invoice)
@@ -17,27 +17,11 @@ from ..schemas.crm import (
     PlatformFeedbackUpdate,
     PlatformFeedbackResponse,
 )
+from ..services.sellers import get_seller_name, get_seller_names
 
 router = APIRouter(tags=["Feedback"])
 
 
-def get_seller_name(supabase, seller_id: str | None) -> str | None:
-    """Get seller name by ID."""
-    if not seller_id:
-        return None
-    result = (
-        supabase.table("sellers")
-        .select("first_name, last_name")
-        .eq("id", seller_id)
-        .limit(1)
-        .execute()
-    )
-    if result.data:
-        s = result.data[0]
-        return f"{s.get('first_name', '')} {s.get('last_name', '')}".strip() or None
-    return None
-
-
 # ============================================
 # User Feedback Endpoints
 # ============================================
@@ -116,6 +100,10 @@ async def list_my_feedback(
         .execute()
     )
 
+    handler_names = get_seller_names(
+        supabase, [row.get("handled_by") for row in result.data or []]
+    )
+
     feedbacks = []
     for row in result.data or []:
         feedbacks.append(
@@ -129,7 +117,7 @@ async def list_my_feedback(
                 status=row["status"],
                 admin_note=row.get("admin_note"),
                 handled_by=row.get("handled_by"),
-                handler_name=get_seller_name(supabase, row.get("handled_by")),
+                handler_name=handler_names.get(row.get("handled_by")),
                 handled_at=row.get("handled_at"),
                 page_url=row.get("page_url"),
                 created_at=row.get("created_at"),
@@ -168,18 +156,12 @@ async def list_all_feedback(
 
     result = query.execute()
 
-    # Batch fetch submitter names
-    submitter_ids = list(set(row["submitted_by"] for row in result.data or []))
-    submitter_names = {}
-    if submitter_ids:
-        sellers_result = (
-            supabase.table("sellers")
-            .select("id, first_name, last_name")
-            .in_("id", submitter_ids)
-            .execute()
-        )
-        for s in sellers_result.data or []:
-            submitter_names[s["id"]] = f"{s.get('first_name', '')} {s.get('last_name', '')}".strip()
+    # Batch fetch submitter and handler names
+    seller_names = get_seller_names(
+        supabase,
+        [row["submitted_by"] for row in result.data or []]
+        + [row.get("handled_by") for row in result.data or []],
+    )
 
     feedbacks = []
     for row in result.data or []:
@@ -187,14 +169,14 @@ async def list_all_feedback(
             PlatformFeedbackResponse(
                 id=row["id"],
                 submitted_by=row["submitted_by"],
-                submitter_name=submitter_names.get(row["submitted_by"]),
+                submitter_name=seller_names.get(row["submitted_by"]),
                 content=row["content"],
                 category=row["category"],
                 priority=row["priority"],
                 status=row["status"],
                 admin_note=row.get("admin_note"),
                 handled_by=row.get("handled_by"),
-                handler_name=get_seller_name(supabase, row.get("handled_by")),
+                handler_name=seller_names.get(row.get("handled_by")),
                 handled_at=row.get("handled_at"),
                 page_url=row.get("page_url"),
                 created_at=row.get("created_at"),
@@ -4,7 +4,7 @@ import uuid
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 
 from ..database import get_supabase
-from ..dependencies import get_current_active_user
+from ..dependencies import get_current_active_user, invalidate_user_cache
 from ..schemas.auth import User
 
 router = APIRouter(prefix="/upload", tags=["upload"])
@@ -73,6 +73,7 @@ async def upload_avatar(
         supabase.table("sellers").update({
             "avatar_url": public_url
         }).eq("id", current_user.id).execute()
+        invalidate_user_cache(current_user.id)
 
         return {
             "message": "Avatar úspěšně nahrán",
@@ -112,5 +113,6 @@ async def delete_avatar(
     supabase.table("sellers").update({
         "avatar_url": None
     }).eq("id", current_user.id).execute()
+    invalidate_user_cache(current_user.id)
 
     return {"message": "Avatar smazán"}
@@ -30,23 +30,6 @@ from ..schemas.crm import (
 router = APIRouter(prefix="/web-project", tags=["Web Project"])
 
 
-def get_seller_name(supabase, seller_id: str | None) -> str | None:
-    """Get seller name by ID."""
-    if not seller_id:
-        return None
-    result = (
-        supabase.table("sellers")
-        .select("first_name, last_name")
-        .eq("id", seller_id)
-        .limit(1)
-        .execute()
-    )
-    if result.data:
-        s = result.data[0]
-        return f"{s.get('first_name', '')} {s.get('last_name', '')}".strip() or None
-    return None
-
-
 async def verify_project_access(supabase, project_id: str, current_user: User) -> dict:
     """Verify user has access to the project and return project data."""
     result = (
@@ -241,10 +224,12 @@ async def list_versions(
                 thumbnail_url=row.get("thumbnail_url"),
                 screenshot_desktop_url=row.get("screenshot_desktop_url"),
                 screenshot_mobile_url=row.get("screenshot_mobile_url"),
+                screenshot_images=row.get("screenshot_images"),
                 public_url=row.get("public_url"),
                 deployment_status=row.get("deployment_status", "none"),
                 deployment_platform=row.get("deployment_platform"),
                 deployment_id=row.get("deployment_id"),
+                deployment_ready_state=row.get("deployment_ready_state"),
                 is_current=row.get("is_current", False),
                 published_at=row.get("published_at"),
                 parent_version_id=row.get("parent_version_id"),
@@ -385,10 +370,12 @@ async def update_version(
         thumbnail_url=row.get("thumbnail_url"),
         screenshot_desktop_url=row.get("screenshot_desktop_url"),
         screenshot_mobile_url=row.get("screenshot_mobile_url"),
+        screenshot_images=row.get("screenshot_images"),
         public_url=row.get("public_url"),
         deployment_status=row.get("deployment_status", "none"),
         deployment_platform=row.get("deployment_platform"),
         deployment_id=row.get("deployment_id"),
+        deployment_ready_state=row.get("deployment_ready_state"),
         is_current=row.get("is_current", False),
         published_at=row.get("published_at"),
         parent_version_id=row.get("parent_version_id"),
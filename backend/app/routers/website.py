@@ -49,6 +49,18 @@ class DeployTestResponse(BaseModel):
     deployment_id: str | None = None
 
 
+class BulkDeployRequest(BaseModel):
+    """Request pro hromadné nasazení verzí (admin only).
+
+    Buď explicitní version_ids, nebo filtr (všechna zadaná pole musí platit).
+    """
+    version_ids: list[str] | None = None
+    project_id: str | None = None
+    deployment_status: str | None = None  # např. "deployed" = všechny živé weby
+    status: str | None = None
+    is_current: bool | None = None
+
+
 class ScreenshotTestRequest(BaseModel):
     """Request pro screenshot testovacího HTML."""
     html_content: str
@@ -132,6 +144,93 @@ async def deploy_test_website(
         )
 
 
+@router.post("/bulk-deploy")
+async def bulk_deploy(
+    data: BulkDeployRequest,
+    current_user: Annotated[User, Depends(require_admin)],
+):
+    """
+    Hromadně nasadit verze na Vercel (např. po opravě šablony).
+
+    Verze se nasazují souběžně v jednom background jobu; průběh a výsledky
+    jednotlivých verzí vrací GET /website/bulk-deploy/{job_id}.
+    Admin only.
+    """
+    from ..services.bulk_deploy import FILTER_FIELDS, select_version_ids
+
+    if not is_vercel_configured():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Vercel deployment není nakonfigurován (chybí VERCEL_TOKEN)",
+        )
+
+    filters = {
+        field: getattr(data, field)
+        for field in FILTER_FIELDS
+        if getattr(data, field) is not None
+    }
+
+    if data.version_ids:
+        version_ids = list(dict.fromkeys(data.version_ids))
+    elif filters:
+        version_ids = select_version_ids(get_supabase(), filters)
+    else:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Zadejte version_ids nebo alespoň jeden filtr",
+        )
+
+    if not version_ids:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Filtru neodpovídá žádná verze",
+        )
+
+    job_id = await enqueue_job(
+        "bulk_deploy",
+        payload={"version_ids": version_ids, "filter": filters, "requested_by": current_user.id},
+    )
+
+    return {
+        "message": "Hromadné nasazení bylo zařazeno do fronty",
+        "job_id": job_id,
+        "version_count": len(version_ids),
+    }
+
+
+@router.get("/bulk-deploy/{job_id}")
+async def get_bulk_deploy_status(
+    job_id: str,
+    current_user: Annotated[User, Depends(require_admin)],
+):
+    """
+    Průběh hromadného nasazení.
+
+    Během běhu vrací průběžné počty (progress), po dokončení i výsledky
+    jednotlivých verzí (results).
+    """
+    job = await get_job_status(job_id)
+
+    if not job or job.get("job_type") != "bulk_deploy":
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Job nenalezen",
+        )
+
+    result = job.get("result") or {}
+    progress = result.get("progress") or {
+        key: result[key] for key in ("total", "done", "deployed", "failed") if key in result
+    }
+
+    return {
+        "job_id": job_id,
+        "status": job.get("status"),
+        "progress": progress or None,
+        "results": result.get("results"),
+        "error_message": job.get("error_message"),
+    }
+
+
 @router.post("/screenshot-test", response_model=ScreenshotTestResponse)
 async def screenshot_test_website(
     data: ScreenshotTestRequest,
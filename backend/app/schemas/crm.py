@@ -326,10 +326,14 @@ class WebsiteVersionResponse(BaseModel):
     thumbnail_url: str | None = None
     screenshot_desktop_url: str | None = None
     screenshot_mobile_url: str | None = None
+    # {"desktop"|"mobile"|"thumbnail": {"webp"|"avif": {"<width>": url}}}
+    screenshot_images: dict | None = None
     public_url: str | None = None
     deployment_status: str | None = None
     deployment_platform: str | None = None
     deployment_id: str | None = None
+    # Vercel readyState (QUEUED, BUILDING, READY, ERROR, ...), kept current by the poller
+    deployment_ready_state: str | None = None
     is_current: bool | None = None
     published_at: datetime | None = None
     parent_version_id: str | None = None
@@ -472,6 +476,10 @@ class JobType(str, Enum):
     generate_thumbnail = "generate_thumbnail"
     send_notification = "send_notification"
     cleanup_expired_links = "cleanup_expired_links"
+    reconcile_seller_balances = "reconcile_seller_balances"
+    bulk_deploy = "bulk_deploy"
+    poll_deployment_status = "poll_deployment_status"
+    generate_invoice_pdfs = "generate_invoice_pdfs"
 
 
 class JobStatus(str, Enum):
@@ -638,6 +646,15 @@ class InvoiceRejectRequest(BaseModel):
     reason: str
 
 
+class InvoicePdfBatchRequest(BaseModel):
+    """Schema for batch PDF generation of issued invoices (month-end close)."""
+
+    date_from: str | None = None  # issue_date from, YYYY-MM-DD (inclusive)
+    date_to: str | None = None  # issue_date to, YYYY-MM-DD (inclusive)
+    statuses: list[str] | None = None
+    only_missing: bool = True  # Skip invoices that already have a PDF
+
+
 class AdminInvoiceListItem(BaseModel):
     """Invoice item for admin list view."""
 
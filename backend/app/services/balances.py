@@ -0,0 +1,129 @@
+"""
+Seller Balance Service
+
+Reads seller balances from the `seller_balances` snapshot (supabase/migrations/008),
+which a trigger on ledger_entries keeps current in the same transaction as
+every ledger write. A balance read is one primary-key lookup instead of a
+scan over the seller's whole ledger.
+"""
+
+import logging
+
+from postgrest.exceptions import APIError
+
+from ..utils.balance_calculator import calculate_seller_balance
+
+logger = logging.getLogger(__name__)
+
+BALANCE_FIELDS = (
+    "total_earned",
+    "total_paid_out",
+    "available_balance",
+    "pending_commissions",
+    "admin_adjustments",
+)
+
+_SELECT = "seller_id, " + ", ".join(BALANCE_FIELDS)
+
+# Table or function not present (database without migration 008)
+_MISSING_CODES = ("PGRST202", "PGRST205", "42P01", "42883")
+
+
+def _from_row(row: dict) -> dict:
+    """Snapshot row -> calculate_seller_balance() shape."""
+    return {field: float(row.get(field) or 0) for field in BALANCE_FIELDS}
+
+
+def get_seller_balance(supabase, seller_id: str) -> dict:
+    """
+    Current balance of a seller.
+
+    Args:
+        supabase: Sync Supabase client
+        seller_id: Seller ID
+
+    Returns:
+        Same dict as calculate_seller_balance(): total_earned, total_paid_out,
+        available_balance, pending_commissions, admin_adjustments
+    """
+    try:
+        result = (
+            supabase.table("seller_balances")
+            .select(_SELECT)
+            .eq("seller_id", seller_id)
+            .limit(1)
+            .execute()
+        )
+        if result.data:
+            return _from_row(result.data[0])
+    except APIError as e:
+        if e.code not in _MISSING_CODES:
+            raise
+        logger.warning("seller_balances table missing, recomputing from ledger")
+
+    # No snapshot row yet: recompute from the ledger
+    ledger_result = (
+        supabase.table("ledger_entries")
+        .select("amount, entry_type")
+        .eq("seller_id", seller_id)
+        .execute()
+    )
+    return calculate_seller_balance(ledger_result.data or [])
+
+
+async def get_seller_balance_async(db, seller_id: str) -> dict:
+    """Async variant of get_seller_balance() for AsyncDatabase."""
+    try:
+        result = (
+            await db.table("seller_balances")
+            .select(_SELECT)
+            .eq("seller_id", seller_id)
+            .limit(1)
+            .execute()
+        )
+        if result.data:
+            return _from_row(result.data[0])
+    except APIError as e:
+        if e.code not in _MISSING_CODES:
+            raise
+        logger.warning("seller_balances table missing, recomputing from ledger")
+
+    ledger_result = (
+        await db.table("ledger_entries")
+        .select("amount, entry_type")
+        .eq("seller_id", seller_id)
+        .execute()
+    )
+    return calculate_seller_balance(ledger_result.data or [])
+
+
+def reconcile_seller_balances(supabase, fix: bool = True) -> list[dict]:
+    """
+    Compare every snapshot row with a full recomputation from the ledger.
+
+    Args:
+        supabase: Sync Supabase client
+        fix: Overwrite drifted rows with the recomputed totals
+
+    Returns:
+        List of {"seller_id", "stored_balance", "actual_balance"} for sellers
+        whose snapshot did not match the ledger
+    """
+    rows = supabase.rpc("reconcile_seller_balances", {"p_fix": fix}).execute().data or []
+
+    mismatches = [
+        {
+            "seller_id": row["mismatch_seller_id"],
+            "stored_balance": float(row.get("stored_balance") or 0),
+            "actual_balance": float(row.get("actual_balance") or 0),
+        }
+        for row in rows
+    ]
+    for mismatch in mismatches:
+        logger.warning(
+            "Seller balance drift for %s: stored %.2f, ledger %.2f",
+            mismatch["seller_id"],
+            mismatch["stored_balance"],
+            mismatch["actual_balance"],
+        )
+    return mismatches
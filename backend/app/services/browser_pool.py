@@ -0,0 +1,193 @@
+"""
+Browser Pool
+
+Long-lived headless Chromium instances for the screenshot service.
+Launching Chromium costs far more than a capture, so browsers are started
+once and every capture gets its own isolated browser context. Browsers are
+recycled after a number of pages (Chromium leaks memory over time) or when
+they crash, and the number of concurrent contexts is bounded by the memory
+available on the machine.
+"""
+
+import asyncio
+import logging
+import os
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
+
+# Playwright import is conditional - not required for API server
+try:
+    from playwright.async_api import async_playwright
+    PLAYWRIGHT_AVAILABLE = True
+except ImportError:
+    PLAYWRIGHT_AVAILABLE = False
+
+logger = logging.getLogger(__name__)
+
+LAUNCH_ARGS = [
+    "--disable-gpu",
+    "--disable-dev-shm-usage",
+    "--no-sandbox",
+]
+
+# Pool configuration
+BROWSER_POOL_SIZE = int(os.getenv("SCREENSHOT_BROWSERS", "1"))
+BROWSER_MAX_PAGES = int(os.getenv("SCREENSHOT_BROWSER_MAX_PAGES", "100"))
+MAX_CONTEXTS = int(os.getenv("SCREENSHOT_MAX_CONTEXTS", "4"))
+CONTEXT_MEMORY_MB = int(os.getenv("SCREENSHOT_CONTEXT_MEMORY_MB", "250"))  # full-page 1920px render
+
+
+def available_memory_mb() -> int | None:
+    """MemAvailable from /proc/meminfo, None where it is not readable."""
+    try:
+        with open("/proc/meminfo") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) // 1024
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def memory_bounded_concurrency(
+    max_contexts: int = MAX_CONTEXTS,
+    context_memory_mb: int = CONTEXT_MEMORY_MB,
+) -> int:
+    """Concurrent contexts that fit into available memory (at least 1)."""
+    available = available_memory_mb()
+    if available is None:
+        return max_contexts
+    return max(1, min(max_contexts, available // context_memory_mb))
+
+
+class _PooledBrowser:
+    def __init__(self, browser):
+        self.browser = browser
+        self.pages_served = 0
+        self.active = 0
+        self.retired = False
+
+
+class BrowserPool:
+    """
+    Pool of Chromium browsers handing out isolated pages.
+
+    Usage:
+        async with pool.page(viewport={"width": 1920, "height": 1080}) as page:
+            await page.goto(url)
+    """
+
+    def __init__(
+        self,
+        size: int = BROWSER_POOL_SIZE,
+        max_pages: int = BROWSER_MAX_PAGES,
+        max_concurrency: int | None = None,
+    ):
+        self.size = max(1, size)
+        self.max_pages = max_pages
+        self.max_concurrency = max_concurrency or memory_bounded_concurrency()
+        self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        self._lock = asyncio.Lock()
+        self._browsers: list[_PooledBrowser] = []
+        self._playwright = None
+        self.launches = 0
+
+    async def _launch(self):
+        """Start one Chromium instance."""
+        if not PLAYWRIGHT_AVAILABLE:
+            raise RuntimeError(
+                "Playwright is not installed. Run: pip install playwright && playwright install chromium"
+            )
+        if self._playwright is None:
+            self._playwright = await async_playwright().start()
+        return await self._playwright.chromium.launch(headless=True, args=LAUNCH_ARGS)
+
+    async def _acquire_browser(self) -> _PooledBrowser:
+        async with self._lock:
+            # Drop browsers that crashed or were closed underneath us
+            for pooled in [b for b in self._browsers if not b.browser.is_connected()]:
+                logger.warning("Chromium disconnected, replacing it")
+                self._browsers.remove(pooled)
+
+            if len(self._browsers) < self.size:
+                pooled = _PooledBrowser(await self._launch())
+                self.launches += 1
+                self._browsers.append(pooled)
+                return pooled
+
+            return min(self._browsers, key=lambda b: b.active)
+
+    async def _release_browser(self, pooled: _PooledBrowser) -> None:
+        pooled.active -= 1
+        if pooled.pages_served >= self.max_pages and not pooled.retired:
+            # New captures get a fresh browser; this one closes once idle
+            pooled.retired = True
+            async with self._lock:
+                if pooled in self._browsers:
+                    self._browsers.remove(pooled)
+        if pooled.retired and pooled.active == 0:
+            try:
+                await pooled.browser.close()
+            except Exception as e:
+                logger.warning("Closing recycled Chromium failed: %s", e)
+
+    @asynccontextmanager
+    async def page(self, viewport: dict, device_scale_factor: float = 1) -> AsyncIterator:
+        """
+        Isolated page in a fresh browser context.
+
+        Args:
+            viewport: {"width", "height"}
+            device_scale_factor: Pixel density of the context
+        """
+        async with self._semaphore:
+            pooled = await self._acquire_browser()
+            pooled.active += 1
+            pooled.pages_served += 1
+            context = None
+            try:
+                context = await pooled.browser.new_context(
+                    viewport=viewport,
+                    device_scale_factor=device_scale_factor,
+                )
+                yield await context.new_page()
+            finally:
+                if context is not None:
+                    try:
+                        await context.close()
+                    except Exception:
+                        # Browser crashed mid-capture; next acquire replaces it
+                        pass
+                await self._release_browser(pooled)
+
+    async def close(self) -> None:
+        """Close all browsers and the Playwright driver."""
+        async with self._lock:
+            browsers, self._browsers = self._browsers, []
+        for pooled in browsers:
+            try:
+                await pooled.browser.close()
+            except Exception:
+                pass
+        if self._playwright is not None:
+            await self._playwright.stop()
+            self._playwright = None
+
+
+_pool: BrowserPool | None = None
+
+
+def get_browser_pool() -> BrowserPool:
+    """Process-wide browser pool, created on first use."""
+    global _pool
+    if _pool is None:
+        _pool = BrowserPool()
+    return _pool
+
+
+async def close_browser_pool() -> None:
+    """Close the process-wide pool (API/worker shutdown)."""
+    global _pool
+    if _pool is not None:
+        await _pool.close()
+        _pool = None
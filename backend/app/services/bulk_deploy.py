@@ -0,0 +1,173 @@
+"""
+Bulk Deployment Service
+
+Deploys many website versions in one job (e.g. redeploying every live site
+after a template fix). Versions are prefetched in chunks, deployed
+concurrently within a rate budget on top of the shared Vercel client, and
+the resulting website_versions updates are written in batches.
+"""
+
+import asyncio
+import logging
+import os
+from typing import Awaitable, Callable
+
+from ..database import get_supabase
+from .deployment import (
+    apply_version_updates,
+    deploy_html_to_vercel,
+    deployed_fields,
+    version_project_name,
+)
+
+logger = logging.getLogger(__name__)
+
+BULK_DEPLOY_CONCURRENCY = int(os.getenv("BULK_DEPLOY_CONCURRENCY", "4"))
+# Deployments started per minute (0 = only the concurrency limit applies)
+BULK_DEPLOY_RATE_PER_MINUTE = int(os.getenv("BULK_DEPLOY_RATE_PER_MINUTE", "60"))
+
+FETCH_CHUNK_SIZE = 100
+UPDATE_BATCH_SIZE = 25
+SELECT_PAGE_SIZE = 1000
+
+# website_versions columns the admin endpoint may filter on
+FILTER_FIELDS = ("project_id", "deployment_status", "status", "is_current")
+
+
+class RateLimiter:
+    """Spaces out acquire() calls to at most `rate_per_minute` (0 = unlimited)."""
+
+    def __init__(self, rate_per_minute: int):
+        self.interval = 60.0 / rate_per_minute if rate_per_minute > 0 else 0.0
+        self._next_at = 0.0
+
+    async def acquire(self) -> None:
+        if not self.interval:
+            return
+        now = asyncio.get_running_loop().time()
+        start_at = max(now, self._next_at)
+        self._next_at = start_at + self.interval
+        if start_at > now:
+            await asyncio.sleep(start_at - now)
+
+
+def select_version_ids(supabase, filters: dict) -> list[str]:
+    """
+    IDs of website versions matching equality filters.
+
+    Args:
+        supabase: Supabase client
+        filters: {column: value} for columns in FILTER_FIELDS
+
+    Returns:
+        Matching version IDs, oldest first
+    """
+    unknown = set(filters) - set(FILTER_FIELDS)
+    if unknown:
+        raise ValueError(f"Unsupported filter fields: {', '.join(sorted(unknown))}")
+
+    version_ids = []
+    offset = 0
+    while True:
+        query = supabase.table("website_versions").select("id")
+        for column, value in filters.items():
+            query = query.eq(column, value)
+        result = query.order("created_at").range(offset, offset + SELECT_PAGE_SIZE - 1).execute()
+
+        rows = result.data or []
+        version_ids.extend(row["id"] for row in rows)
+        if len(rows) < SELECT_PAGE_SIZE:
+            return version_ids
+        offset += SELECT_PAGE_SIZE
+
+
+def fetch_versions(supabase, version_ids: list[str]) -> dict[str, dict]:
+    """Version rows with project/business names, one query per chunk."""
+    versions = {}
+    for start in range(0, len(version_ids), FETCH_CHUNK_SIZE):
+        chunk = version_ids[start:start + FETCH_CHUNK_SIZE]
+        result = supabase.table("website_versions").select(
+            "id, html_content, deployment_status, website_projects(domain, businesses(name))"
+        ).in_("id", chunk).execute()
+        for row in result.data or []:
+            versions[row["id"]] = row
+    return versions
+
+
+async def bulk_deploy_versions(
+    version_ids: list[str],
+    on_progress: Callable[[dict], Awaitable[None]] | None = None,
+    concurrency: int = BULK_DEPLOY_CONCURRENCY,
+    rate_per_minute: int = BULK_DEPLOY_RATE_PER_MINUTE,
+) -> dict:
+    """
+    Deploy many versions to Vercel.
+
+    A failed version does not stop the others; it is reported in the
+    results and marked deployment_status = 'failed', unless it was already
+    deployed: its previous deployment still serves, so it stays 'deployed'.
+
+    Args:
+        version_ids: Versions to deploy (duplicates are ignored)
+        on_progress: Awaited with progress counters after each update batch
+        concurrency: Deployments in flight at once
+        rate_per_minute: Deployments started per minute (0 = unlimited)
+
+    Returns:
+        Dict with total/done/deployed/failed counts and per-version results
+    """
+    supabase = get_supabase()
+    version_ids = list(dict.fromkeys(version_ids))
+    versions = fetch_versions(supabase, version_ids)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    limiter = RateLimiter(rate_per_minute)
+    progress = {"total": len(version_ids), "done": 0, "deployed": 0, "failed": 0}
+    results: dict[str, dict] = {}
+    pending: list[dict] = []
+
+    async def flush() -> None:
+        batch = pending[:]
+        pending.clear()
+        apply_version_updates(supabase, batch)
+        if on_progress:
+            await on_progress(dict(progress))
+
+    async def deploy_one(version_id: str) -> None:
+        version = versions.get(version_id)
+        try:
+            if version is None:
+                raise ValueError(f"Version {version_id} not found")
+            if not version.get("html_content"):
+                raise ValueError("Version has no HTML content to deploy")
+
+            async with semaphore:
+                await limiter.acquire()
+                deployment = await deploy_html_to_vercel(
+                    version_id=version_id,
+                    html_content=version["html_content"],
+                    project_name=version_project_name(version),
+                )
+        except Exception as e:
+            logger.warning("Bulk deploy of version %s failed: %s", version_id, e)
+            results[version_id] = {"status": "failed", "error": str(e)}
+            progress["failed"] += 1
+            if version is not None and version.get("deployment_status") != "deployed":
+                pending.append({"id": version_id, "deployment_status": "failed"})
+        else:
+            results[version_id] = {
+                "status": "deployed",
+                "url": deployment["url"],
+                "deployment_id": deployment["deployment_id"],
+            }
+            progress["deployed"] += 1
+            pending.append({"id": version_id, **deployed_fields(deployment)})
+
+        progress["done"] += 1
+        if len(pending) >= UPDATE_BATCH_SIZE:
+            await flush()
+
+    await asyncio.gather(*(deploy_one(version_id) for version_id in version_ids))
+    await flush()
+
+    return {**progress, "results": results}
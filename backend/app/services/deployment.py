@@ -1,26 +1,251 @@
 """
 Deployment Service
 
-Handles deployment of website versions to Vercel.
+Handles deployment of website versions to Vercel. All API calls go through
+the shared pooled client in vercel_client.py.
+
+Files are content-addressed: each is uploaded once by SHA1 digest
+(/v2/files) and deployments only reference digests. An upload manifest
+remembers digests already sent, so redeploying unchanged content uploads
+nothing.
 """
 
-import os
+import asyncio
+import hashlib
 import json
-import httpx
+import logging
+import os
+import time
 from datetime import datetime
 
+from postgrest.exceptions import APIError
+
 from ..database import get_supabase
+from .vercel_client import get_vercel_client
+
+logger = logging.getLogger(__name__)
+
+# Optional JSON file keeping the upload manifest across restarts
+VERCEL_UPLOAD_MANIFEST = os.getenv("VERCEL_UPLOAD_MANIFEST")
+# Vercel garbage-collects unreferenced uploads; trust the manifest this long
+UPLOAD_MANIFEST_TTL_HOURS = int(os.getenv("VERCEL_UPLOAD_MANIFEST_TTL_HOURS", "24"))
+UPLOAD_MANIFEST_MAX_ENTRIES = 10000
+
+
+class UploadManifest:
+    """
+    Digests already uploaded to Vercel, with upload time.
+
+    Args:
+        path: JSON file to load from and save to (None = memory only)
+        ttl_seconds: Entries older than this are treated as not uploaded
+        max_entries: Oldest entries are dropped beyond this
+    """
+
+    def __init__(
+        self,
+        path: str | None = None,
+        ttl_seconds: float = UPLOAD_MANIFEST_TTL_HOURS * 3600,
+        max_entries: int = UPLOAD_MANIFEST_MAX_ENTRIES,
+    ):
+        self.path = path
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._uploaded: dict[str, float] = {}
+        if path:
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path) as f:
+                self._uploaded = {k: float(v) for k, v in json.load(f).items()}
+        except FileNotFoundError:
+            pass
+        except (OSError, ValueError, AttributeError) as e:
+            logger.warning("Ignoring unreadable upload manifest %s: %s", self.path, e)
+
+    def has(self, digest: str) -> bool:
+        uploaded_at = self._uploaded.get(digest)
+        return uploaded_at is not None and time.time() - uploaded_at < self.ttl_seconds
+
+    def add(self, digest: str) -> None:
+        self._uploaded.pop(digest, None)
+        self._uploaded[digest] = time.time()
+        while len(self._uploaded) > self.max_entries:
+            del self._uploaded[next(iter(self._uploaded))]
+
+    def discard(self, digest: str) -> None:
+        self._uploaded.pop(digest, None)
+
+    def save(self) -> None:
+        if not self.path:
+            return
+        tmp_path = f"{self.path}.tmp"
+        try:
+            with open(tmp_path, "w") as f:
+                json.dump(self._uploaded, f)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            logger.warning("Could not save upload manifest %s: %s", self.path, e)
+
+
+_upload_manifest: UploadManifest | None = None
+
+
+def get_upload_manifest() -> UploadManifest:
+    """Process-wide upload manifest, loaded on first use."""
+    global _upload_manifest
+    if _upload_manifest is None:
+        _upload_manifest = UploadManifest(VERCEL_UPLOAD_MANIFEST)
+    return _upload_manifest
+
+
+def file_digest(data: bytes) -> str:
+    """SHA1 hex digest, the content address Vercel uses for files."""
+    return hashlib.sha1(data).hexdigest()
+
+
+async def upload_file(data: bytes, digest: str | None = None) -> str:
+    """
+    Upload one file to Vercel by digest.
+
+    Args:
+        data: File content
+        digest: Precomputed SHA1 of data
+
+    Returns:
+        The digest
+    """
+    digest = digest or file_digest(data)
+    response = await get_vercel_client().request(
+        "POST",
+        "/v2/files",
+        retry=True,  # content-addressed: repeating an upload is harmless
+        content=data,
+        headers={
+            "Content-Type": "application/octet-stream",
+            "x-vercel-digest": digest,
+        },
+        timeout=60.0,
+    )
+
+    if response.status_code not in (200, 201):
+        raise RuntimeError(f"Vercel file upload failed: {response.status_code} - {response.text}")
+
+    return digest
+
+
+async def upload_files(files: dict[str, bytes | str]) -> list[dict]:
+    """
+    Upload the files the remote does not have yet.
+
+    Files whose digest is in the upload manifest are skipped, as are
+    duplicates within `files`; the rest are uploaded concurrently.
+
+    Args:
+        files: {path in deployment: content}
+
+    Returns:
+        Deployment file entries [{"file", "sha", "size"}]
+    """
+    manifest = get_upload_manifest()
+    entries = []
+    to_upload: dict[str, bytes] = {}
+
+    for path, content in files.items():
+        data = content.encode("utf-8") if isinstance(content, str) else content
+        digest = file_digest(data)
+        entries.append({"file": path, "sha": digest, "size": len(data)})
+        if not manifest.has(digest):
+            to_upload[digest] = data
+
+    if to_upload:
+        await asyncio.gather(*(upload_file(data, digest) for digest, data in to_upload.items()))
+        for digest in to_upload:
+            manifest.add(digest)
+        manifest.save()
+
+    return entries
+
+
+def _missing_digests(response) -> list[str]:
+    """Digests Vercel reports as missing when creating a deployment."""
+    if response.status_code != 400:
+        return []
+    try:
+        error = response.json().get("error") or {}
+    except ValueError:
+        return []
+    if error.get("code") != "missing_files":
+        return []
+    return list(error.get("missing") or [])
+
+
+def deployment_name(version_id: str, project_name: str | None = None) -> str:
+    """Vercel deployment name for a version."""
+    if project_name:
+        return f"webomat-{project_name.lower().replace(' ', '-')[:20]}-{version_id[:8]}"
+    return f"webomat-preview-{version_id[:8]}"
+
+
+async def deploy_files_to_vercel(
+    version_id: str,
+    files: dict[str, bytes | str],
+    project_name: str | None = None,
+) -> dict:
+    """
+    Deploy a static site (HTML, CSS, JS, images) to Vercel.
+
+    Files are uploaded by digest first, then the deployment references the
+    digests. If Vercel no longer has a file the manifest lists, it is
+    uploaded again and the deployment retried once.
+
+    Args:
+        version_id: Website version ID (used for naming)
+        files: {path in deployment: content}, must include index.html
+        project_name: Optional project name prefix
+
+    Returns:
+        Dict with deployment info (url, id, etc.)
+    """
+    if "index.html" not in files:
+        raise ValueError("Deployment must contain index.html")
+
+    entries = await upload_files(files)
+
+    body = {
+        "name": deployment_name(version_id, project_name),
+        "files": entries,
+        "target": "production",
+        "projectSettings": {
+            "framework": None,  # Static HTML
+        },
+    }
+
+    response = await get_vercel_client().request("POST", "/v13/deployments", json=body, timeout=60.0)
 
+    missing = _missing_digests(response)
+    if missing:
+        # Manifest was stale (upload expired remotely); resend and retry once
+        logger.info("Vercel is missing %d uploaded files, re-uploading", len(missing))
+        manifest = get_upload_manifest()
+        for digest in missing:
+            manifest.discard(digest)
+        await upload_files(files)
+        response = await get_vercel_client().request("POST", "/v13/deployments", json=body, timeout=60.0)
 
-VERCEL_API_URL = "https://api.vercel.com"
+    if response.status_code not in (200, 201):
+        error_detail = response.text
+        raise RuntimeError(f"Vercel deployment failed: {response.status_code} - {error_detail}")
 
+    result = response.json()
 
-def get_vercel_token() -> str:
-    """Get Vercel API token from environment."""
-    token = os.getenv("VERCEL_DEPLOY_TOKEN") or os.getenv("VERCEL_TOKEN")
-    if not token:
-        raise RuntimeError("VERCEL_DEPLOY_TOKEN environment variable not set")
-    return token
+    return {
+        "deployment_id": result.get("id"),
+        "url": f"https://{result.get('url')}",
+        "ready_state": result.get("readyState"),
+        "created_at": result.get("createdAt"),
+    }
 
 
 async def deploy_html_to_vercel(
@@ -39,56 +264,14 @@ async def deploy_html_to_vercel(
     Returns:
         Dict with deployment info (url, id, etc.)
     """
-    token = get_vercel_token()
+    return await deploy_files_to_vercel(
+        version_id=version_id,
+        files={"index.html": html_content},
+        project_name=project_name,
+    )
 
-    # Create deployment name
-    name = f"webomat-preview-{version_id[:8]}"
-    if project_name:
-        name = f"webomat-{project_name.lower().replace(' ', '-')[:20]}-{version_id[:8]}"
-
-    # Prepare files for deployment
-    # Vercel expects files in a specific format
-    files = [
-        {
-            "file": "index.html",
-            "data": html_content,
-        },
-    ]
-
-    # Create deployment via Vercel API
-    async with httpx.AsyncClient() as client:
-        response = await client.post(
-            f"{VERCEL_API_URL}/v13/deployments",
-            headers={
-                "Authorization": f"Bearer {token}",
-                "Content-Type": "application/json",
-            },
-            json={
-                "name": name,
-                "files": files,
-                "target": "production",
-                "projectSettings": {
-                    "framework": None,  # Static HTML
-                },
-            },
-            timeout=60.0,
-        )
-
-        if response.status_code not in (200, 201):
-            error_detail = response.text
-            raise RuntimeError(f"Vercel deployment failed: {response.status_code} - {error_detail}")
-
-        result = response.json()
-
-        return {
-            "deployment_id": result.get("id"),
-            "url": f"https://{result.get('url')}",
-            "ready_state": result.get("readyState"),
-            "created_at": result.get("createdAt"),
-        }
-
-
-async def get_deployment_status(deployment_id: str) -> dict:
+
+async def get_deployment_status(deployment_id: str) -> dict | None:
     """
     Get status of a Vercel deployment.
 
@@ -96,30 +279,27 @@ async def get_deployment_status(deployment_id: str) -> dict:
         deployment_id: Vercel deployment ID
 
     Returns:
-        Dict with deployment status
+        Dict with deployment status, or None if Vercel answers 404
+        (the deployment no longer exists)
     """
-    token = get_vercel_token()
+    response = await get_vercel_client().request(
+        "GET", f"/v13/deployments/{deployment_id}", timeout=30.0
+    )
 
-    async with httpx.AsyncClient() as client:
-        response = await client.get(
-            f"{VERCEL_API_URL}/v13/deployments/{deployment_id}",
-            headers={
-                "Authorization": f"Bearer {token}",
-            },
-            timeout=30.0,
-        )
+    if response.status_code == 404:
+        return None
 
-        if response.status_code != 200:
-            raise RuntimeError(f"Failed to get deployment status: {response.status_code}")
+    if response.status_code != 200:
+        raise RuntimeError(f"Failed to get deployment status: {response.status_code}")
 
-        result = response.json()
+    result = response.json()
 
-        return {
-            "deployment_id": result.get("id"),
-            "url": result.get("url"),
-            "ready_state": result.get("readyState"),
-            "state": result.get("state"),
-        }
+    return {
+        "deployment_id": result.get("id"),
+        "url": result.get("url"),
+        "ready_state": result.get("readyState"),
+        "state": result.get("state"),
+    }
 
 
 async def delete_deployment(deployment_id: str) -> bool:
@@ -132,19 +312,94 @@ async def delete_deployment(deployment_id: str) -> bool:
     Returns:
         True if deleted successfully
     """
-    token = get_vercel_token()
+    response = await get_vercel_client().request(
+        "DELETE", f"/v13/deployments/{deployment_id}", timeout=30.0
+    )
+
+    # 200 or 204 = success, 404 = already deleted
+    return response.status_code in (200, 204, 404)
+
+
+def version_project_name(version: dict) -> str | None:
+    """Deployment name prefix for a version row joined with its project and business."""
+    project = version.get("website_projects") or {}
+    business = project.get("businesses") or {}
+    return business.get("name") or project.get("domain")
+
+
+def deployed_fields(deployment: dict) -> dict:
+    """website_versions columns for a successful deployment."""
+    return {
+        "public_url": deployment["url"],
+        "deployment_id": deployment["deployment_id"],
+        "deployment_platform": "vercel",
+        "deployment_status": "deployed",
+        "deployment_ready_state": deployment.get("ready_state"),
+        "published_at": datetime.utcnow().isoformat(),
+    }
+
+
+# website_versions columns added by migration 013
+READY_STATE_COLUMNS = ("deployment_ready_state", "deployment_checked_at")
+
+
+def update_versions(supabase, version_ids: list[str], fields: dict) -> None:
+    """
+    Set the same columns on one or more website_versions rows.
 
-    async with httpx.AsyncClient() as client:
-        response = await client.delete(
-            f"{VERCEL_API_URL}/v13/deployments/{deployment_id}",
-            headers={
-                "Authorization": f"Bearer {token}",
-            },
-            timeout=30.0,
-        )
+    Without migration 013 the ready-state columns are dropped from the
+    update instead of failing the deployment.
+    """
+    def run(values: dict) -> None:
+        query = supabase.table("website_versions").update(values)
+        if len(version_ids) == 1:
+            query.eq("id", version_ids[0]).execute()
+        else:
+            query.in_("id", version_ids).execute()
+
+    try:
+        run(fields)
+    except APIError as e:
+        legacy_fields = {k: v for k, v in fields.items() if k not in READY_STATE_COLUMNS}
+        if e.code not in ("42703", "PGRST204") or legacy_fields == fields:
+            raise
+        logger.warning("deployment_ready_state column missing, skipping ready state")
+        if legacy_fields:
+            run(legacy_fields)
+
+
+def apply_version_updates(supabase, updates: list[dict]) -> None:
+    """
+    Write a batch of deployment results to website_versions.
+
+    Uses the `apply_version_deployments` SQL function (supabase/migrations/012,
+    013): one statement for the whole batch. Without it, rows that set the
+    same values (e.g. all failures, all READY) share one IN update and the
+    rest are updated row by row.
+
+    Args:
+        supabase: Supabase client
+        updates: Rows with "id" plus the columns to set
+    """
+    if not updates:
+        return
 
-        # 200 or 204 = success, 404 = already deleted
-        return response.status_code in (200, 204, 404)
+    try:
+        supabase.rpc("apply_version_deployments", {"p_updates": updates}).execute()
+        return
+    except APIError as e:
+        if e.code not in ("PGRST202", "42883"):
+            raise
+        logger.warning("apply_version_deployments function missing, updating rows by value")
+
+    groups: dict[str, tuple[dict, list[str]]] = {}
+    for update in updates:
+        fields = {k: v for k, v in update.items() if k != "id"}
+        key = json.dumps(fields, sort_keys=True, default=str)
+        groups.setdefault(key, (fields, []))[1].append(update["id"])
+
+    for fields, version_ids in groups.values():
+        update_versions(supabase, version_ids, fields)
 
 
 async def deploy_version(version_id: str) -> dict:
@@ -173,26 +428,15 @@ async def deploy_version(version_id: str) -> dict:
     if not html_content:
         raise ValueError("Version has no HTML content to deploy")
 
-    # Get project name from business
-    project = version.get("website_projects", {})
-    business = project.get("businesses", {})
-    project_name = business.get("name") or project.get("domain")
-
     # Deploy to Vercel
     deployment = await deploy_html_to_vercel(
         version_id=version_id,
         html_content=html_content,
-        project_name=project_name,
+        project_name=version_project_name(version),
     )
 
     # Update version with deployment info
-    supabase.table("website_versions").update({
-        "public_url": deployment["url"],
-        "deployment_id": deployment["deployment_id"],
-        "deployment_platform": "vercel",
-        "deployment_status": "deployed",
-        "published_at": datetime.utcnow().isoformat(),
-    }).eq("id", version_id).execute()
+    update_versions(supabase, [version_id], deployed_fields(deployment))
 
     return deployment
 
@@ -0,0 +1,136 @@
+"""
+Deployment Status Poller
+
+Follows Vercel deployments until they reach a final state. The periodic
+poll_deployment_status job collects every version whose deployment is
+still deploying or not yet READY, checks them concurrently through the
+shared Vercel client and writes the results back in batches, so the CRM
+shows accurate deployment status without per-version polling.
+"""
+
+import asyncio
+import logging
+import os
+from datetime import datetime
+
+from postgrest.exceptions import APIError
+
+from ..database import get_supabase
+from .deployment import apply_version_updates, get_deployment_status
+
+logger = logging.getLogger(__name__)
+
+STATUS_POLL_CONCURRENCY = int(os.getenv("DEPLOYMENT_POLL_CONCURRENCY", "8"))
+# Versions checked per run, least recently checked first
+STATUS_POLL_LIMIT = int(os.getenv("DEPLOYMENT_POLL_LIMIT", "500"))
+UPDATE_BATCH_SIZE = 50
+
+FINAL_READY_STATES = ("READY", "ERROR", "CANCELED")
+FAILED_READY_STATES = ("ERROR", "CANCELED")
+
+
+def select_pending_deployments(supabase, limit: int = STATUS_POLL_LIMIT) -> list[dict]:
+    """
+    Versions whose Vercel deployment has not reached a final state.
+
+    Returns:
+        Rows with id, deployment_id, deployment_status, deployment_ready_state
+        (empty if migration 013 is missing)
+    """
+    try:
+        result = supabase.table("website_versions").select(
+            "id, deployment_id, deployment_status, deployment_ready_state"
+        ).not_.is_(
+            "deployment_id", "null"
+        ).in_(
+            "deployment_status", ["deploying", "deployed"]
+        ).or_(
+            "deployment_ready_state.is.null,"
+            f"deployment_ready_state.not.in.({','.join(FINAL_READY_STATES)})"
+        ).order(
+            "deployment_checked_at", nullsfirst=True
+        ).limit(limit).execute()
+    except APIError as e:
+        if e.code not in ("42703", "PGRST204"):
+            raise
+        logger.warning("deployment_ready_state column missing, skipping status poll")
+        return []
+
+    return result.data or []
+
+
+def has_pending_deployments() -> bool:
+    """Whether any deployment still needs a status poll (skip the job otherwise)."""
+    return bool(select_pending_deployments(get_supabase(), limit=1))
+
+
+def status_update(version: dict, status: dict | None, checked_at: str) -> dict:
+    """website_versions columns for one fetched deployment status."""
+    if status is None:
+        # Deployment deleted on Vercel
+        ready_state = "ERROR"
+    else:
+        ready_state = status.get("ready_state") or status.get("state")
+
+    update = {
+        "id": version["id"],
+        "deployment_ready_state": ready_state,
+        "deployment_checked_at": checked_at,
+    }
+    if ready_state == "READY":
+        update["deployment_status"] = "deployed"
+    elif ready_state in FAILED_READY_STATES:
+        update["deployment_status"] = "failed"
+    return update
+
+
+async def poll_deployment_statuses(
+    limit: int = STATUS_POLL_LIMIT,
+    concurrency: int = STATUS_POLL_CONCURRENCY,
+) -> dict:
+    """
+    Check pending deployments and record their state.
+
+    Args:
+        limit: Maximum versions to check in this run
+        concurrency: Status requests in flight at once
+
+    Returns:
+        Counts of checked, ready, failed, still pending and errored versions
+    """
+    supabase = get_supabase()
+    versions = select_pending_deployments(supabase, limit)
+
+    semaphore = asyncio.Semaphore(concurrency)
+    checked_at = datetime.utcnow().isoformat()
+    stats = {"checked": 0, "ready": 0, "failed": 0, "pending": 0, "errors": 0}
+    pending: list[dict] = []
+
+    async def check(version: dict) -> None:
+        try:
+            async with semaphore:
+                status = await get_deployment_status(version["deployment_id"])
+        except Exception as e:
+            logger.warning("Status check of deployment %s failed: %s", version["deployment_id"], e)
+            stats["errors"] += 1
+            return
+
+        update = status_update(version, status, checked_at)
+        stats["checked"] += 1
+        if update.get("deployment_status") == "deployed":
+            stats["ready"] += 1
+        elif update.get("deployment_status") == "failed":
+            stats["failed"] += 1
+        else:
+            stats["pending"] += 1
+
+        pending.append(update)
+        if len(pending) >= UPDATE_BATCH_SIZE:
+            batch = pending[:]
+            pending.clear()
+            apply_version_updates(supabase, batch)
+
+    await asyncio.gather(*(check(version) for version in versions))
+    apply_version_updates(supabase, pending)
+
+    return stats
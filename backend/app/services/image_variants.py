@@ -0,0 +1,85 @@
+"""
+Image Variants Service
+
+Turns a PNG capture into compressed, responsive variants: WebP (and
+optionally AVIF) at a configurable quality, in a set of widths for srcset.
+Encoding is CPU-bound; call encode_variants() through asyncio.to_thread.
+"""
+
+import io
+import os
+
+from PIL import Image, features
+
+SCREENSHOT_FORMATS = [
+    f.strip() for f in os.getenv("SCREENSHOT_FORMATS", "webp").split(",") if f.strip()
+]
+SCREENSHOT_QUALITY = int(os.getenv("SCREENSHOT_QUALITY", "80"))
+RESPONSIVE_WIDTHS = [400, 800, 1200, 1920]
+
+# WebP cannot encode images taller than this; long pages are cut off
+MAX_HEIGHT = 16383
+
+CONTENT_TYPES = {
+    "webp": "image/webp",
+    "avif": "image/avif",
+    "png": "image/png",
+}
+
+
+def available_formats(formats: list[str] | None = None) -> list[str]:
+    """Requested formats this Pillow build can encode (WebP first if present)."""
+    formats = formats or SCREENSHOT_FORMATS
+    usable = [f for f in formats if f in CONTENT_TYPES and (f == "png" or features.check(f))]
+    return usable or ["png"]
+
+
+def variant_widths(source_width: int) -> list[int]:
+    """Responsive widths for an image `source_width` px wide, largest last."""
+    return [w for w in RESPONSIVE_WIDTHS if w < source_width] + [source_width]
+
+
+def encode_variants(
+    image_bytes: bytes,
+    widths: list[int],
+    formats: list[str] | None = None,
+    quality: int = SCREENSHOT_QUALITY,
+) -> dict[tuple[str, int], bytes]:
+    """
+    Encode a capture in every format and width.
+
+    Args:
+        image_bytes: Source PNG
+        widths: Target widths (images are never upscaled)
+        formats: Output formats, default SCREENSHOT_FORMATS
+        quality: Encoder quality 0-100
+
+    Returns:
+        {(format, width): encoded bytes}
+    """
+    formats = available_formats(formats)
+    variants = {}
+
+    with Image.open(io.BytesIO(image_bytes)) as source:
+        source = source.convert("RGB")
+        if source.height > MAX_HEIGHT:
+            source = source.crop((0, 0, source.width, MAX_HEIGHT))
+
+        for width in widths:
+            if width < source.width:
+                height = max(1, round(source.height * width / source.width))
+                resized = source.resize((width, min(height, MAX_HEIGHT)), Image.LANCZOS)
+            else:
+                resized = source
+
+            for fmt in formats:
+                output = io.BytesIO()
+                if fmt == "png":
+                    resized.save(output, format="PNG", optimize=True)
+                elif fmt == "webp":
+                    resized.save(output, format="WEBP", quality=quality, method=4)
+                else:
+                    resized.save(output, format="AVIF", quality=quality)
+                variants[(fmt, width)] = output.getvalue()
+
+    return variants
@@ -0,0 +1,69 @@
+"""
+Invoice Number Service
+
+Allocates issued invoice numbers (YYYY-NNNN) from the per-year counter in
+the database (`next_invoice_number()`, migration 016). The counter is
+incremented atomically, so concurrent requests never get the same number.
+"""
+
+import logging
+from datetime import datetime
+
+from postgrest.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+PAGE_SIZE = 1000
+
+
+def format_invoice_number(year: int, number: int) -> str:
+    """Invoice number in the YYYY-NNNN format."""
+    return f"{year}-{number:04d}"
+
+
+def _next_number_from_table(supabase, year: int) -> str:
+    """
+    Next number after the highest one issued this year (not concurrency-safe).
+
+    Numbers are compared as integers: as text, 2025-9999 sorts above
+    2025-10000.
+    """
+    last_number = 0
+    offset = 0
+    while True:
+        rows = (
+            supabase.table("invoices_issued")
+            .select("invoice_number")
+            .like("invoice_number", f"{year}-%")
+            .range(offset, offset + PAGE_SIZE - 1)
+            .execute()
+        ).data or []
+        for row in rows:
+            suffix = row["invoice_number"].split("-", 1)[1]
+            if suffix.isdigit():
+                last_number = max(last_number, int(suffix))
+        if len(rows) < PAGE_SIZE:
+            return format_invoice_number(year, last_number + 1)
+        offset += PAGE_SIZE
+
+
+def allocate_invoice_number(supabase, year: int | None = None) -> str:
+    """
+    Allocate the next issued invoice number for a year.
+
+    Args:
+        supabase: Supabase client
+        year: Invoice year (default: current UTC year)
+
+    Returns:
+        Invoice number, e.g. 2025-0001
+    """
+    year = year or datetime.utcnow().year
+
+    try:
+        return supabase.rpc("next_invoice_number", {"p_year": year}).execute().data
+    except APIError as e:
+        if e.code not in ("PGRST202", "42883"):
+            raise
+        logger.warning("next_invoice_number function missing, numbering from invoices_issued")
+        return _next_number_from_table(supabase, year)
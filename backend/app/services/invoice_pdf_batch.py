@@ -0,0 +1,195 @@
+"""
+Invoice PDF Batch Service
+
+Generates PDFs for many issued invoices at once (month-end close). Invoices
+are selected by issue date range and/or status; businesses, projects and
+platform billing info are prefetched in bulk. PDFs are rendered in
+parallel on the PDF process pool and uploaded to storage concurrently.
+"""
+
+import asyncio
+import logging
+from typing import Awaitable, Callable
+
+from ..config import get_settings
+from ..database import get_supabase
+from .pdf import (
+    generate_invoice_issued_pdf,
+    invoice_issued_fingerprint,
+    invoice_issued_storage_path,
+    save_pdf_path,
+    stored_pdf_url,
+    upload_pdf_to_storage,
+)
+from .pdf_executor import get_pdf_executor
+
+logger = logging.getLogger(__name__)
+
+FETCH_CHUNK_SIZE = 100
+SELECT_PAGE_SIZE = 1000
+PROGRESS_EVERY = 25
+
+
+def filter_invoices(
+    query,
+    date_from: str | None = None,
+    date_to: str | None = None,
+    statuses: list[str] | None = None,
+    only_missing: bool = False,
+):
+    """
+    Apply the batch filter to an invoices_issued query (sync or async client).
+
+    Args:
+        query: invoices_issued select query
+        date_from: First issue_date, YYYY-MM-DD (inclusive)
+        date_to: Last issue_date, YYYY-MM-DD (inclusive)
+        statuses: Invoice statuses to include
+        only_missing: Only invoices without a PDF yet
+
+    Returns:
+        The filtered query
+    """
+    if date_from:
+        query = query.gte("issue_date", date_from)
+    if date_to:
+        query = query.lte("issue_date", date_to)
+    if statuses:
+        query = query.in_("status", statuses)
+    if only_missing:
+        query = query.is_("pdf_path", "null")
+    return query
+
+
+def select_invoices(supabase, **invoice_filter) -> list[dict]:
+    """
+    Issued invoices matching the batch filter (see filter_invoices()).
+
+    Returns:
+        Invoice rows ordered by issue date and number
+    """
+    invoices = []
+    offset = 0
+    while True:
+        query = filter_invoices(supabase.table("invoices_issued").select("*"), **invoice_filter)
+        result = query.order("issue_date").order("invoice_number").range(
+            offset, offset + SELECT_PAGE_SIZE - 1
+        ).execute()
+
+        rows = result.data or []
+        invoices.extend(rows)
+        if len(rows) < SELECT_PAGE_SIZE:
+            return invoices
+        offset += SELECT_PAGE_SIZE
+
+
+def fetch_rows_by_id(supabase, table: str, ids) -> dict[str, dict]:
+    """Rows of `table` keyed by id, one query per chunk of ids."""
+    ids = [i for i in dict.fromkeys(ids) if i]
+    rows = {}
+    for start in range(0, len(ids), FETCH_CHUNK_SIZE):
+        result = supabase.table(table).select("*").in_(
+            "id", ids[start:start + FETCH_CHUNK_SIZE]
+        ).execute()
+        for row in result.data or []:
+            rows[row["id"]] = row
+    return rows
+
+
+def get_platform_billing(supabase) -> dict:
+    """Platform billing info from platform_settings (empty if not set)."""
+    result = supabase.table("platform_settings").select("value").eq(
+        "key", "billing_info"
+    ).limit(1).execute()
+    if result.data and result.data[0].get("value"):
+        return result.data[0]["value"]
+    return {}
+
+
+async def generate_invoice_pdfs(
+    invoices: list[dict],
+    on_progress: Callable[[dict], Awaitable[None]] | None = None,
+) -> dict:
+    """
+    Render, upload and link PDFs for issued invoices.
+
+    Invoices whose stored PDF was rendered from the same inputs are
+    skipped. A failing invoice does not stop the batch; it is listed in
+    failures.
+
+    Args:
+        invoices: Invoice rows (select_invoices())
+        on_progress: Awaited with progress counters every PROGRESS_EVERY invoices
+
+    Returns:
+        Dict with total/done/generated/skipped/failed counts and failures
+    """
+    supabase = get_supabase()
+    businesses = fetch_rows_by_id(supabase, "businesses", (i.get("business_id") for i in invoices))
+    projects = fetch_rows_by_id(supabase, "website_projects", (i.get("project_id") for i in invoices))
+    platform_billing = get_platform_billing(supabase)
+
+    executor = get_pdf_executor()
+    # Keep the pool busy without tripping its queue limit
+    render_slots = asyncio.Semaphore(min(executor.max_queue, max(1, executor.workers) * 2))
+    # Concurrent storage uploads + pdf_path updates
+    upload_slots = asyncio.Semaphore(get_settings().pdf_upload_concurrency)
+
+    progress = {"total": len(invoices), "done": 0, "generated": 0, "skipped": 0, "failed": 0}
+    failures: list[dict] = []
+
+    async def generate_one(invoice: dict) -> str:
+        """Render and store one PDF; returns the progress counter to bump."""
+        business = businesses.get(invoice.get("business_id"))
+        if not business:
+            raise ValueError("Business not found")
+        project = projects.get(invoice.get("project_id"))
+
+        fingerprint = invoice_issued_fingerprint(invoice, business, platform_billing, project)
+        if stored_pdf_url(invoice, fingerprint):
+            return "skipped"
+
+        async with render_slots:
+            pdf_bytes = await executor.submit(
+                generate_invoice_issued_pdf,
+                invoice=invoice,
+                business=business,
+                platform_billing=platform_billing,
+                project=project,
+            )
+
+        async with upload_slots:
+            pdf_url = await upload_pdf_to_storage(
+                supabase_client=supabase,
+                pdf_bytes=pdf_bytes,
+                storage_path=invoice_issued_storage_path(invoice),
+            )
+            if not pdf_url:
+                raise RuntimeError("Upload to storage failed")
+
+            await asyncio.to_thread(
+                save_pdf_path, supabase, "invoices_issued", invoice["id"], pdf_url, fingerprint
+            )
+        return "generated"
+
+    async def process(invoice: dict) -> None:
+        try:
+            outcome = await generate_one(invoice)
+        except Exception as e:
+            logger.warning(f"PDF for invoice {invoice.get('invoice_number')} failed: {e}")
+            progress["failed"] += 1
+            failures.append({
+                "invoice_id": invoice["id"],
+                "invoice_number": invoice.get("invoice_number"),
+                "error": str(e),
+            })
+        else:
+            progress[outcome] += 1
+
+        progress["done"] += 1
+        if on_progress and progress["done"] % PROGRESS_EVERY == 0:
+            await on_progress(dict(progress))
+
+    await asyncio.gather(*(process(invoice) for invoice in invoices))
+
+    return {**progress, "failures": failures}
@@ -0,0 +1,128 @@
+"""
+Job Notification Listener
+
+Wakes the background worker when a job is inserted. A trigger on
+background_jobs (supabase/migrations/010) sends NOTIFY on the
+`background_jobs` channel; this module LISTENs on a direct Postgres
+connection and calls a callback from the event loop. PostgREST cannot
+LISTEN, so this needs DATABASE_URL (session connection, not the
+transaction pooler).
+"""
+
+import asyncio
+import logging
+from typing import Callable
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = "background_jobs"
+
+try:
+    import psycopg2
+    import psycopg2.extensions
+    PSYCOPG2_AVAILABLE = True
+except ImportError:
+    PSYCOPG2_AVAILABLE = False
+
+
+class JobNotifier:
+    """
+    LISTEN on the job channel and call `on_notify(job_type)` per notification.
+
+    The connection's socket is registered with the event loop, so waiting
+    costs nothing; a lost connection is reopened after `reconnect_delay`.
+    While disconnected `active` is False and the worker polls at its normal
+    interval.
+    """
+
+    def __init__(
+        self,
+        dsn: str | None,
+        on_notify: Callable[[str], None],
+        reconnect_delay: float = 5.0,
+    ):
+        self.dsn = dsn
+        self.on_notify = on_notify
+        self.reconnect_delay = reconnect_delay
+        self._conn = None
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._reconnect: asyncio.TimerHandle | None = None
+        self._closed = False
+
+    @property
+    def active(self) -> bool:
+        """True while notifications are being received."""
+        return self._conn is not None
+
+    def start(self) -> bool:
+        """
+        Connect and start listening.
+
+        Returns:
+            False if notifications are unavailable (no DSN, no psycopg2,
+            connection failed); the caller should keep polling
+        """
+        if not self.dsn or not PSYCOPG2_AVAILABLE:
+            return False
+
+        self._loop = asyncio.get_running_loop()
+        return self._connect()
+
+    def _connect(self) -> bool:
+        self._reconnect = None
+        if self._closed:
+            return False
+
+        try:
+            conn = psycopg2.connect(self.dsn)
+            conn.set_isolation_level(psycopg2.extensions.ISOLATION_LEVEL_AUTOCOMMIT)
+            with conn.cursor() as cur:
+                cur.execute(f"LISTEN {CHANNEL}")
+        except Exception as e:
+            logger.warning("LISTEN %s failed, polling only: %s", CHANNEL, e)
+            self._schedule_reconnect()
+            return False
+
+        self._conn = conn
+        self._loop.add_reader(conn.fileno(), self._on_readable)
+        return True
+
+    def _on_readable(self) -> None:
+        try:
+            self._conn.poll()
+        except Exception as e:
+            logger.warning("Notification connection lost: %s", e)
+            self._disconnect()
+            self._schedule_reconnect()
+            # Jobs may have been inserted while the connection was failing
+            self.on_notify("")
+            return
+
+        while self._conn.notifies:
+            notify = self._conn.notifies.pop(0)
+            self.on_notify(notify.payload)
+
+    def _schedule_reconnect(self) -> None:
+        if self._loop and not self._closed and not self._reconnect:
+            self._reconnect = self._loop.call_later(self.reconnect_delay, self._connect)
+
+    def _disconnect(self) -> None:
+        if self._conn is None:
+            return
+        try:
+            self._loop.remove_reader(self._conn.fileno())
+        except Exception:
+            pass
+        try:
+            self._conn.close()
+        except Exception:
+            pass
+        self._conn = None
+
+    def close(self) -> None:
+        """Stop listening."""
+        self._closed = True
+        if self._reconnect:
+            self._reconnect.cancel()
+            self._reconnect = None
+        self._disconnect()
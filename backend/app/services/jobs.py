@@ -6,13 +6,18 @@ Simple DB-polling job queue for async tasks.
 
 import asyncio
 import json
+import logging
 import os
 import uuid
 from datetime import datetime, timedelta
 from typing import Callable, Any
 
+from postgrest.exceptions import APIError
+
 from ..database import get_supabase
 
+logger = logging.getLogger(__name__)
+
 
 # Job handlers registry
 _job_handlers: dict[str, Callable] = {}
@@ -71,26 +76,93 @@ async def enqueue_job(
     return result.data[0]["id"]
 
 
-async def claim_next_job(
+async def enqueue_job_if_idle(job_type: str, payload: dict | None = None) -> str | None:
+    """
+    Enqueue a job unless one of the same type is already pending or running.
+
+    Used for periodic jobs. The check keeps the common case to one query;
+    two workers passing it at once are stopped by the partial unique index
+    on active periodic jobs (migration 013), and the loser gets None.
+
+    Returns:
+        New job ID, or None if one was already queued
+    """
+    supabase = get_supabase()
+
+    existing = supabase.table("background_jobs").select("id").eq(
+        "job_type", job_type
+    ).in_(
+        "status", ["pending", "processing"]
+    ).limit(1).execute()
+
+    if existing.data:
+        return None
+
+    try:
+        return await enqueue_job(job_type, payload)
+    except APIError as e:
+        if e.code != "23505":  # unique_violation
+            raise
+        return None
+
+
+async def claim_jobs(
     job_types: list[str],
     worker_id: str,
+    limit: int = 1,
     lock_duration_minutes: int = 5,
-) -> dict | None:
+) -> list[dict]:
     """
-    Claim the next available job for processing.
+    Claim up to `limit` available jobs for processing.
+
+    Uses the `claim_jobs` SQL function (supabase/migrations/009): one round
+    trip, and FOR UPDATE SKIP LOCKED hands competing workers different jobs.
 
     Args:
         job_types: List of job types this worker can handle
         worker_id: Unique identifier for this worker
-        lock_duration_minutes: How long to lock the job
+        limit: Maximum number of jobs to claim
+        lock_duration_minutes: How long to lock the jobs
 
     Returns:
-        Job data or None if no jobs available
+        Claimed jobs (possibly empty)
     """
+    if limit < 1 or not job_types:
+        return []
+
     supabase = get_supabase()
+
+    try:
+        result = supabase.rpc("claim_jobs", {
+            "p_job_types": job_types,
+            "p_worker_id": worker_id,
+            "p_limit": limit,
+            "p_lock_duration": f"{lock_duration_minutes} minutes",
+        }).execute()
+        return result.data or []
+    except APIError as e:
+        if e.code not in ("PGRST202", "42883"):
+            raise
+        logger.warning("claim_jobs function missing, claiming with select + update")
+
+    return _claim_jobs_from_table(supabase, job_types, worker_id, limit, lock_duration_minutes)
+
+
+def _claim_jobs_from_table(
+    supabase,
+    job_types: list[str],
+    worker_id: str,
+    limit: int,
+    lock_duration_minutes: int,
+) -> list[dict]:
+    """
+    Select candidates, then claim them with a conditional update on
+    status = 'pending' (database without migration 009). Jobs taken by
+    another worker in between are simply not returned.
+    """
     now = datetime.utcnow()
 
-    # Find next pending job
+    # Find next pending jobs
     result = supabase.table("background_jobs").select("*").eq(
         "status", "pending"
     ).in_(
@@ -103,58 +175,150 @@ async def claim_next_job(
         "priority", desc=True
     ).order(
         "scheduled_for"
-    ).limit(1).execute()
+    ).limit(limit).execute()
 
-    if not result.data:
-        return None
+    # attempts is incremented per job, so jobs are claimed in groups that
+    # share the same attempt count (in practice one group: first runs)
+    by_attempts: dict[int, list[str]] = {}
+    for job in result.data or []:
+        attempts = job.get("attempts") or 0
+        if attempts >= job.get("max_attempts", 3):
+            continue
+        by_attempts.setdefault(attempts, []).append(job["id"])
 
-    job = result.data[0]
+    lock_until = (now + timedelta(minutes=lock_duration_minutes)).isoformat()
+    claimed = []
 
-    # Check attempts
-    if job.get("attempts", 0) >= job.get("max_attempts", 3):
-        return None
+    for attempts, job_ids in by_attempts.items():
+        update = {
+            "status": "processing",
+            "worker_id": worker_id,
+            "locked_until": lock_until,
+            "attempts": attempts + 1,
+        }
+        if attempts == 0:
+            update["started_at"] = now.isoformat()
 
-    # Try to claim the job (optimistic locking)
-    lock_until = (now + timedelta(minutes=lock_duration_minutes)).isoformat()
+        update_result = supabase.table("background_jobs").update(update).in_(
+            "id", job_ids
+        ).eq(
+            "status", "pending"  # Ensure still pending (optimistic lock)
+        ).execute()
+        claimed.extend(update_result.data or [])
+
+    return claimed
+
+
+async def claim_next_job(
+    job_types: list[str],
+    worker_id: str,
+    lock_duration_minutes: int = 5,
+) -> dict | None:
+    """
+    Claim the next available job for processing.
+
+    Args:
+        job_types: List of job types this worker can handle
+        worker_id: Unique identifier for this worker
+        lock_duration_minutes: How long to lock the job
+
+    Returns:
+        Job data or None if no jobs available
+    """
+    jobs = await claim_jobs(job_types, worker_id, 1, lock_duration_minutes)
+    return jobs[0] if jobs else None
 
-    update_result = supabase.table("background_jobs").update({
-        "status": "processing",
-        "worker_id": worker_id,
+
+async def extend_job_locks(
+    job_ids: list[str],
+    worker_id: str,
+    lock_duration_minutes: int = 5,
+) -> int:
+    """
+    Renew locked_until for jobs this worker is still running (heartbeat).
+
+    Args:
+        job_ids: Jobs currently running on this worker
+        worker_id: Worker that owns the jobs
+        lock_duration_minutes: New lock length from now
+
+    Returns:
+        Number of jobs whose lock was renewed
+    """
+    if not job_ids:
+        return 0
+
+    supabase = get_supabase()
+    lock_until = (datetime.utcnow() + timedelta(minutes=lock_duration_minutes)).isoformat()
+
+    result = supabase.table("background_jobs").update({
         "locked_until": lock_until,
-        "started_at": now.isoformat() if not job.get("started_at") else job["started_at"],
-        "attempts": (job.get("attempts") or 0) + 1,
-    }).eq(
-        "id", job["id"]
+    }).in_(
+        "id", job_ids
+    ).eq(
+        "worker_id", worker_id
     ).eq(
-        "status", "pending"  # Ensure still pending (optimistic lock)
+        "status", "processing"
     ).execute()
 
-    if not update_result.data:
-        # Another worker claimed it
-        return None
+    return len(result.data) if result.data else 0
 
-    return update_result.data[0]
 
+def _owned_job(query, worker_id: str | None):
+    """
+    Restrict a background_jobs query to a job still held by worker_id.
 
-async def complete_job(job_id: str, result: dict | None = None) -> None:
+    A worker whose lock expired may finish after another worker reclaimed
+    the job; its result must not overwrite the new owner's run.
+    """
+    if worker_id is None:
+        return query
+    return query.eq("worker_id", worker_id).eq("status", "processing")
+
+
+async def complete_job(job_id: str, result: dict | None = None, worker_id: str | None = None) -> bool:
     """
     Mark a job as successfully completed.
 
     Args:
         job_id: Job ID
         result: Optional result data
+        worker_id: Worker that ran the job (only its claim is completed)
+
+    Returns:
+        False if the job is no longer held by worker_id
     """
     supabase = get_supabase()
 
-    supabase.table("background_jobs").update({
+    update_result = _owned_job(supabase.table("background_jobs").update({
         "status": "completed",
         "result": result,
         "completed_at": datetime.utcnow().isoformat(),
         "locked_until": None,
-    }).eq("id", job_id).execute()
+    }).eq("id", job_id), worker_id).execute()
+
+    if worker_id is not None and not update_result.data:
+        logger.warning(f"Job {job_id} was reclaimed by another worker, result dropped")
+        return False
+    return True
+
+
+async def update_job_progress(job_id: str, progress: dict) -> None:
+    """
+    Record progress of a running job in its result column.
+
+    Args:
+        job_id: Job ID
+        progress: Progress counters, replaced by the final result on completion
+    """
+    supabase = get_supabase()
+
+    supabase.table("background_jobs").update({
+        "result": {"progress": progress},
+    }).eq("id", job_id).eq("status", "processing").execute()
 
 
-async def fail_job(job_id: str, error_message: str) -> None:
+async def fail_job(job_id: str, error_message: str, worker_id: str | None = None) -> None:
     """
     Mark a job as failed.
 
@@ -163,15 +327,18 @@ async def fail_job(job_id: str, error_message: str) -> None:
     Args:
         job_id: Job ID
         error_message: Error description
+        worker_id: Worker that ran the job (only its claim is failed)
     """
     supabase = get_supabase()
 
     # Get current job state
-    result = supabase.table("background_jobs").select(
+    result = _owned_job(supabase.table("background_jobs").select(
         "attempts, max_attempts"
-    ).eq("id", job_id).limit(1).execute()
+    ).eq("id", job_id), worker_id).limit(1).execute()
 
     if not result.data:
+        if worker_id is not None:
+            logger.warning(f"Job {job_id} was reclaimed by another worker, failure dropped")
         return
 
     job = result.data[0]
@@ -180,21 +347,21 @@ async def fail_job(job_id: str, error_message: str) -> None:
 
     if attempts >= max_attempts:
         # Permanently failed
-        supabase.table("background_jobs").update({
+        _owned_job(supabase.table("background_jobs").update({
             "status": "failed",
             "error_message": error_message,
             "completed_at": datetime.utcnow().isoformat(),
             "locked_until": None,
-        }).eq("id", job_id).execute()
+        }).eq("id", job_id), worker_id).execute()
     else:
         # Schedule retry with exponential backoff
         retry_at = datetime.utcnow() + timedelta(minutes=2 ** attempts)
-        supabase.table("background_jobs").update({
+        _owned_job(supabase.table("background_jobs").update({
             "status": "pending",
             "error_message": error_message,
             "scheduled_for": retry_at.isoformat(),
             "locked_until": None,
-        }).eq("id", job_id).execute()
+        }).eq("id", job_id), worker_id).execute()
 
 
 async def get_job_status(job_id: str) -> dict | None:
@@ -356,3 +523,60 @@ async def handle_cleanup_expired_links(job: dict) -> dict:
     ).execute()
 
     return {"deactivated_count": len(result.data) if result.data else 0}
+
+
+@register_job_handler("reconcile_seller_balances")
+async def handle_reconcile_seller_balances(job: dict) -> dict:
+    """Verify seller_balances against the ledger and fix drifted rows."""
+    from .balances import reconcile_seller_balances
+
+    payload = job.get("payload", {})
+    mismatches = reconcile_seller_balances(get_supabase(), fix=payload.get("fix", True))
+    return {"mismatch_count": len(mismatches), "mismatches": mismatches}
+
+
+@register_job_handler("bulk_deploy")
+async def handle_bulk_deploy(job: dict) -> dict:
+    """Deploy many versions concurrently, reporting progress on the job."""
+    from .bulk_deploy import bulk_deploy_versions
+
+    payload = job.get("payload", {})
+    version_ids = payload.get("version_ids")
+
+    if not version_ids:
+        raise ValueError("version_ids is required in payload")
+
+    async def on_progress(progress: dict) -> None:
+        await update_job_progress(job["id"], progress)
+
+    return await bulk_deploy_versions(version_ids, on_progress=on_progress)
+
+
+@register_job_handler("poll_deployment_status")
+async def handle_poll_deployment_status(job: dict) -> dict:
+    """Refresh readiness of deployments that are not final yet."""
+    from .deployment_poller import poll_deployment_statuses
+
+    payload = job.get("payload", {})
+    if "limit" in payload:
+        return await poll_deployment_statuses(limit=int(payload["limit"]))
+    return await poll_deployment_statuses()
+
+
+@register_job_handler("generate_invoice_pdfs")
+async def handle_generate_invoice_pdfs(job: dict) -> dict:
+    """Generate PDFs for the issued invoices matching a filter, reporting progress on the job."""
+    from .invoice_pdf_batch import generate_invoice_pdfs, select_invoices
+
+    payload = job.get("payload", {})
+    invoice_filter = payload.get("filter")
+
+    if not invoice_filter:
+        raise ValueError("filter is required in payload")
+
+    invoices = await asyncio.to_thread(select_invoices, get_supabase(), **invoice_filter)
+
+    async def on_progress(progress: dict) -> None:
+        await update_job_progress(job["id"], progress)
+
+    return await generate_invoice_pdfs(invoices, on_progress=on_progress)
@@ -0,0 +1,116 @@
+"""
+Ledger CSV Export Service
+
+Streams a seller's ledger as CSV. Entries are read in pages with keyset
+pagination on (created_at, id) and the running balance is carried through
+one ordered pass, so memory stays flat and cost is linear in ledger size.
+"""
+
+import csv
+from datetime import datetime
+from io import StringIO
+from typing import Iterator
+
+LEDGER_EXPORT_PAGE_SIZE = 1000
+
+_FIELDS = "id, created_at, entry_type, description, amount, related_invoice_id, related_project_id"
+
+CSV_HEADER = ["Datum", "Typ", "Popis", "Částka", "Zůstatek"]
+CSV_HEADER_ADMIN = ["Datum", "Typ", "Popis", "Částka", "ID faktury", "ID projektu", "Zůstatek"]
+
+
+def apply_entry(balance: float, entry: dict) -> float:
+    """
+    Balance after one ledger entry (same rules as calculate_seller_balance).
+
+    commission_earned and admin_adjustment add, payout_paid subtracts,
+    payout_reserved does not change the available balance.
+    """
+    entry_type = entry.get("entry_type", "")
+    amount = float(entry.get("amount") or 0)
+
+    if entry_type in ("commission_earned", "admin_adjustment"):
+        return balance + amount
+    if entry_type == "payout_paid":
+        return balance - abs(amount)
+    return balance
+
+
+def iter_ledger_pages(
+    supabase,
+    seller_id: str,
+    since: datetime | None = None,
+    page_size: int = LEDGER_EXPORT_PAGE_SIZE,
+) -> Iterator[list[dict]]:
+    """
+    Yield a seller's ledger entries oldest first, one page at a time.
+
+    Each page continues after the (created_at, id) of the previous page's
+    last row, so deep pages cost the same as the first one.
+    """
+    last: dict | None = None
+
+    while True:
+        query = supabase.table("ledger_entries").select(_FIELDS).eq("seller_id", seller_id)
+        if since:
+            query = query.gte("created_at", since.isoformat())
+        if last:
+            query = query.or_(
+                f'created_at.gt."{last["created_at"]}",'
+                f'and(created_at.eq."{last["created_at"]}",id.gt."{last["id"]}")'
+            )
+
+        page = query.order("created_at").order("id").limit(page_size).execute().data or []
+        if page:
+            yield page
+        if len(page) < page_size:
+            return
+        last = page[-1]
+
+
+def iter_ledger_csv(
+    supabase,
+    seller_id: str,
+    since: datetime | None = None,
+    include_references: bool = False,
+    include_balance: bool = True,
+    page_size: int = LEDGER_EXPORT_PAGE_SIZE,
+) -> Iterator[str]:
+    """
+    Yield CSV text for a seller's ledger: the header, then one chunk per page.
+
+    Args:
+        supabase: Sync Supabase client
+        seller_id: Seller whose ledger is exported
+        since: Only entries created at or after this time
+        include_references: Add invoice/project ID columns (admin export)
+        include_balance: Fill the running balance column
+        page_size: Rows fetched per query
+    """
+    buffer = StringIO()
+    writer = csv.writer(buffer)
+
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+
+    writer.writerow(CSV_HEADER_ADMIN if include_references else CSV_HEADER)
+    yield flush()
+
+    balance = 0.0
+    for page in iter_ledger_pages(supabase, seller_id, since, page_size):
+        for entry in page:
+            balance = apply_entry(balance, entry)
+            row = [
+                (entry.get("created_at") or "").split("T")[0],
+                entry["entry_type"],
+                entry.get("description") or "",
+                entry["amount"],
+            ]
+            if include_references:
+                row += [entry.get("related_invoice_id") or "", entry.get("related_project_id") or ""]
+            row.append(round(balance, 2) if include_balance else "")
+            writer.writerow(row)
+        yield flush()
@@ -5,87 +5,155 @@ Uses WeasyPrint + Jinja2 for HTML to PDF conversion.
 Supports QR payment codes (SPAYD format) for Czech banks.
 """
 import os
+import asyncio
 import base64
+import functools
+import hashlib
+import json
 import logging
+import tempfile
 from io import BytesIO
 from pathlib import Path
-from typing import Optional
-from datetime import date
+from typing import Callable, Optional
+from datetime import date, datetime
 
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader
+from postgrest.exceptions import APIError
+
+from ..config import get_settings
+
+try:
+    import qrcode
+    import qrcode.image.svg
+    QRCODE_AVAILABLE = True
+except ImportError:
+    QRCODE_AVAILABLE = False
 
 logger = logging.getLogger(__name__)
 
 # Template directory
 TEMPLATES_DIR = Path(__file__).parent.parent.parent / "templates"
 
+# Compiled template bytecode, shared by all processes on the host
+TEMPLATE_CACHE_DIR = os.getenv(
+    "PDF_TEMPLATE_CACHE_DIR",
+    os.path.join(tempfile.gettempdir(), "webomat-jinja-cache"),
+)
+
+INVOICE_TEMPLATES = (
+    "invoices/invoice_issued.html",
+    "invoices/invoice_received.html",
+)
+INVOICE_CSS = TEMPLATES_DIR / "css" / "invoice.css"
+
+# Payment QR code image formats (PDF_QR_FORMAT): svg is vector, no raster encoding
+QR_MIME_TYPES = {"png": "image/png", "svg": "image/svg+xml"}
+
+# Row fields not printed on the invoice; changing them keeps the stored PDF
+FINGERPRINT_IGNORED_FIELDS = frozenset({"created_at", "updated_at", "pdf_path", "pdf_fingerprint"})
+
+
+def format_currency(value: float, currency: str = "CZK") -> str:
+    """Format number as Czech currency."""
+    if value is None:
+        return "0,00"
+    # Czech format: 12 500,00
+    formatted = f"{value:,.2f}".replace(",", " ").replace(".", ",")
+    return formatted
+
+
+def format_date_cs(value: str | date) -> str:
+    """Format date as Czech format (DD.MM.YYYY)."""
+    if isinstance(value, str):
+        # Parse YYYY-MM-DD
+        parts = value.split("-")
+        if len(parts) == 3:
+            return f"{parts[2]}.{parts[1]}.{parts[0]}"
+        return value
+    elif isinstance(value, date):
+        return value.strftime("%d.%m.%Y")
+    return str(value)
+
+
+def _bytecode_cache() -> FileSystemBytecodeCache | None:
+    try:
+        os.makedirs(TEMPLATE_CACHE_DIR, exist_ok=True)
+        return FileSystemBytecodeCache(TEMPLATE_CACHE_DIR)
+    except OSError as e:
+        logger.warning(f"Template bytecode cache disabled ({TEMPLATE_CACHE_DIR}): {e}")
+        return None
+
+
+_jinja_env: Environment | None = None
+
 
 def get_jinja_env() -> Environment:
-    """Get Jinja2 environment with custom filters."""
-    env = Environment(
-        loader=FileSystemLoader(str(TEMPLATES_DIR)),
-        autoescape=True
-    )
+    """
+    Get the process-wide Jinja2 environment with custom filters.
 
-    # Custom filter for Czech currency formatting
-    def format_currency(value: float, currency: str = "CZK") -> str:
-        """Format number as Czech currency."""
-        if value is None:
-            return "0,00"
-        # Czech format: 12 500,00
-        formatted = f"{value:,.2f}".replace(",", " ").replace(".", ",")
-        return formatted
-
-    def format_date_cs(value: str | date) -> str:
-        """Format date as Czech format (DD.MM.YYYY)."""
-        if isinstance(value, str):
-            # Parse YYYY-MM-DD
-            parts = value.split("-")
-            if len(parts) == 3:
-                return f"{parts[2]}.{parts[1]}.{parts[0]}"
-            return value
-        elif isinstance(value, date):
-            return value.strftime("%d.%m.%Y")
-        return str(value)
-
-    env.filters["format_currency"] = format_currency
-    env.filters["format_date_cs"] = format_date_cs
-
-    return env
+    Built on first use. Templates are compiled once per process (bytecode is
+    also cached on disk for the next process) and never re-checked for
+    changes, so template edits need a process restart.
+    """
+    global _jinja_env
+    if _jinja_env is None:
+        env = Environment(
+            loader=FileSystemLoader(str(TEMPLATES_DIR)),
+            autoescape=True,
+            auto_reload=False,
+            bytecode_cache=_bytecode_cache(),
+        )
+        env.filters["format_currency"] = format_currency
+        env.filters["format_date_cs"] = format_date_cs
 
+        # Precompile invoice templates so the first render does not pay for it
+        for template_name in INVOICE_TEMPLATES:
+            env.get_template(template_name)
 
-def generate_payment_qr(
+        _jinja_env = env
+    return _jinja_env
+
+
+_pdf_styles = None
+
+
+def get_pdf_styles() -> tuple[list, object]:
+    """
+    Stylesheets and font configuration for invoice PDFs, built once per process.
+
+    invoice.css is parsed a single time into a WeasyPrint CSS object instead
+    of being re-parsed from an inline <style> on every render, and the
+    FontConfiguration (Pango font map, resolved fonts) is shared by all renders.
+
+    Returns:
+        (stylesheets, font_config) for HTML.write_pdf()
+    """
+    global _pdf_styles
+    if _pdf_styles is None:
+        from weasyprint import CSS
+        from weasyprint.text.fonts import FontConfiguration
+
+        font_config = FontConfiguration()
+        stylesheets = [CSS(filename=str(INVOICE_CSS), font_config=font_config)]
+        _pdf_styles = (stylesheets, font_config)
+    return _pdf_styles
+
+
+def build_spayd(
     iban: str,
     amount: float,
     variable_symbol: str,
     message: str = "",
     currency: str = "CZK"
-) -> Optional[str]:
+) -> str:
     """
-    Generate SPAYD QR code for Czech bank payments.
-
-    Args:
-        iban: IBAN of recipient account
-        amount: Payment amount
-        variable_symbol: Variable symbol (VS) - crucial for Czech payments
-        message: Optional payment message
-        currency: Currency code (default CZK)
+    Build SPAYD payment string (Czech QR payment standard).
 
-    Returns:
-        Base64 encoded PNG image or None if qrcode not available
+    Format: SPD*1.0*ACC:IBAN*AM:amount*CC:currency*X-VS:variable_symbol*MSG:message
     """
-    try:
-        import qrcode
-        from qrcode.image.pil import PilImage
-    except ImportError:
-        logger.warning("qrcode library not installed. Run: pip install qrcode[pil]")
-        return None
-
     # Clean IBAN - remove spaces
     iban_clean = iban.replace(" ", "")
 
-    # Build SPAYD string
-    # Format: SPD*1.0*ACC:IBAN*AM:amount*CC:currency*X-VS:variable_symbol*MSG:message
     spayd_parts = [
         "SPD*1.0",
         f"ACC:{iban_clean}",
@@ -99,25 +167,96 @@ def generate_payment_qr(
         msg_clean = message[:60].replace("*", "")
         spayd_parts.append(f"MSG:{msg_clean}")
 
-    spayd_string = "*".join(spayd_parts)
+    return "*".join(spayd_parts)
 
-    try:
-        qr = qrcode.QRCode(
-            version=1,
-            error_correction=qrcode.constants.ERROR_CORRECT_M,
-            box_size=10,
-            border=4,
-        )
-        qr.add_data(spayd_string)
-        qr.make(fit=True)
 
-        img = qr.make_image(fill_color="black", back_color="white")
+def _encode_qr(data: str, image_format: str = "png") -> str:
+    """
+    Encode data as a base64 QR code image (uncached, see encode_qr()).
+
+    Args:
+        data: QR payload (SPAYD string)
+        image_format: png or svg
 
+    Returns:
+        Base64 encoded image
+    """
+    if image_format not in QR_MIME_TYPES:
+        raise ValueError(f"Unsupported QR image format: {image_format}")
+
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_M,
+        box_size=10,
+        border=4,
+        image_factory=qrcode.image.svg.SvgPathImage if image_format == "svg" else None,
+    )
+    qr.add_data(data)
+    qr.make(fit=True)
+
+    if image_format == "svg":
+        image_bytes = qr.make_image().to_string()
+    else:
+        img = qr.make_image(fill_color="black", back_color="white")
         buffer = BytesIO()
         img.save(buffer, format="PNG")
-        buffer.seek(0)
+        image_bytes = buffer.getvalue()
+
+    return base64.b64encode(image_bytes).decode("utf-8")
+
+
+_qr_encoder: Callable[[str, str], str] | None = None
+
 
-        return base64.b64encode(buffer.getvalue()).decode("utf-8")
+def get_qr_encoder() -> Callable[[str, str], str]:
+    """
+    The process-wide LRU-cached QR encoder.
+
+    Built on first use, sized by Settings.pdf_qr_cache_size (PDF_QR_CACHE_SIZE).
+    """
+    global _qr_encoder
+    if _qr_encoder is None:
+        _qr_encoder = functools.lru_cache(maxsize=get_settings().pdf_qr_cache_size)(_encode_qr)
+    return _qr_encoder
+
+
+def encode_qr(data: str, image_format: str = "png") -> str:
+    """Encode data as a base64 QR code image (cached by data and format)."""
+    return get_qr_encoder()(data, image_format)
+
+
+def generate_payment_qr(
+    iban: str,
+    amount: float,
+    variable_symbol: str,
+    message: str = "",
+    currency: str = "CZK",
+    image_format: str | None = None
+) -> Optional[str]:
+    """
+    Generate SPAYD QR code for Czech bank payments.
+
+    The same payment (e.g. a regenerated invoice) reuses the encoded image.
+
+    Args:
+        iban: IBAN of recipient account
+        amount: Payment amount
+        variable_symbol: Variable symbol (VS) - crucial for Czech payments
+        message: Optional payment message
+        currency: Currency code (default CZK)
+        image_format: png or svg (default Settings.pdf_qr_format)
+
+    Returns:
+        Base64 encoded image or None if qrcode not available
+    """
+    if not QRCODE_AVAILABLE:
+        logger.warning("qrcode library not installed. Run: pip install qrcode[pil]")
+        return None
+
+    spayd_string = build_spayd(iban, amount, variable_symbol, message, currency)
+
+    try:
+        return encode_qr(spayd_string, image_format or get_settings().pdf_qr_format)
     except Exception as e:
         logger.error(f"QR code generation failed: {e}")
         return None
@@ -173,7 +312,8 @@ def render_invoice_pdf(
     platform: dict,
     project: Optional[dict] = None,
     seller: Optional[dict] = None,
-    qr_code_base64: Optional[str] = None
+    qr_code_base64: Optional[str] = None,
+    qr_code_mime: str = "image/png"
 ) -> bytes:
     """
     Render invoice HTML template to PDF.
@@ -186,12 +326,14 @@ def render_invoice_pdf(
         project: Optional project data dict
         seller: Optional seller data dict
         qr_code_base64: Optional base64 encoded QR code image
+        qr_code_mime: MIME type of the QR code image
 
     Returns:
         PDF file as bytes
     """
     try:
-        from weasyprint import HTML, CSS
+        from weasyprint import HTML
+        stylesheets, font_config = get_pdf_styles()
     except ImportError as e:
         logger.error(f"WeasyPrint not installed: {e}")
         raise ImportError("WeasyPrint is required for PDF generation. Run: pip install weasyprint")
@@ -199,19 +341,21 @@ def render_invoice_pdf(
     env = get_jinja_env()
     template = env.get_template(template_name)
 
-    # Render HTML
+    # Render HTML (invoice.css comes from the cached stylesheet)
     html_content = template.render(
         invoice=invoice,
         business=business,
         platform=platform,
         project=project,
         seller=seller,
-        qr_code=qr_code_base64
+        qr_code=qr_code_base64,
+        qr_code_mime=qr_code_mime,
+        inline_css=False,
     )
 
     # Convert to PDF
     html = HTML(string=html_content, base_url=str(TEMPLATES_DIR))
-    pdf_bytes = html.write_pdf()
+    pdf_bytes = html.write_pdf(stylesheets=stylesheets, font_config=font_config)
 
     return pdf_bytes
 
@@ -253,7 +397,8 @@ def generate_invoice_issued_pdf(
         business=business,
         platform=platform_billing,
         project=project,
-        qr_code_base64=qr_code
+        qr_code_base64=qr_code,
+        qr_code_mime=QR_MIME_TYPES[get_settings().pdf_qr_format]
     )
 
 
@@ -283,6 +428,125 @@ def generate_invoice_received_pdf(
     )
 
 
+def invoice_issued_storage_path(invoice: dict) -> str:
+    """Storage path of an issued invoice PDF (invoices/issued/<year>/<number>.pdf)."""
+    invoice_number = invoice["invoice_number"]
+    year = (
+        invoice_number.split("-")[0]
+        if "-" in invoice_number
+        else str(date.today().year)
+    )
+    return f"invoices/issued/{year}/{invoice_number}.pdf"
+
+
+def invoice_received_storage_path(invoice: dict) -> str:
+    """Storage path of a received invoice PDF (invoices/received/<seller>/<number>.pdf)."""
+    return f"invoices/received/{invoice['seller_id']}/{invoice['invoice_number']}.pdf"
+
+
+@functools.cache
+def _templates_digest() -> str:
+    """Hash of the invoice templates and CSS, so a layout change invalidates stored PDFs."""
+    digest = hashlib.sha256()
+    for path in [TEMPLATES_DIR / name for name in INVOICE_TEMPLATES] + [INVOICE_CSS]:
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def pdf_fingerprint(template_name: str, **inputs) -> str:
+    """
+    Fingerprint of everything a PDF is rendered from.
+
+    Stored next to pdf_path; while it matches, the stored PDF is current and
+    does not need to be rendered and uploaded again.
+
+    Args:
+        template_name: Invoice template
+        **inputs: Render inputs (invoice, business, seller, platform, project rows)
+
+    Returns:
+        SHA-256 hex digest
+    """
+    payload = {
+        name: (
+            {k: v for k, v in value.items() if k not in FINGERPRINT_IGNORED_FIELDS}
+            if isinstance(value, dict) else value
+        )
+        for name, value in inputs.items()
+    }
+    payload["template"] = template_name
+    payload["templates_digest"] = _templates_digest()
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode()
+    return hashlib.sha256(encoded).hexdigest()
+
+
+def invoice_issued_fingerprint(
+    invoice: dict,
+    business: dict,
+    platform_billing: dict,
+    project: Optional[dict] = None
+) -> str:
+    """Fingerprint of generate_invoice_issued_pdf() inputs."""
+    return pdf_fingerprint(
+        "invoices/invoice_issued.html",
+        invoice=invoice,
+        business=business,
+        platform=platform_billing,
+        project=project,
+        qr_format=get_settings().pdf_qr_format,
+    )
+
+
+def invoice_received_fingerprint(invoice: dict, seller: dict, platform_billing: dict) -> str:
+    """Fingerprint of generate_invoice_received_pdf() inputs."""
+    return pdf_fingerprint(
+        "invoices/invoice_received.html",
+        invoice=invoice,
+        seller=seller,
+        platform=platform_billing,
+    )
+
+
+def has_pdf_fingerprint(invoice: dict) -> bool:
+    """Whether the invoice row has the pdf_fingerprint column (migration 015)."""
+    return "pdf_fingerprint" in invoice
+
+
+def stored_pdf_url(invoice: dict, fingerprint: str) -> Optional[str]:
+    """URL of the stored PDF if it was rendered from the same inputs, else None."""
+    if invoice.get("pdf_path") and invoice.get("pdf_fingerprint") == fingerprint:
+        return invoice["pdf_path"]
+    return None
+
+
+def save_pdf_path(
+    supabase_client,
+    table: str,
+    invoice_id: str,
+    pdf_url: str,
+    fingerprint: Optional[str],
+) -> None:
+    """
+    Store the PDF URL and its fingerprint on the invoice row.
+
+    Pass fingerprint=None for PDFs that must not be reused (placeholders).
+    Without migration 015 only pdf_path is written.
+    """
+    fields = {
+        "pdf_path": pdf_url,
+        "pdf_fingerprint": fingerprint,
+        "updated_at": datetime.utcnow().isoformat(),
+    }
+    try:
+        supabase_client.table(table).update(fields).eq("id", invoice_id).execute()
+    except APIError as e:
+        if e.code not in ("42703", "PGRST204"):
+            raise
+        logger.warning("pdf_fingerprint column missing, storing pdf_path only")
+        del fields["pdf_fingerprint"]
+        supabase_client.table(table).update(fields).eq("id", invoice_id).execute()
+
+
 async def upload_pdf_to_storage(
     supabase_client,
     pdf_bytes: bytes,
@@ -292,6 +556,9 @@ async def upload_pdf_to_storage(
     """
     Upload PDF to Supabase Storage.
 
+    The blocking storage calls run in a thread, so concurrent uploads
+    (batch generation) do not stall the event loop.
+
     Args:
         supabase_client: Supabase client instance
         pdf_bytes: PDF file content
@@ -301,16 +568,17 @@ async def upload_pdf_to_storage(
     Returns:
         Public URL of uploaded file or None on failure
     """
-    try:
-        # Upload file
-        result = supabase_client.storage.from_(bucket).upload(
+    def upload() -> str:
+        storage = supabase_client.storage.from_(bucket)
+        storage.upload(
             path=storage_path,
             file=pdf_bytes,
             file_options={"content-type": "application/pdf", "upsert": "true"}
         )
+        return storage.get_public_url(storage_path)
 
-        # Get public URL
-        public_url = supabase_client.storage.from_(bucket).get_public_url(storage_path)
+    try:
+        public_url = await asyncio.to_thread(upload)
 
         logger.info(f"PDF uploaded to storage: {storage_path}")
         return public_url
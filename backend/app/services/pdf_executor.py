@@ -0,0 +1,153 @@
+"""
+PDF Render Executor
+
+Runs CPU-heavy invoice rendering (Jinja2 + WeasyPrint write_pdf) in a pool
+of worker processes so it neither blocks the event loop nor competes for
+the GIL. Workers warm their Jinja2 environment and WeasyPrint stylesheets
+once at start.
+
+The number of renders queued or running is bounded: when the pool is
+saturated, callers wait up to PDF_QUEUE_TIMEOUT for a slot and then get
+PdfRenderQueueFull (the API answers 503 with Retry-After).
+"""
+
+import asyncio
+import functools
+import logging
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable
+
+from ..config import get_settings
+
+logger = logging.getLogger(__name__)
+
+
+class PdfRenderQueueFull(RuntimeError):
+    """The PDF render queue stayed full for PDF_QUEUE_TIMEOUT."""
+
+
+def _warm_worker() -> None:
+    """Process initializer: build the template and stylesheet caches up front."""
+    from .pdf import get_jinja_env, get_pdf_styles
+
+    get_jinja_env()
+    try:
+        get_pdf_styles()
+    except Exception as e:  # WeasyPrint missing; renders will report it
+        logger.warning(f"PDF worker started without WeasyPrint: {e}")
+
+
+def _ping() -> int:
+    return os.getpid()
+
+
+class PdfRenderExecutor:
+    """
+    Bounded process pool for PDF rendering.
+
+    Args:
+        workers: Worker processes (0 = asyncio.to_thread in this process)
+        max_queue: Renders queued or running at once
+        queue_timeout: Seconds to wait for a slot when the queue is full
+
+    Arguments left as None come from Settings (PDF_WORKERS, PDF_MAX_QUEUE,
+    PDF_QUEUE_TIMEOUT).
+    """
+
+    def __init__(
+        self,
+        workers: int | None = None,
+        max_queue: int | None = None,
+        queue_timeout: float | None = None,
+    ):
+        settings = get_settings()
+        self.workers = settings.pdf_workers if workers is None else workers
+        self.max_queue = max(1, settings.pdf_max_queue if max_queue is None else max_queue)
+        self.queue_timeout = settings.pdf_queue_timeout if queue_timeout is None else queue_timeout
+        self.in_flight = 0
+        self._slots = asyncio.Semaphore(self.max_queue)
+        self._pool: ProcessPoolExecutor | None = None
+
+    def _get_pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            # spawn: forking a process with an event loop and client threads is unsafe
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_warm_worker,
+            )
+            # Start all workers now rather than one per request
+            for _ in range(self.workers):
+                self._pool.submit(_ping)
+        return self._pool
+
+    async def submit(self, fn: Callable[..., Any], *args, **kwargs) -> Any:
+        """
+        Run fn(*args, **kwargs) in a worker process and await the result.
+
+        fn must be a module-level function and its arguments picklable.
+
+        Raises:
+            PdfRenderQueueFull: No slot freed up within queue_timeout
+        """
+        try:
+            await asyncio.wait_for(self._slots.acquire(), timeout=self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise PdfRenderQueueFull(
+                f"PDF render queue full ({self.max_queue} renders in progress)"
+            ) from None
+
+        self.in_flight += 1
+        try:
+            call = functools.partial(fn, *args, **kwargs)
+            if self.workers <= 0:
+                return await asyncio.to_thread(call)
+            pool = self._get_pool()
+            try:
+                return await asyncio.get_running_loop().run_in_executor(pool, call)
+            except BrokenProcessPool:
+                # A worker died (e.g. OOM); start a fresh pool for the next render
+                logger.error("PDF worker process died, restarting pool")
+                self._discard_pool(pool)
+                raise RuntimeError("PDF worker process died during rendering")
+        finally:
+            self.in_flight -= 1
+            self._slots.release()
+
+    def _discard_pool(self, pool: ProcessPoolExecutor) -> None:
+        # Other renders on the broken pool fail too; only the first one replaces it
+        if self._pool is pool:
+            pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+_executor: PdfRenderExecutor | None = None
+
+
+def get_pdf_executor() -> PdfRenderExecutor:
+    """Process-wide PDF executor, created on first use."""
+    global _executor
+    if _executor is None:
+        _executor = PdfRenderExecutor()
+    return _executor
+
+
+async def render_pdf(fn: Callable[..., bytes], *args, **kwargs) -> bytes:
+    """Render a PDF with one of the app.services.pdf functions off the event loop."""
+    return await get_pdf_executor().submit(fn, *args, **kwargs)
+
+
+async def close_pdf_executor() -> None:
+    """Stop the worker processes (app/worker shutdown)."""
+    global _executor
+    if _executor is not None:
+        await asyncio.to_thread(_executor.shutdown)
+        _executor = None
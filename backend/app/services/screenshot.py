@@ -2,25 +2,34 @@
 Screenshot Service
 
 Uses Playwright for capturing website screenshots.
-Designed to run in background worker process.
+Designed to run in background worker process; pages come from the shared
+browser pool (browser_pool.py) instead of launching Chromium per capture.
 """
 
 import asyncio
+import hashlib
 import io
 import os
 import uuid
 from typing import Literal
 
-# Playwright import is conditional - not required for API server
-try:
-    from playwright.async_api import async_playwright
-    PLAYWRIGHT_AVAILABLE = True
-except ImportError:
-    PLAYWRIGHT_AVAILABLE = False
+from PIL import Image
 
 from ..database import get_supabase
+from .browser_pool import PLAYWRIGHT_AVAILABLE, get_browser_pool
+from .image_variants import (
+    CONTENT_TYPES,
+    SCREENSHOT_QUALITY,
+    available_formats,
+    encode_variants,
+    variant_widths,
+)
 
 
+# Bump when capture output changes so cached images are not reused
+SCREENSHOT_CACHE_VERSION = "2"
+SCREENSHOT_CACHE_FOLDER = "screenshots/cache"
+
 # Viewport configurations
 VIEWPORTS = {
     "desktop": {"width": 1920, "height": 1080},
@@ -28,6 +37,13 @@ VIEWPORTS = {
     "thumbnail": {"width": 400, "height": 300},
 }
 
+# Pixel width of each version image (thumbnail is captured at 2x)
+IMAGE_WIDTHS = {
+    "desktop": VIEWPORTS["desktop"]["width"],
+    "mobile": VIEWPORTS["mobile"]["width"],
+    "thumbnail": VIEWPORTS["thumbnail"]["width"] * 2,
+}
+
 
 async def capture_screenshot(
     url: str | None = None,
@@ -55,57 +71,104 @@ async def capture_screenshot(
 
     vp = VIEWPORTS.get(viewport, VIEWPORTS["desktop"])
 
-    async with async_playwright() as p:
-        browser = await p.chromium.launch(
-            headless=True,
-            args=[
-                "--disable-gpu",
-                "--disable-dev-shm-usage",
-                "--no-sandbox",
-            ],
+    async with get_browser_pool().page(
+        viewport=vp,
+        device_scale_factor=2 if viewport == "thumbnail" else 1,
+    ) as page:
+        if url:
+            await page.goto(url, wait_until="networkidle", timeout=30000)
+        else:
+            await page.set_content(html_content, wait_until="networkidle", timeout=30000)
+
+        # Wait for any animations to settle
+        await asyncio.sleep(0.5)
+
+        # Capture screenshot
+        return await page.screenshot(
+            type="png",
+            full_page=False if viewport == "thumbnail" else True,
         )
 
-        context = await browser.new_context(
-            viewport=vp,
-            device_scale_factor=2 if viewport == "thumbnail" else 1,
+
+def make_thumbnail(image_bytes: bytes) -> bytes:
+    """
+    Thumbnail from a desktop capture: the top of the page cropped to the
+    thumbnail's aspect ratio and scaled to its 2x size.
+    """
+    vp = VIEWPORTS["thumbnail"]
+    target = (vp["width"] * 2, vp["height"] * 2)
+
+    with Image.open(io.BytesIO(image_bytes)) as image:
+        crop_height = min(image.height, image.width * vp["height"] // vp["width"])
+        thumb = image.crop((0, 0, image.width, crop_height))
+        thumb = thumb.resize(target, Image.LANCZOS)
+        output = io.BytesIO()
+        thumb.save(output, format="PNG", optimize=True)
+        return output.getvalue()
+
+
+async def capture_screenshots(
+    url: str | None = None,
+    html_content: str | None = None,
+) -> dict[str, bytes]:
+    """
+    Capture desktop, mobile and thumbnail images with a single page load.
+
+    The page is rendered once at the desktop viewport, captured, resized to
+    the mobile viewport and captured again; the thumbnail is downscaled
+    from the desktop capture.
+
+    Args:
+        url: URL to capture (mutually exclusive with html_content)
+        html_content: Raw HTML to render and capture
+
+    Returns:
+        {"desktop": png, "mobile": png, "thumbnail": png}
+    """
+    if not PLAYWRIGHT_AVAILABLE:
+        raise RuntimeError(
+            "Playwright is not installed. Run: pip install playwright && playwright install chromium"
         )
 
-        page = await context.new_page()
+    if not url and not html_content:
+        raise ValueError("Either url or html_content must be provided")
 
-        try:
-            if url:
-                await page.goto(url, wait_until="networkidle", timeout=30000)
-            else:
-                await page.set_content(html_content, wait_until="networkidle", timeout=30000)
+    async with get_browser_pool().page(viewport=VIEWPORTS["desktop"]) as page:
+        if url:
+            await page.goto(url, wait_until="networkidle", timeout=30000)
+        else:
+            await page.set_content(html_content, wait_until="networkidle", timeout=30000)
 
-            # Wait for any animations to settle
-            await asyncio.sleep(0.5)
+        # Wait for any animations to settle
+        await asyncio.sleep(0.5)
+        desktop = await page.screenshot(type="png", full_page=True)
 
-            # Capture screenshot
-            screenshot = await page.screenshot(
-                type="png",
-                full_page=False if viewport == "thumbnail" else True,
-            )
+        # Re-layout at the mobile width; media queries apply without reloading
+        await page.set_viewport_size(VIEWPORTS["mobile"])
+        await asyncio.sleep(0.2)
+        mobile = await page.screenshot(type="png", full_page=True)
 
-            return screenshot
+    thumbnail = await asyncio.to_thread(make_thumbnail, desktop)
 
-        finally:
-            await context.close()
-            await browser.close()
+    return {"desktop": desktop, "mobile": mobile, "thumbnail": thumbnail}
 
 
 async def upload_screenshot(
     image_bytes: bytes,
     filename: str,
     folder: str = "screenshots",
+    path: str | None = None,
+    content_type: str = "image/png",
 ) -> str:
     """
     Upload screenshot to Supabase Storage.
 
     Args:
-        image_bytes: PNG image bytes
+        image_bytes: Encoded image bytes
         filename: Desired filename (without path)
         folder: Storage folder
+        path: Exact storage path; replaces the generated unique path
+        content_type: MIME type of image_bytes
 
     Returns:
         Public URL of uploaded image
@@ -113,15 +176,21 @@ async def upload_screenshot(
     supabase = get_supabase()
 
     # Generate unique path
-    unique_filename = f"{folder}/{uuid.uuid4()}_{filename}"
+    unique_filename = path or f"{folder}/{uuid.uuid4()}_{filename}"
 
     # Upload to storage
     # Note: supabase-py upload() raises exception on failure, no need to check .data
+    # Storage client is sync; run it off the event loop so uploads overlap
     try:
-        supabase.storage.from_("webomat").upload(
+        await asyncio.to_thread(
+            supabase.storage.from_("webomat").upload,
             path=unique_filename,
             file=image_bytes,
-            file_options={"content-type": "image/png", "upsert": "true"},
+            file_options={
+                "content-type": content_type,
+                "upsert": "true",
+                "cache-control": "31536000",
+            },
         )
     except Exception as e:
         raise RuntimeError(f"Failed to upload screenshot: {e}")
@@ -132,10 +201,115 @@ async def upload_screenshot(
     return public_url
 
 
+def screenshot_cache_prefix(html_content: str, image: str) -> str:
+    """
+    Content-addressed storage folder for one image of the version pipeline.
+
+    The hash covers the HTML, the viewport and the encoding settings, so
+    byte-identical versions (e.g. clones via parent_version_id) share files.
+    """
+    vp = VIEWPORTS[image]
+    settings = f"{','.join(available_formats())}:q{SCREENSHOT_QUALITY}:{variant_widths(IMAGE_WIDTHS[image])}"
+    digest = hashlib.sha256()
+    digest.update(
+        f"{SCREENSHOT_CACHE_VERSION}:{image}:{vp['width']}x{vp['height']}:{settings}\n".encode()
+    )
+    digest.update(html_content.encode("utf-8"))
+    return f"{SCREENSHOT_CACHE_FOLDER}/{digest.hexdigest()}"
+
+
+def variant_paths(prefix: str, image: str) -> dict[tuple[str, int], str]:
+    """{(format, width): storage path} of all variants under prefix."""
+    return {
+        (fmt, width): f"{prefix}/{width}.{fmt}"
+        for fmt in available_formats()
+        for width in variant_widths(IMAGE_WIDTHS[image])
+    }
+
+
+def primary_variant(image: str) -> tuple[str, int]:
+    """Variant stored in the *_url column: first format at full width."""
+    return available_formats()[0], IMAGE_WIDTHS[image]
+
+
+def _variant_urls(bucket, paths: dict[tuple[str, int], str]) -> dict[str, dict[str, str]]:
+    urls: dict[str, dict[str, str]] = {}
+    for (fmt, width), path in paths.items():
+        urls.setdefault(fmt, {})[str(width)] = bucket.get_public_url(path)
+    return urls
+
+
+async def find_cached_screenshots(prefixes: dict[str, str]) -> dict[str, dict]:
+    """
+    Variant URLs of cached images that already exist in storage.
+
+    The primary variant is uploaded last, so its presence means the whole
+    set is complete.
+
+    Args:
+        prefixes: {image: cache prefix}
+
+    Returns:
+        {image: {format: {width: public URL}}} for the cached ones
+    """
+    if not prefixes:
+        return {}
+
+    bucket = get_supabase().storage.from_("webomat")
+    images = list(prefixes)
+    exists = await asyncio.gather(
+        *(
+            asyncio.to_thread(bucket.exists, variant_paths(prefixes[image], image)[primary_variant(image)])
+            for image in images
+        ),
+        return_exceptions=True,
+    )
+    return {
+        image: _variant_urls(bucket, variant_paths(prefixes[image], image))
+        for image, found in zip(images, exists)
+        if found is True
+    }
+
+
+async def upload_variants(image_bytes: bytes, image: str, prefix: str) -> dict[str, dict[str, str]]:
+    """
+    Encode a capture into its variants and upload them under prefix.
+
+    Returns:
+        {format: {width: public URL}}
+    """
+    paths = variant_paths(prefix, image)
+    variants = await asyncio.to_thread(
+        encode_variants, image_bytes, variant_widths(IMAGE_WIDTHS[image])
+    )
+
+    async def upload(key: tuple[str, int]) -> str:
+        fmt = key[0]
+        return await upload_screenshot(
+            variants[key], "", path=paths[key], content_type=CONTENT_TYPES[fmt]
+        )
+
+    primary = primary_variant(image)
+    urls: dict[str, dict[str, str]] = {}
+    others = [key for key in paths if key != primary]
+    for key, url in zip(others, await asyncio.gather(*(upload(key) for key in others))):
+        urls.setdefault(key[0], {})[str(key[1])] = url
+    # Primary last: it marks the cached set as complete
+    urls.setdefault(primary[0], {})[str(primary[1])] = await upload(primary)
+    return urls
+
+
 async def capture_and_upload_version_screenshots(version_id: str) -> dict:
     """
     Capture all screenshots for a website version and update the database.
 
+    Each image is stored as compressed responsive variants (see
+    image_variants.py). The *_url columns get the primary variant and
+    screenshot_images the full set for srcset.
+
+    Versions with HTML are captured from html_content, which is also the
+    cache key; public_url is only used for versions without HTML.
+
     Args:
         version_id: Website version ID
 
@@ -157,44 +331,68 @@ async def capture_and_upload_version_screenshots(version_id: str) -> dict:
     if not url and not html_content:
         raise ValueError("Version has no URL or HTML content for screenshot")
 
-    screenshots = {}
+    columns = {
+        "desktop": "screenshot_desktop_url",
+        "mobile": "screenshot_mobile_url",
+        "thumbnail": "thumbnail_url",
+    }
+
+    # Identical HTML was captured before: reuse its files
+    if html_content:
+        prefixes = {image: screenshot_cache_prefix(html_content, image) for image in columns}
+    else:
+        run_id = uuid.uuid4().hex
+        prefixes = {
+            image: f"versions/{version_id}/{run_id}_v{version['version_number']}_{image}"
+            for image in columns
+        }
+        print(f"Version {version_id} has no HTML, screenshot cache not used")
 
-    # Capture desktop screenshot
     try:
-        desktop_bytes = await capture_screenshot(
-            url=url, html_content=html_content if not url else None, viewport="desktop"
-        )
-        screenshots["screenshot_desktop_url"] = await upload_screenshot(
-            desktop_bytes, f"v{version['version_number']}_desktop.png", f"versions/{version_id}"
-        )
+        images_urls = await find_cached_screenshots(prefixes if html_content else {})
     except Exception as e:
-        print(f"Desktop screenshot failed: {e}")
+        print(f"Screenshot cache lookup failed: {e}")
+        images_urls = {}
 
-    # Capture mobile screenshot
-    try:
-        mobile_bytes = await capture_screenshot(
-            url=url, html_content=html_content if not url else None, viewport="mobile"
-        )
-        screenshots["screenshot_mobile_url"] = await upload_screenshot(
-            mobile_bytes, f"v{version['version_number']}_mobile.png", f"versions/{version_id}"
-        )
-    except Exception as e:
-        print(f"Mobile screenshot failed: {e}")
+    missing = [image for image in columns if image not in images_urls]
+    if not missing:
+        print(f"Screenshots for version {version_id} reused from cache")
 
-    # Capture thumbnail
-    try:
-        thumb_bytes = await capture_screenshot(
-            url=url, html_content=html_content if not url else None, viewport="thumbnail"
-        )
-        screenshots["thumbnail_url"] = await upload_screenshot(
-            thumb_bytes, f"v{version['version_number']}_thumb.png", f"versions/{version_id}"
-        )
-    except Exception as e:
-        print(f"Thumbnail capture failed: {e}")
+    images = {}
+    if missing:
+        try:
+            # Capture what the cache key covers: the HTML, not the live page
+            if html_content:
+                images = await capture_screenshots(html_content=html_content)
+            else:
+                images = await capture_screenshots(url=url)
+        except Exception as e:
+            print(f"Screenshot capture failed: {e}")
+
+    # Encode and upload all images concurrently
+    missing = [image for image in missing if image in images]
+    results = await asyncio.gather(
+        *(upload_variants(images[image], image, prefixes[image]) for image in missing),
+        return_exceptions=True,
+    )
+    for image, result in zip(missing, results):
+        if isinstance(result, Exception):
+            print(f"{image.capitalize()} screenshot upload failed: {result}")
+        else:
+            images_urls[image] = result
+
+    screenshots = {}
+    for image, urls in images_urls.items():
+        fmt, width = primary_variant(image)
+        screenshots[columns[image]] = urls[fmt][str(width)]
 
-    # Update version with screenshot URLs
+    # Update version with screenshot URLs; images that failed keep their
+    # previous *_url column and variant set
     if screenshots:
-        supabase.table("website_versions").update(screenshots).eq("id", version_id).execute()
+        screenshot_images = {**(version.get("screenshot_images") or {}), **images_urls}
+        supabase.table("website_versions").update(
+            {**screenshots, "screenshot_images": screenshot_images}
+        ).eq("id", version_id).execute()
 
     return screenshots
 
@@ -0,0 +1,111 @@
+"""
+Seller Lookup Service
+
+Resolves seller display names for whole pages of rows in a single
+`in_()` query instead of one `sellers` query per row. Results are kept in a
+short-TTL in-process cache; routers that update a seller call
+`invalidate_seller_cache` so renamed sellers show up immediately.
+"""
+
+import time
+from typing import Iterable
+
+from ..config import get_settings
+
+_SELLER_FIELDS = "id, first_name, last_name, email"
+
+# seller_id -> (expires_at, seller row or None when the seller does not exist)
+_seller_cache: dict[str, tuple[float, dict | None]] = {}
+
+
+def format_seller_name(seller: dict | None) -> str | None:
+    """Build "First Last" display name from a sellers row."""
+    if not seller:
+        return None
+    name = f"{seller.get('first_name') or ''} {seller.get('last_name') or ''}".strip()
+    return name or None
+
+
+def _split_cached(seller_ids: Iterable[str | None]) -> tuple[dict, list[str]]:
+    """Return (cached rows, ids that still need a query)."""
+    now = time.monotonic()
+    found: dict[str, dict | None] = {}
+    missing: list[str] = []
+
+    for seller_id in set(filter(None, seller_ids)):
+        entry = _seller_cache.get(seller_id)
+        if entry and entry[0] > now:
+            found[seller_id] = entry[1]
+        else:
+            missing.append(seller_id)
+
+    return found, missing
+
+
+def _store(found: dict, missing: list[str], rows: list[dict]) -> dict:
+    expires_at = time.monotonic() + get_settings().seller_cache_ttl
+    by_id = {row["id"]: row for row in rows if row.get("id")}
+
+    for seller_id in missing:
+        found[seller_id] = by_id.get(seller_id)
+        _seller_cache[seller_id] = (expires_at, found[seller_id])
+
+    return found
+
+
+def get_sellers(supabase, seller_ids: Iterable[str | None]) -> dict[str, dict | None]:
+    """
+    Get seller rows (id, first_name, last_name, email) for many IDs.
+
+    Args:
+        supabase: Sync Supabase client
+        seller_ids: Seller IDs, may contain duplicates and None
+
+    Returns:
+        Dict seller_id -> row (None for unknown sellers). At most one query.
+    """
+    found, missing = _split_cached(seller_ids)
+    if not missing:
+        return found
+
+    result = supabase.table("sellers").select(_SELLER_FIELDS).in_("id", missing).execute()
+    return _store(found, missing, result.data or [])
+
+
+async def get_sellers_async(db, seller_ids: Iterable[str | None]) -> dict[str, dict | None]:
+    """Async variant of `get_sellers` for the pooled async client."""
+    found, missing = _split_cached(seller_ids)
+    if not missing:
+        return found
+
+    result = await db.table("sellers").select(_SELLER_FIELDS).in_("id", missing).execute()
+    return _store(found, missing, result.data or [])
+
+
+def get_seller_names(supabase, seller_ids: Iterable[str | None]) -> dict[str, str | None]:
+    """Get display names for many seller IDs with at most one query."""
+    return {
+        seller_id: format_seller_name(seller)
+        for seller_id, seller in get_sellers(supabase, seller_ids).items()
+    }
+
+
+async def get_seller_names_async(db, seller_ids: Iterable[str | None]) -> dict[str, str | None]:
+    """Async variant of `get_seller_names`."""
+    sellers = await get_sellers_async(db, seller_ids)
+    return {seller_id: format_seller_name(seller) for seller_id, seller in sellers.items()}
+
+
+def get_seller_name(supabase, seller_id: str | None) -> str | None:
+    """Get seller name by ID (cached)."""
+    if not seller_id:
+        return None
+    return get_seller_names(supabase, [seller_id]).get(seller_id)
+
+
+def invalidate_seller_cache(seller_id: str | None = None) -> None:
+    """Drop one seller from the cache, or everything when seller_id is None."""
+    if seller_id is None:
+        _seller_cache.clear()
+    else:
+        _seller_cache.pop(seller_id, None)
@@ -0,0 +1,167 @@
+"""
+Time-Series Aggregation Service
+
+Sums and counts invoices or ledger entries per week, month or quarter with
+one grouped query (`aggregate_time_buckets`, supabase/migrations/007).
+Empty buckets are filled with zeros so charts get a continuous series.
+"""
+
+import logging
+from datetime import date, timedelta
+
+from postgrest.exceptions import APIError
+
+logger = logging.getLogger(__name__)
+
+BUCKETS = ("week", "month", "quarter")
+
+# source table -> (date column, amount column)
+SOURCES = {
+    "invoices_issued": ("issue_date", "amount_total"),
+    "ledger_entries": ("created_at", "amount"),
+}
+
+
+def bucket_start(day: date, bucket: str) -> date:
+    """First day of the bucket containing `day` (weeks start on Monday)."""
+    if bucket == "week":
+        return day - timedelta(days=day.weekday())
+    if bucket == "month":
+        return day.replace(day=1)
+    if bucket == "quarter":
+        return date(day.year, (day.month - 1) // 3 * 3 + 1, 1)
+    raise ValueError(f"Unsupported bucket: {bucket}")
+
+
+def next_bucket_start(start: date, bucket: str) -> date:
+    """First day of the bucket following the one starting at `start`."""
+    if bucket == "week":
+        return start + timedelta(weeks=1)
+    months = 1 if bucket == "month" else 3
+    month = start.month - 1 + months
+    return date(start.year + month // 12, month % 12 + 1, 1)
+
+
+def last_buckets(count: int, bucket: str, today: date | None = None) -> tuple[date, date]:
+    """
+    Range covering the last `count` buckets including the current one.
+
+    Returns:
+        (start, end) with `end` exclusive
+    """
+    start = bucket_start(today or date.today(), bucket)
+    end = next_bucket_start(start, bucket)
+    for _ in range(count - 1):
+        start = bucket_start(start - timedelta(days=1), bucket)
+    return start, end
+
+
+def _empty_series(start: date, end: date, bucket: str) -> dict[date, dict]:
+    series = {}
+    current = bucket_start(start, bucket)
+    while current < end:
+        following = next_bucket_start(current, bucket)
+        series[current] = {
+            "bucket_start": current,
+            "bucket_end": following - timedelta(days=1),
+            "total": 0.0,
+            "count": 0,
+        }
+        current = following
+    return series
+
+
+def _rows_from_table(supabase, source, bucket, start, end, seller_id, statuses, entry_types):
+    """Same aggregation on the client from one range query (database without migration 007)."""
+    date_column, amount_column = SOURCES[source]
+
+    query = (
+        supabase.table(source)
+        .select(f"{date_column}, {amount_column}")
+        .gte(date_column, start.isoformat())
+        .lt(date_column, end.isoformat())
+    )
+    if seller_id:
+        query = query.eq("seller_id", seller_id)
+    if statuses:
+        query = query.in_("status", statuses)
+    if entry_types:
+        query = query.in_("entry_type", entry_types)
+
+    totals: dict[date, dict] = {}
+    for row in query.execute().data or []:
+        if not row.get(date_column):
+            continue
+        key = bucket_start(date.fromisoformat(row[date_column][:10]), bucket)
+        entry = totals.setdefault(key, {"bucket_start": key, "total": 0.0, "row_count": 0})
+        entry["total"] += float(row.get(amount_column) or 0)
+        entry["row_count"] += 1
+    return list(totals.values())
+
+
+def aggregate_buckets(
+    supabase,
+    source: str,
+    bucket: str,
+    start: date,
+    end: date,
+    seller_id: str | None = None,
+    statuses: list[str] | None = None,
+    entry_types: list[str] | None = None,
+) -> list[dict]:
+    """
+    Sum and count rows of `source` per bucket in one query.
+
+    Args:
+        supabase: Sync Supabase client
+        source: "invoices_issued" or "ledger_entries"
+        bucket: "week", "month" or "quarter"
+        start: First day of the range (inclusive)
+        end: Last day of the range (exclusive)
+        seller_id: Optional seller filter
+        statuses: Optional status filter
+        entry_types: Optional ledger entry_type filter
+
+    Returns:
+        List of {"bucket_start", "bucket_end", "total", "count"} ordered from
+        the oldest bucket, including empty buckets. bucket_end is inclusive.
+    """
+    if bucket not in BUCKETS:
+        raise ValueError(f"Unsupported bucket: {bucket}")
+    if source not in SOURCES:
+        raise ValueError(f"Unsupported source: {source}")
+
+    try:
+        rows = supabase.rpc(
+            "aggregate_time_buckets",
+            {
+                "p_source": source,
+                "p_bucket": bucket,
+                "p_start": start.isoformat(),
+                "p_end": end.isoformat(),
+                "p_seller_id": seller_id,
+                "p_statuses": statuses,
+                "p_entry_types": entry_types,
+            },
+        ).execute().data or []
+    except APIError as e:
+        if e.code not in ("PGRST202", "42883"):
+            raise
+        logger.warning("aggregate_time_buckets function missing, aggregating on client")
+        rows = _rows_from_table(
+            supabase, source, bucket, start, end, seller_id, statuses, entry_types
+        )
+
+    series = _empty_series(start, end, bucket)
+    for row in rows:
+        key = row["bucket_start"]
+        if isinstance(key, str):
+            key = date.fromisoformat(key[:10])
+        # Postgres buckets are aligned like bucket_start(); a range starting
+        # mid-bucket still reports under the bucket's first day
+        key = bucket_start(key, bucket)
+        if key in series:
+            series[key]["total"] += float(row.get("total") or 0)
+            series[key]["count"] += int(row.get("row_count") or 0)
+
+    return list(series.values())
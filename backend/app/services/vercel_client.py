@@ -0,0 +1,181 @@
+"""
+Vercel API Client
+
+One pooled HTTP/2 client per process for the deployment subsystem. Calls
+reuse keep-alive connections instead of paying TCP/TLS setup each time,
+in-flight requests are bounded, and 429 (and, for idempotent requests,
+5xx) responses are retried with exponential backoff that honours
+Retry-After.
+
+VERCEL_API_URL can point at a local stand-in server for tests and benchmarks.
+"""
+
+import asyncio
+import logging
+import os
+import random
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+VERCEL_API_URL = os.getenv("VERCEL_API_URL", "https://api.vercel.com")
+VERCEL_MAX_CONCURRENCY = int(os.getenv("VERCEL_MAX_CONCURRENCY", "8"))
+VERCEL_MAX_RETRIES = int(os.getenv("VERCEL_MAX_RETRIES", "4"))
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Safe to repeat after a 5xx/transport error
+IDEMPOTENT_METHODS = {"GET", "HEAD", "PUT", "DELETE", "OPTIONS"}
+MAX_BACKOFF = 60.0
+
+
+def get_vercel_token() -> str:
+    """Get Vercel API token from environment."""
+    token = os.getenv("VERCEL_DEPLOY_TOKEN") or os.getenv("VERCEL_TOKEN")
+    if not token:
+        raise RuntimeError("VERCEL_DEPLOY_TOKEN environment variable not set")
+    return token
+
+
+def retry_after_seconds(response: httpx.Response) -> float | None:
+    """Retry-After as seconds (delta-seconds or HTTP date), None if absent."""
+    value = response.headers.get("Retry-After")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
+
+class VercelClient:
+    """
+    Shared client for the Vercel REST API.
+
+    Args:
+        base_url: API root, VERCEL_API_URL by default
+        max_concurrency: Requests in flight at once
+        max_retries: Retries after the first attempt (see request())
+        transport: Optional httpx transport (tests use an ASGI stand-in)
+    """
+
+    def __init__(
+        self,
+        base_url: str | None = None,
+        max_concurrency: int = VERCEL_MAX_CONCURRENCY,
+        max_retries: int = VERCEL_MAX_RETRIES,
+        backoff_base: float = 0.5,
+        transport: httpx.AsyncBaseTransport | None = None,
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self._client = httpx.AsyncClient(
+            base_url=base_url or VERCEL_API_URL,
+            http2=transport is None,
+            transport=transport,
+            limits=httpx.Limits(
+                max_connections=max_concurrency,
+                max_keepalive_connections=max_concurrency,
+            ),
+            timeout=httpx.Timeout(30.0, connect=5.0),
+        )
+
+    def _backoff(self, attempt: int, response: httpx.Response | None) -> float:
+        if response is not None:
+            retry_after = retry_after_seconds(response)
+            if retry_after is not None:
+                return min(retry_after, MAX_BACKOFF)
+        # Exponential with full jitter
+        return random.uniform(0, min(MAX_BACKOFF, self.backoff_base * 2 ** attempt))
+
+    async def _send(self, method: str, path: str, headers: dict, kwargs: dict) -> httpx.Response:
+        async with self._semaphore:
+            return await self._client.request(method, path, headers=headers, **kwargs)
+
+    async def request(
+        self,
+        method: str,
+        path: str,
+        retry: bool | None = None,
+        **kwargs,
+    ) -> httpx.Response:
+        """
+        Send an authenticated request with retries.
+
+        429 is always retried (the request was not processed). 5xx and
+        transport errors are retried only for idempotent requests: the
+        server may have acted on the first attempt, and repeating e.g.
+        POST /v13/deployments would create a duplicate deployment.
+
+        Args:
+            method: HTTP method
+            path: API path
+            retry: Retry 5xx/transport errors (default: only for idempotent methods)
+
+        Returns:
+            The final response (which may still be an error status)
+        """
+        headers = {"Authorization": f"Bearer {get_vercel_token()}", **kwargs.pop("headers", {})}
+        retry_errors = method.upper() in IDEMPOTENT_METHODS if retry is None else retry
+
+        for attempt in range(self.max_retries):
+            response = None
+            try:
+                response = await self._send(method, path, headers, kwargs)
+            except httpx.TransportError as e:
+                if not retry_errors:
+                    raise
+                logger.warning("Vercel %s %s failed: %s", method, path, e)
+            else:
+                if response.status_code != 429 and not (
+                    retry_errors and response.status_code in RETRY_STATUSES
+                ):
+                    return response
+
+            delay = self._backoff(attempt, response)
+            if response is not None:
+                logger.warning(
+                    "Vercel %s %s returned %s, retrying in %.1fs",
+                    method, path, response.status_code, delay,
+                )
+            # Sleep outside the semaphore so other requests keep flowing
+            await asyncio.sleep(delay)
+
+        # Last attempt: whatever it returns or raises is final
+        return await self._send(method, path, headers, kwargs)
+
+    async def aclose(self) -> None:
+        await self._client.aclose()
+
+
+_client: VercelClient | None = None
+
+
+def get_vercel_client() -> VercelClient:
+    """Process-wide Vercel client, created on first use."""
+    global _client
+    if _client is None:
+        _client = VercelClient()
+    return _client
+
+
+def set_vercel_client(client: VercelClient | None) -> None:
+    """Replace the process-wide client (tests, local stand-in)."""
+    global _client
+    _client = client
+
+
+async def close_vercel_client() -> None:
+    """Close the shared connection pool (worker/app shutdown)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
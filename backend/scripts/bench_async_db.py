@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Load benchmark for /crm/businesses and /crm/seller/dashboard.
+
+Starts a stand-in PostgREST server (own process) that answers every query
+after a fixed latency, serves the real API app with a single uvicorn worker
+and fires concurrent requests at it. Reports requests/sec and latency percentiles.
+
+Authentication is overridden with a fixed seller so only the endpoint's own
+database round-trips are measured.
+
+Usage:
+    python scripts/bench_async_db.py
+    python scripts/bench_async_db.py --requests 1000 --concurrency 100 --latency-ms 30
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import sys
+import threading
+import time
+import uuid
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+STUB_PORT = 54399
+API_PORT = 54398
+
+os.environ["SUPABASE_URL"] = f"http://127.0.0.1:{STUB_PORT}"
+os.environ.setdefault("SUPABASE_SERVICE_ROLE_KEY", "bench-service-role-key")
+os.environ.setdefault("JWT_SECRET_KEY", "bench-secret")
+
+import httpx
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
+
+SELLER_ID = "4f7c2d1e-0000-4000-8000-000000000001"
+
+
+def build_rows(count: int) -> dict[str, list[dict]]:
+    """Canned table contents returned by the stub PostgREST server."""
+    businesses = [
+        {
+            "id": str(uuid.uuid4()),
+            "name": f"Firma {i}",
+            "status_crm": "calling",
+            "owner_seller_id": SELLER_ID,
+            "next_follow_up_at": "2025-01-01",
+            "created_at": "2025-01-01T00:00:00",
+        }
+        for i in range(count)
+    ]
+    projects = [
+        {
+            "id": str(uuid.uuid4()),
+            "business_id": b["id"],
+            "seller_id": SELLER_ID,
+            "status": "won",
+            "package": "start",
+            "price_setup": 10000,
+            "created_at": "2025-01-01T00:00:00",
+        }
+        for b in businesses[:10]
+    ]
+    return {
+        "businesses": businesses,
+        "website_projects": projects,
+        "website_versions": [{"version_number": 1, "created_at": "2025-01-01T00:00:00"}],
+        "sellers": [
+            {
+                "id": SELLER_ID,
+                "first_name": "Jan",
+                "last_name": "Novák",
+                "email": "bench@webomat.cz",
+                "role": "sales",
+                "is_active": True,
+            }
+        ],
+        "ledger_entries": [
+            {"amount": 1000, "entry_type": "commission_earned"} for _ in range(50)
+        ],
+        "invoices_issued": [],
+        "invoices_received": [],
+        "rpc/get_seller_dashboard": {
+            "available_balance": 50000,
+            "pending_projects_amount": 100000,
+            "pending_projects": [],
+            "unpaid_client_invoices": [],
+            "recent_invoices": [],
+            "total_leads": count,
+            "follow_ups_today": count,
+        },
+    }
+
+
+def create_stub_app(latency: float, rows: dict[str, list[dict]]) -> FastAPI:
+    """PostgREST stand-in: every call sleeps `latency` seconds, then returns rows."""
+    stub = FastAPI()
+
+    @stub.api_route(
+        "/rest/v1/{path:path}", methods=["GET", "POST", "PATCH", "DELETE", "HEAD"]
+    )
+    async def postgrest(path: str, request: Request):
+        await asyncio.sleep(latency)
+        if path.startswith("rpc/"):
+            return JSONResponse(rows.get(path, {}))
+        data = rows.get(path, [])
+        return JSONResponse(
+            data, headers={"Content-Range": f"0-{max(len(data) - 1, 0)}/{len(data)}"}
+        )
+
+    return stub
+
+
+def run_stub(latency: float, rows: int) -> None:
+    """Process entry point for the stand-in PostgREST server."""
+    app = create_stub_app(latency, build_rows(rows))
+    uvicorn.run(app, host="127.0.0.1", port=STUB_PORT, log_level="error")
+
+
+def wait_for_port(port: int) -> None:
+    while True:
+        try:
+            httpx.get(f"http://127.0.0.1:{port}/rest/v1/sellers")
+            return
+        except httpx.TransportError:
+            time.sleep(0.05)
+
+
+def serve_in_thread(app, port: int) -> uvicorn.Server:
+    """Run a uvicorn server on its own thread (and its own event loop)."""
+    config = uvicorn.Config(app, host="127.0.0.1", port=port, log_level="error")
+    server = uvicorn.Server(config)
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def run_load(
+    path: str, total: int, concurrency: int, headers: dict | None = None
+) -> dict:
+    """Fire `total` GET requests at `path` with `concurrency` in flight."""
+    latencies: list[float] = []
+    errors = 0
+    queue: asyncio.Queue = asyncio.Queue()
+    for _ in range(total):
+        queue.put_nowait(None)
+
+    limits = httpx.Limits(max_connections=concurrency)
+    async with httpx.AsyncClient(
+        base_url=f"http://127.0.0.1:{API_PORT}",
+        limits=limits,
+        timeout=120.0,
+        headers=headers,
+    ) as client:
+
+        async def worker():
+            nonlocal errors
+            while not queue.empty():
+                queue.get_nowait()
+                started = time.perf_counter()
+                response = await client.get(path)
+                latencies.append(time.perf_counter() - started)
+                if response.status_code != 200:
+                    errors += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        "rps": total / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "errors": errors,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    parser.add_argument("--rows", type=int, default=20)
+    args = parser.parse_args()
+
+    stub = multiprocessing.Process(
+        target=run_stub, args=(args.latency_ms / 1000, args.rows), daemon=True
+    )
+    stub.start()
+    wait_for_port(STUB_PORT)
+
+    from app.main import app
+    from app.dependencies import get_current_user
+    from app.schemas.auth import User
+
+    bench_user = User(
+        id=SELLER_ID,
+        email="bench@webomat.cz",
+        first_name="Jan",
+        last_name="Novák",
+        role="sales",
+        is_active=True,
+    )
+    app.dependency_overrides[get_current_user] = lambda: bench_user
+    serve_in_thread(app, API_PORT)
+
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} "
+        f"db_latency={args.latency_ms:.0f}ms rows={args.rows}"
+    )
+    for path in ("/crm/businesses", "/crm/seller/dashboard"):
+        stats = asyncio.run(run_load(path, args.requests, args.concurrency))
+        print(
+            f"{path:<24} {stats['rps']:8.1f} req/s  "
+            f"p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  "
+            f"errors {stats['errors']}"
+        )
+
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
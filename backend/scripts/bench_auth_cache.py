@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Latency benchmark for authenticated endpoints with and without the user cache.
+
+Uses the same stand-in PostgREST server as bench_async_db.py, but sends a real
+bearer token so every request goes through get_current_user. Each endpoint is
+measured twice: with USER_CACHE_TTL_SECONDS=0 (one `sellers` query per request)
+and with the default cache TTL.
+
+Usage:
+    python scripts/bench_auth_cache.py
+    python scripts/bench_auth_cache.py --requests 1000 --concurrency 20 --latency-ms 30
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+
+from bench_async_db import (
+    SELLER_ID,
+    STUB_PORT,
+    API_PORT,
+    run_load,
+    run_stub,
+    serve_in_thread,
+    wait_for_port,
+)
+
+ENDPOINTS = ("/users/me", "/crm/dashboard/today")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=20.0)
+    args = parser.parse_args()
+
+    stub = multiprocessing.Process(
+        target=run_stub, args=(args.latency_ms / 1000, 20), daemon=True
+    )
+    stub.start()
+    wait_for_port(STUB_PORT)
+
+    from app.main import app
+    from app.config import get_settings
+    from app.dependencies import create_access_token, invalidate_user_cache
+
+    token = create_access_token({"sub": SELLER_ID, "role": "sales"})
+    headers = {"Authorization": f"Bearer {token}"}
+    serve_in_thread(app, API_PORT)
+
+    print(
+        f"requests={args.requests} concurrency={args.concurrency} "
+        f"db_latency={args.latency_ms:.0f}ms"
+    )
+    settings = get_settings()
+    for label, ttl in (("no cache", 0.0), ("cache", settings.user_cache_ttl_seconds)):
+        app.dependency_overrides[get_settings] = lambda ttl=ttl: settings.model_copy(
+            update={"user_cache_ttl_seconds": ttl}
+        )
+        invalidate_user_cache()
+        for path in ENDPOINTS:
+            stats = asyncio.run(
+                run_load(path, args.requests, args.concurrency, headers=headers)
+            )
+            print(
+                f"{label:<9} {path:<22} {stats['rps']:8.1f} req/s  "
+                f"p50 {stats['p50_ms']:7.1f} ms  p99 {stats['p99_ms']:7.1f} ms  "
+                f"errors {stats['errors']}"
+            )
+
+    stub.terminate()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Benchmark for invoice rendering: templates and PDFs, uncached vs cached.
+
+Renders the issued-invoice template --invoices times with
+  fresh env    previous behaviour: new Environment, FileSystemLoader and
+               filters for every invoice, template parsed and compiled again
+  cached env   app/services/pdf.get_jinja_env(), built once per process
+
+the payment QR code of each invoice, regenerated twice (--invoices x 2) with
+  uncached qr  previous behaviour: QR matrix, PNG and base64 built every time
+  cached qr    pdf.generate_payment_qr(), encoded once per SPAYD string
+
+and, when WeasyPrint is usable, --pdfs full PDFs with
+  inline css   previous behaviour: invoice.css inlined into every document,
+               parsed again and fonts resolved with a new FontConfiguration
+  cached css   pdf.render_invoice_pdf(): pre-parsed CSS and a shared
+               FontConfiguration (get_pdf_styles())
+
+Reports ms per invoice and invoices (PDFs) per second.
+
+Usage:
+    python scripts/bench_invoice_pdf.py
+    python scripts/bench_invoice_pdf.py --invoices 500 --pdfs 500
+"""
+
+import argparse
+import os
+import sys
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from jinja2 import Environment, FileSystemLoader
+
+from app.services import pdf
+
+TEMPLATE = "invoices/invoice_issued.html"
+
+PLATFORM = {
+    "company_name": "Webomat s.r.o.",
+    "street": "Václavské náměstí 1",
+    "city": "Praha",
+    "postal_code": "110 00",
+    "country": "Česká republika",
+    "ico": "12345678",
+    "dic": "CZ12345678",
+    "email": "fakturace@webomat.cz",
+    "bank_account": "19-2000145399/0800",
+    "iban": "CZ6508000000192000145399",
+}
+
+
+def sample_invoice(i: int) -> dict:
+    return {
+        "invoice": {
+            "invoice_number": f"2025-{i + 1:04d}",
+            "variable_symbol": f"2025{i + 1:04d}",
+            "issue_date": "2025-01-31",
+            "due_date": "2025-02-14",
+            "amount_without_vat": 10000.0 + i,
+            "vat_rate": 21,
+            "vat_amount": 2100.0,
+            "amount_total": 12100.0 + i,
+            "currency": "CZK",
+            "description": "Tvorba webových stránek",
+        },
+        "business": {
+            "name": f"Firma {i} s.r.o.",
+            "ico": "87654321",
+            "address_full": "Dlouhá 5, 602 00 Brno",
+            "email": f"firma{i}@example.cz",
+        },
+        "platform": PLATFORM,
+        "project": {"domain": f"firma{i}.cz", "package": "start"},
+    }
+
+
+def fresh_env() -> Environment:
+    """The previous get_jinja_env body."""
+    env = Environment(loader=FileSystemLoader(str(pdf.TEMPLATES_DIR)), autoescape=True)
+    env.filters["format_currency"] = pdf.format_currency
+    env.filters["format_date_cs"] = pdf.format_date_cs
+    return env
+
+
+def bench(name: str, render, invoices: list[dict]) -> None:
+    started = time.perf_counter()
+    for data in invoices:
+        render(data)
+    elapsed = time.perf_counter() - started
+    print(
+        f"{name:<12} {len(invoices):>4} invoices  {elapsed:7.2f} s  "
+        f"{elapsed / len(invoices) * 1000:8.2f} ms/invoice  {len(invoices) / elapsed:8.1f} /s"
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--invoices", type=int, default=200)
+    parser.add_argument("--pdfs", type=int, default=500)
+    args = parser.parse_args()
+
+    invoices = [sample_invoice(i) for i in range(args.invoices)]
+
+    bench("fresh env", lambda d: fresh_env().get_template(TEMPLATE).render(**d), invoices)
+    bench("cached env", lambda d: pdf.get_jinja_env().get_template(TEMPLATE).render(**d), invoices)
+
+    if pdf.QRCODE_AVAILABLE:
+        def spayd(data: dict) -> str:
+            invoice = data["invoice"]
+            return pdf.build_spayd(PLATFORM["iban"], invoice["amount_total"], invoice["variable_symbol"])
+
+        regenerated = invoices * 2
+        bench("uncached qr", lambda d: pdf._encode_qr(spayd(d), "png"), regenerated)
+        bench("cached qr", lambda d: pdf.encode_qr(spayd(d), "png"), regenerated)
+
+    try:
+        from weasyprint import HTML
+    except (ImportError, OSError) as e:
+        print(f"PDF rendering skipped, WeasyPrint unavailable: {e}")
+        return
+
+    def pdf_inline_css(data: dict) -> bytes:
+        html = pdf.get_jinja_env().get_template(TEMPLATE).render(**data, seller=None, qr_code=None)
+        return HTML(string=html, base_url=str(pdf.TEMPLATES_DIR)).write_pdf()
+
+    pdfs = [sample_invoice(i) for i in range(args.pdfs)]
+    pdf.get_pdf_styles()  # built once per process, like the first real render
+
+    bench("inline css", pdf_inline_css, pdfs)
+    bench("cached css", lambda d: pdf.render_invoice_pdf(TEMPLATE, **d), pdfs)
+
+
+if __name__ == "__main__":
+    main()
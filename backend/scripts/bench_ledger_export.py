@@ -0,0 +1,160 @@
+#!/usr/bin/env python3
+"""
+Benchmark for the ledger CSV export with synthetic ledger entries.
+
+Compares the previous export (running balance recomputed with
+calculate_seller_balance over all earlier rows, whole CSV built in memory)
+with the streaming export from app/services/ledger_export.py. The database
+is an in-memory stand-in that answers keyset-paginated queries.
+
+The old export is quadratic, so it is measured on --old-rows entries and
+extrapolated to --rows.
+
+Usage:
+    python scripts/bench_ledger_export.py
+    python scripts/bench_ledger_export.py --rows 100000 --old-rows 4000
+"""
+
+import argparse
+import bisect
+import csv
+import os
+import re
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from io import StringIO
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from app.services.ledger_export import iter_ledger_csv
+from app.utils.balance_calculator import calculate_seller_balance
+
+SELLER_ID = "4f7c2d1e-0000-4000-8000-000000000001"
+ENTRY_TYPES = ["commission_earned", "commission_earned", "payout_reserved", "payout_paid", "admin_adjustment"]
+
+
+def build_entries(count: int) -> list[dict]:
+    """Synthetic ledger sorted by (created_at, id)."""
+    start = datetime(2020, 1, 1)
+    entries = []
+    for i in range(count):
+        entry_type = ENTRY_TYPES[i % len(ENTRY_TYPES)]
+        entries.append({
+            "id": f"{i:08d}-0000-4000-8000-000000000000",
+            "seller_id": SELLER_ID,
+            "created_at": (start + timedelta(minutes=30 * i)).isoformat() + "+00:00",
+            "entry_type": entry_type,
+            "amount": -1500.0 if entry_type.startswith("payout") else 2500.0,
+            "description": f"Provize za projekt {i}",
+            "related_invoice_id": None,
+            "related_project_id": None,
+        })
+    return entries
+
+
+class StandInQuery:
+    """Answers the export's keyset query with bisect over the sorted rows."""
+
+    def __init__(self, rows: list[dict], keys: list[tuple]):
+        self.rows = rows
+        self.keys = keys
+        self.offset = 0
+        self.count = len(rows)
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    def or_(self, expr: str):
+        created_at, last_id = re.findall(r'"([^"]+)"', expr)[1:3]
+        self.offset = bisect.bisect_right(self.keys, (created_at, last_id))
+        return self
+
+    def limit(self, count: int):
+        self.count = count
+        return self
+
+    def execute(self):
+        data = self.rows[self.offset:self.offset + self.count]
+        return type("Response", (), {"data": data})()
+
+
+class StandInClient:
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.keys = [(r["created_at"], r["id"]) for r in rows]
+
+    def table(self, name: str):
+        return StandInQuery(self.rows, self.keys)
+
+
+def old_export(entries: list[dict]) -> str:
+    """Previous implementation: whole result in memory, O(n^2) balance."""
+    rows = sorted(entries, key=lambda e: e["created_at"], reverse=True)
+    output = StringIO()
+    writer = csv.writer(output)
+    writer.writerow(["Datum", "Typ", "Popis", "Částka", "ID faktury", "ID projektu", "Zůstatek"])
+    for entry in rows:
+        row = [
+            entry["created_at"].split("T")[0],
+            entry["entry_type"],
+            entry.get("description", ""),
+            entry["amount"],
+            entry.get("related_invoice_id", ""),
+            entry.get("related_project_id", ""),
+        ]
+        balance = calculate_seller_balance([e for e in rows if e["created_at"] <= entry["created_at"]])
+        row.append(balance["available_balance"])
+        writer.writerow(row)
+    return output.getvalue()
+
+
+def new_export(client: StandInClient) -> int:
+    """Streaming export; returns bytes written (chunks are discarded like a socket would)."""
+    written = 0
+    for chunk in iter_ledger_csv(client, SELLER_ID, include_references=True):
+        written += len(chunk.encode())
+    return written
+
+
+def measure(fn, *args) -> tuple[float, float]:
+    """Run fn, return (seconds, peak MiB allocated during the run)."""
+    tracemalloc.start()
+    started = time.perf_counter()
+    fn(*args)
+    elapsed = time.perf_counter() - started
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / (1024 * 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100_000)
+    parser.add_argument("--old-rows", type=int, default=4_000)
+    args = parser.parse_args()
+
+    entries = build_entries(args.rows)
+    client = StandInClient(entries)
+
+    old_entries = entries[: args.old_rows]
+    old_time, old_peak = measure(old_export, old_entries)
+    extrapolated = old_time * (args.rows / args.old_rows) ** 2
+
+    new_time, new_peak = measure(new_export, client)
+
+    print(f"rows={args.rows}")
+    print(
+        f"old export  {args.old_rows:>7} rows  {old_time:8.2f} s  peak {old_peak:7.1f} MiB"
+        f"  (~{extrapolated / 3600:.1f} h extrapolated to {args.rows} rows)"
+    )
+    print(
+        f"streaming   {args.rows:>7} rows  {new_time:8.2f} s  peak {new_peak:7.1f} MiB"
+        f"  ({args.rows / new_time:,.0f} rows/s)"
+    )
+
+
+if __name__ == "__main__":
+    main()
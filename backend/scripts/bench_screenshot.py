@@ -0,0 +1,170 @@
+#!/usr/bin/env python3
+"""
+Benchmark for screenshot captures: launch-per-shot vs the browser pool.
+
+Captures a synthetic landing page --captures times with
+  launch-per-shot  previous behaviour: new Playwright driver and Chromium
+                   for every capture
+  pool             app/services/browser_pool.py, browsers kept warm
+
+and the per-version set (desktop, mobile, thumbnail) --versions times with
+  3 loads          one capture_screenshot() per viewport
+  1 load           capture_screenshots(): render once, resize, downscale
+
+Reports captures/minute and peak RSS of this process plus all child
+processes (Playwright driver, Chromium), sampled every 100 ms.
+
+Requires Chromium: pip install playwright && playwright install chromium
+
+Usage:
+    python scripts/bench_screenshot.py
+    python scripts/bench_screenshot.py --captures 60 --concurrency 4
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import threading
+import time
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BACKEND_DIR)
+
+from playwright.async_api import async_playwright
+
+from app.services.browser_pool import LAUNCH_ARGS, close_browser_pool, get_browser_pool
+from app.services.screenshot import capture_screenshot, capture_screenshots
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+HTML = """<!doctype html><html><head><style>
+body { font-family: sans-serif; margin: 0; }
+section { padding: 80px; background: linear-gradient(#f5f5f5, #ddd); }
+</style></head><body>
+""" + "".join(
+    f"<section><h2>Sekce {i}</h2><p>{'Lorem ipsum dolor sit amet. ' * 40}</p></section>"
+    for i in range(12)
+) + "</body></html>"
+
+
+def tree_rss_mb(root_pid: int) -> float:
+    """RSS of root_pid and all its descendants from /proc."""
+    parents = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            with open(f"/proc/{entry}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            parents[int(entry)] = int(fields[1])
+        except (OSError, IndexError, ValueError):
+            continue
+
+    tree = {root_pid}
+    changed = True
+    while changed:
+        changed = False
+        for pid, ppid in parents.items():
+            if ppid in tree and pid not in tree:
+                tree.add(pid)
+                changed = True
+
+    total_kb = 0
+    for pid in tree:
+        try:
+            with open(f"/proc/{pid}/status") as f:
+                for line in f:
+                    if line.startswith("VmRSS:"):
+                        total_kb += int(line.split()[1])
+        except OSError:
+            continue
+    return total_kb / 1024
+
+
+class RssSampler:
+    def __init__(self):
+        self.peak = 0.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def _run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, tree_rss_mb(os.getpid()))
+            time.sleep(0.1)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+
+async def capture_launch_per_shot() -> bytes:
+    """The previous capture_screenshot body."""
+    async with async_playwright() as p:
+        browser = await p.chromium.launch(headless=True, args=LAUNCH_ARGS)
+        context = await browser.new_context(viewport=VIEWPORT)
+        page = await context.new_page()
+        try:
+            await page.set_content(HTML, wait_until="networkidle", timeout=30000)
+            return await page.screenshot(type="png", full_page=True)
+        finally:
+            await context.close()
+            await browser.close()
+
+
+async def capture_pool() -> bytes:
+    async with get_browser_pool().page(viewport=VIEWPORT) as page:
+        await page.set_content(HTML, wait_until="networkidle", timeout=30000)
+        return await page.screenshot(type="png", full_page=True)
+
+
+async def version_three_loads() -> None:
+    for viewport in ("desktop", "mobile", "thumbnail"):
+        await capture_screenshot(html_content=HTML, viewport=viewport)
+
+
+async def version_one_load() -> None:
+    await capture_screenshots(html_content=HTML)
+
+
+async def run(name: str, capture, captures: int, concurrency: int, unit: str = "captures") -> None:
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one():
+        async with semaphore:
+            await capture()
+
+    with RssSampler() as sampler:
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(captures)))
+        elapsed = time.perf_counter() - started
+
+    print(
+        f"{name:<16} {captures} {unit}  {elapsed:7.1f} s  "
+        f"{captures / elapsed * 60:7.1f} {unit}/min  peak RSS {sampler.peak:7.0f} MiB"
+    )
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--captures", type=int, default=30)
+    parser.add_argument("--concurrency", type=int, default=2)
+    parser.add_argument("--versions", type=int, default=10)
+    args = parser.parse_args()
+
+    await run("launch-per-shot", capture_launch_per_shot, args.captures, args.concurrency)
+
+    try:
+        await run("pool", capture_pool, args.captures, args.concurrency)
+        await run("3 loads", version_three_loads, args.versions, args.concurrency, "versions")
+        await run("1 load", version_one_load, args.versions, args.concurrency, "versions")
+    finally:
+        await close_browser_pool()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
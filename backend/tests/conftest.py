@@ -57,12 +57,18 @@ class MockSupabaseQuery:
     def or_(self, *args, **kwargs):
         return self
 
+    def like(self, *args, **kwargs):
+        return self
+
     def ilike(self, *args, **kwargs):
         return self
 
     def lte(self, *args, **kwargs):
         return self
 
+    def lt(self, *args, **kwargs):
+        return self
+
     def gte(self, *args, **kwargs):
         return self
 
@@ -86,6 +92,23 @@ class MockSupabaseQuery:
         return MockSupabaseResponse(self._data, self._count)
 
 
+class MockSupabaseRpc:
+    """Mock pro supabase.rpc() - neregistrovaná funkce se chová jako chybějící migrace."""
+    def __init__(self, fn: str, rpc_results: dict):
+        self.fn = fn
+        self.rpc_results = rpc_results
+
+    def execute(self):
+        from postgrest.exceptions import APIError
+
+        if self.fn not in self.rpc_results:
+            raise APIError({
+                "code": "PGRST202",
+                "message": f"Could not find the function public.{self.fn}",
+            })
+        return MockSupabaseResponse(self.rpc_results[self.fn])
+
+
 class MockSupabaseTable:
     """Mock pro supabase.table()."""
     def __init__(self, table_name: str, data_store: dict):
@@ -96,10 +119,42 @@ class MockSupabaseTable:
         return MockSupabaseQuery(self.data_store.get(table_name, []))
 
 
+class MockStorageBucket:
+    """Mock pro supabase.storage.from_(bucket) - soubory v paměti."""
+    def __init__(self, name: str):
+        self.name = name
+        self.files = {}
+        self.uploads = []
+
+    def upload(self, path, file, file_options=None):
+        self.files[path] = file
+        self.uploads.append(path)
+        return {"Key": f"{self.name}/{path}"}
+
+    def exists(self, path):
+        return path in self.files
+
+    def download(self, path):
+        return self.files[path]
+
+    def get_public_url(self, path):
+        return f"https://storage.test/{self.name}/{path}"
+
+
+class MockStorage:
+    def __init__(self):
+        self.buckets = {}
+
+    def from_(self, bucket: str):
+        return self.buckets.setdefault(bucket, MockStorageBucket(bucket))
+
+
 class MockSupabase:
     """Mock pro celý Supabase client."""
     def __init__(self):
         self.data_store = {}
+        self.rpc_results = {}
+        self.storage = MockStorage()
 
     @property
     def mock_data(self):
@@ -113,9 +168,61 @@ class MockSupabase:
         """Nastaví mock data pro tabulku."""
         self.data_store[table_name] = data
 
+    def rpc(self, fn: str, params: dict | None = None):
+        return MockSupabaseRpc(fn, self.rpc_results)
+
+    def set_rpc_result(self, fn: str, data):
+        """Nastaví výsledek pro SQL funkci volanou přes rpc()."""
+        self.rpc_results[fn] = data
+
+
+class CountingSupabase(MockSupabase):
+    """MockSupabase, který počítá dotazy na jednotlivé tabulky."""
+    def __init__(self):
+        super().__init__()
+        self.table_calls = {}
+
+    def table(self, table_name: str):
+        self.table_calls[table_name] = self.table_calls.get(table_name, 0) + 1
+        return super().table(table_name)
+
+
+class AsyncMockSupabaseQuery(MockSupabaseQuery):
+    """Mock pro async query builder - execute() je awaitable."""
+    async def execute(self):
+        return super().execute()
+
+
+class AsyncMockSupabaseRpc(MockSupabaseRpc):
+    """Mock pro async rpc() - execute() je awaitable."""
+    async def execute(self):
+        return super().execute()
+
+
+class AsyncMockSupabase:
+    """Async pohled na MockSupabase (sdílí stejná data)."""
+    def __init__(self, sync_mock: MockSupabase):
+        self._sync_mock = sync_mock
+
+    def table(self, table_name: str):
+        return AsyncMockSupabaseQuery(self._sync_mock.data_store.get(table_name, []))
+
+    def rpc(self, fn: str, params: dict | None = None):
+        return AsyncMockSupabaseRpc(fn, self._sync_mock.rpc_results)
+
 
 # Fixtures
 
+@pytest.fixture(autouse=True)
+def clear_user_caches():
+    """Cache uživatelů a jmen obchodníků nesmí přetékat mezi testy."""
+    from app.dependencies import invalidate_user_cache
+
+    invalidate_user_cache()
+    yield
+    invalidate_user_cache()
+
+
 @pytest.fixture
 def mock_supabase():
     """Fixture pro mockovaný Supabase client."""
@@ -268,6 +375,7 @@ def app_client(mock_supabase, sample_seller):
     """
     from app.main import app
     from app.dependencies import get_current_user, require_sales_or_admin
+    from app.async_database import get_async_supabase
     from app.database import get_supabase
     from app.schemas.auth import User
 
@@ -284,6 +392,7 @@ def app_client(mock_supabase, sample_seller):
 
     # Override dependencies
     app.dependency_overrides[get_supabase] = lambda: mock_supabase
+    app.dependency_overrides[get_async_supabase] = lambda: AsyncMockSupabase(mock_supabase)
     app.dependency_overrides[get_current_user] = lambda: mock_user
     app.dependency_overrides[require_sales_or_admin] = lambda: mock_user
 
@@ -301,6 +410,7 @@ def admin_client(mock_supabase, sample_admin):
     """
     from app.main import app
     from app.dependencies import get_current_user, require_sales_or_admin, require_admin
+    from app.async_database import get_async_supabase
     from app.database import get_supabase
     from app.schemas.auth import User
 
@@ -315,6 +425,7 @@ def admin_client(mock_supabase, sample_admin):
     )
 
     app.dependency_overrides[get_supabase] = lambda: mock_supabase
+    app.dependency_overrides[get_async_supabase] = lambda: AsyncMockSupabase(mock_supabase)
     app.dependency_overrides[get_current_user] = lambda: mock_user
     app.dependency_overrides[require_sales_or_admin] = lambda: mock_user
     app.dependency_overrides[require_admin] = lambda: mock_user
@@ -0,0 +1,95 @@
+"""
+Unit testy pro async datovou vrstvu (app/async_database.py).
+
+Testuje:
+- Zachování query-builder rozhraní přes wrapper
+- Per-request timeout dotazů
+- Mapování timeoutu na HTTP 504
+"""
+import asyncio
+
+import pytest
+
+from app.async_database import AsyncDatabase, QueryTimeoutError, _TimedQuery
+
+
+class FakeBuilder:
+    """Minimální async query builder (chování jako postgrest)."""
+    def __init__(self, delay: float = 0.0):
+        self.delay = delay
+        self.calls = []
+
+    def select(self, *args, **kwargs):
+        self.calls.append(("select", args))
+        return self
+
+    def eq(self, *args, **kwargs):
+        self.calls.append(("eq", args))
+        return self
+
+    @property
+    def not_(self):
+        self.calls.append(("not_", ()))
+        return self
+
+    def __getattr__(self, name):
+        # order, range, or_, ... - vrací builder
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        await asyncio.sleep(self.delay)
+        return {"data": [{"id": "1"}]}
+
+
+class FakeClient:
+    def __init__(self, builder):
+        self.builder = builder
+
+    def table(self, name):
+        return self.builder
+
+
+class TestTimedQuery:
+    """Testy pro wrapper query builderu."""
+
+    async def test_chaining_keeps_wrapper(self):
+        """Řetězení metod vrací stále wrapper s execute()."""
+        builder = FakeBuilder()
+        db = AsyncDatabase(FakeClient(builder), timeout=1.0)
+
+        query = db.table("businesses").select("*").not_.eq("id", "1")
+
+        assert isinstance(query, _TimedQuery)
+        assert [c[0] for c in builder.calls] == ["select", "not_", "eq"]
+        result = await query.execute()
+        assert result["data"][0]["id"] == "1"
+
+    async def test_execute_timeout(self):
+        """Pomalý dotaz skončí QueryTimeoutError."""
+        db = AsyncDatabase(FakeClient(FakeBuilder(delay=0.5)), timeout=0.05)
+
+        with pytest.raises(QueryTimeoutError):
+            await db.table("businesses").select("*").execute()
+
+    async def test_execute_timeout_override(self):
+        """Timeout lze přepsat pro jednotlivý dotaz."""
+        db = AsyncDatabase(FakeClient(FakeBuilder(delay=0.1)), timeout=0.01)
+
+        result = await db.table("businesses").select("*").execute(timeout=1.0)
+        assert result["data"]
+
+
+class TestQueryTimeoutHandler:
+    """Timeout databáze se vrací jako 504."""
+
+    def test_timeout_returns_504(self, app_client):
+        from app.main import app
+        from app.async_database import get_async_supabase
+
+        app.dependency_overrides[get_async_supabase] = lambda: AsyncDatabase(
+            FakeClient(FakeBuilder(delay=0.5)), timeout=0.01
+        )
+
+        response = app_client.get("/crm/businesses")
+
+        assert response.status_code == 504
@@ -0,0 +1,114 @@
+"""
+Unit testy pro pool Chromium prohlížečů (app/services/browser_pool.py).
+
+Testuje:
+- Znovupoužití jednoho prohlížeče pro více screenshotů
+- Recyklaci po N stránkách a po pádu prohlížeče
+- Omezení souběžnosti
+"""
+import asyncio
+
+from app.services.browser_pool import BrowserPool, memory_bounded_concurrency
+
+
+class FakeContext:
+    def __init__(self, browser):
+        self.browser = browser
+
+    async def new_page(self):
+        return object()
+
+    async def close(self):
+        self.browser.open_contexts -= 1
+
+
+class FakeBrowser:
+    def __init__(self):
+        self.connected = True
+        self.closed = False
+        self.open_contexts = 0
+        self.peak_contexts = 0
+
+    def is_connected(self):
+        return self.connected and not self.closed
+
+    async def new_context(self, **kwargs):
+        self.open_contexts += 1
+        self.peak_contexts = max(self.peak_contexts, self.open_contexts)
+        return FakeContext(self)
+
+    async def close(self):
+        self.closed = True
+
+
+class FakeBrowserPool(BrowserPool):
+    """Pool, který místo Chromia spouští FakeBrowser."""
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.browsers = []
+
+    async def _launch(self):
+        browser = FakeBrowser()
+        self.browsers.append(browser)
+        return browser
+
+
+VIEWPORT = {"width": 1920, "height": 1080}
+
+
+class TestBrowserPool:
+    """Testy poolu."""
+
+    async def test_browser_reused_across_captures(self):
+        pool = FakeBrowserPool(size=1, max_pages=100, max_concurrency=2)
+
+        for _ in range(10):
+            async with pool.page(VIEWPORT):
+                pass
+
+        assert pool.launches == 1
+        assert pool.browsers[0].open_contexts == 0
+
+    async def test_recycled_after_max_pages(self):
+        pool = FakeBrowserPool(size=1, max_pages=3, max_concurrency=1)
+
+        for _ in range(7):
+            async with pool.page(VIEWPORT):
+                pass
+
+        assert pool.launches == 3
+        assert [b.closed for b in pool.browsers] == [True, True, False]
+
+    async def test_crashed_browser_replaced(self):
+        pool = FakeBrowserPool(size=1, max_concurrency=1)
+        async with pool.page(VIEWPORT):
+            pass
+
+        pool.browsers[0].connected = False
+        async with pool.page(VIEWPORT):
+            pass
+
+        assert pool.launches == 2
+
+    async def test_concurrency_bounded(self):
+        pool = FakeBrowserPool(size=1, max_concurrency=2)
+
+        async def capture():
+            async with pool.page(VIEWPORT):
+                await asyncio.sleep(0.01)
+
+        await asyncio.gather(*(capture() for _ in range(6)))
+
+        assert pool.browsers[0].peak_contexts == 2
+
+    async def test_close_closes_browsers(self):
+        pool = FakeBrowserPool(size=1, max_concurrency=1)
+        async with pool.page(VIEWPORT):
+            pass
+
+        await pool.close()
+
+        assert pool.browsers[0].closed
+
+    def test_memory_bound_at_least_one(self):
+        assert 1 <= memory_bounded_concurrency(max_contexts=4, context_memory_mb=10**9) <= 4
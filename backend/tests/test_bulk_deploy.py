@@ -0,0 +1,183 @@
+"""
+Unit testy pro hromadné nasazení verzí (app/services/bulk_deploy.py).
+
+Testuje:
+- Souběžné nasazení proti lokální náhradě Vercel API
+- Dávkový zápis výsledků (RPC i fallback bez migrace 012)
+- Průběh a výsledky jednotlivých verzí
+- Neúspěšný redeploy živé verze ji neoznačí jako failed
+- RateLimiter
+"""
+import asyncio
+from unittest.mock import patch
+
+import pytest
+
+from app.services import bulk_deploy, deployment
+from app.services.vercel_client import set_vercel_client
+from tests.conftest import MockSupabaseResponse, MockSupabaseRpc
+from tests.vercel_stub import VercelStub
+
+
+class FakeVersionsQuery:
+    """Query builder nad website_versions, který zaznamenává zápisy."""
+
+    def __init__(self, client):
+        self.client = client
+        self.ids = None
+        self.fields = None
+
+    def select(self, *args):
+        return self
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def in_(self, column, values):
+        self.ids = list(values)
+        return self
+
+    def eq(self, column, value):
+        self.ids = [value]
+        return self
+
+    def execute(self):
+        if self.fields is not None:
+            self.client.updates.append((self.ids, self.fields))
+            return MockSupabaseResponse([])
+        self.client.selects += 1
+        return MockSupabaseResponse([v for v in self.client.versions if v["id"] in self.ids])
+
+
+class FakeVersionsClient:
+    def __init__(self, versions, rpc_available=True):
+        self.versions = versions
+        self.rpc_available = rpc_available
+        self.selects = 0
+        self.updates = []
+        self.rpc_batches = []
+
+    def table(self, name):
+        assert name == "website_versions"
+        return FakeVersionsQuery(self)
+
+    def rpc(self, fn, params):
+        if not self.rpc_available:
+            return MockSupabaseRpc(fn, {})
+        self.rpc_batches.append(params["p_updates"])
+        return MockSupabaseRpc(fn, {fn: len(params["p_updates"])})
+
+
+def make_versions(count):
+    return [
+        {
+            "id": f"version-{i:04d}",
+            "html_content": "<html></html>",
+            "website_projects": {"domain": None, "businesses": {"name": f"Firma {i}"}},
+        }
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(autouse=True)
+def vercel_token(monkeypatch):
+    monkeypatch.setenv("VERCEL_TOKEN", "test-token")
+
+
+@pytest.fixture(autouse=True)
+def upload_manifest(monkeypatch):
+    monkeypatch.setattr(deployment, "_upload_manifest", deployment.UploadManifest())
+
+
+@pytest.fixture
+async def stub():
+    stub = VercelStub(latency=0.01)
+    client = stub.client()
+    set_vercel_client(client)
+    yield stub
+    set_vercel_client(None)
+    await client.aclose()
+
+
+class TestBulkDeploy:
+    """Testy bulk_deploy_versions."""
+
+    async def test_deploys_all_with_batched_updates(self, stub):
+        client = FakeVersionsClient(make_versions(60))
+        progress = []
+
+        async def on_progress(p):
+            progress.append(p)
+
+        with patch("app.services.bulk_deploy.get_supabase", return_value=client):
+            result = await bulk_deploy.bulk_deploy_versions(
+                [v["id"] for v in client.versions],
+                on_progress=on_progress,
+                concurrency=5,
+                rate_per_minute=0,
+            )
+
+        assert result["deployed"] == 60 and result["failed"] == 0
+        assert client.selects == 1  # jeden prefetch dotaz na 100 verzí
+        assert [len(b) for b in client.rpc_batches] == [25, 25, 10]
+        assert client.updates == []
+        assert progress[-1]["done"] == 60
+        assert stub.peak_in_flight <= 5
+        assert result["results"]["version-0000"]["url"].startswith("https://webomat-firma-0-")
+
+    async def test_failures_reported_per_version(self, stub):
+        versions = make_versions(3)
+        versions[1]["html_content"] = None
+        client = FakeVersionsClient(versions, rpc_available=False)
+        stub.fail_next(400)
+
+        with patch("app.services.bulk_deploy.get_supabase", return_value=client):
+            result = await bulk_deploy.bulk_deploy_versions(
+                ["version-0000", "version-0001", "version-0002", "missing"],
+                concurrency=1,
+                rate_per_minute=0,
+            )
+
+        assert result["total"] == 4
+        assert result["deployed"] == 1 and result["failed"] == 3
+        assert "HTML" in result["results"]["version-0001"]["error"]
+        assert "not found" in result["results"]["missing"]["error"]
+        # Fallback bez migrace: selhání jedním IN updatem, úspěchy po řádcích
+        failed_ids, fields = client.updates[0]
+        assert sorted(failed_ids) == ["version-0000", "version-0001"]
+        assert fields == {"deployment_status": "failed"}
+        assert client.updates[1][0] == ["version-0002"]
+        assert client.updates[1][1]["deployment_status"] == "deployed"
+
+
+    async def test_failed_redeploy_keeps_live_version(self, stub):
+        versions = make_versions(1)
+        versions[0]["deployment_status"] = "deployed"
+        client = FakeVersionsClient(versions, rpc_available=False)
+        stub.fail_next(400)
+
+        with patch("app.services.bulk_deploy.get_supabase", return_value=client):
+            result = await bulk_deploy.bulk_deploy_versions(["version-0000"], rate_per_minute=0)
+
+        assert result["failed"] == 1
+        assert "error" in result["results"]["version-0000"]
+        # Původní nasazení dál běží - stav se nepřepisuje na failed
+        assert client.updates == []
+
+
+class TestRateLimiter:
+    """Testy RateLimiter."""
+
+    async def test_spaces_starts(self):
+        limiter = bulk_deploy.RateLimiter(rate_per_minute=1200)  # 50 ms
+        loop = asyncio.get_running_loop()
+        started = loop.time()
+
+        await asyncio.gather(*(limiter.acquire() for _ in range(4)))
+
+        assert loop.time() - started >= 0.14
+
+    def test_unknown_filter_rejected(self):
+        with pytest.raises(ValueError):
+            bulk_deploy.select_version_ids(FakeVersionsClient([]), {"html_content": "x"})
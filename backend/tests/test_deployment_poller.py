@@ -0,0 +1,202 @@
+"""
+Unit testy pro poller stavu nasazení (app/services/deployment_poller.py).
+
+Testuje:
+- Přechody readyState -> deployment_status
+- Souběžnou kontrolu proti lokální náhradě Vercel API a dávkový zápis
+- Chybějící migraci 013 (poll i zápis nasazení)
+- Plánování pollu jen při rozpracovaných nasazeních
+"""
+from unittest.mock import patch
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.services import deployment, deployment_poller
+from app.services.vercel_client import set_vercel_client
+from tests.conftest import MockSupabaseResponse, MockSupabaseRpc
+from tests.vercel_stub import VercelStub
+
+
+class FakePendingQuery:
+    """Query builder, který vrací čekající verze a zaznamenává zápisy."""
+
+    def __init__(self, client):
+        self.client = client
+        self.fields = None
+        self.ids = None
+
+    @property
+    def not_(self):
+        return self
+
+    def select(self, *args):
+        return self
+
+    def is_(self, *args):
+        return self
+
+    def or_(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, *args):
+        return self
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def in_(self, column, values):
+        if self.fields is not None:
+            self.ids = list(values)
+        return self
+
+    def eq(self, column, value):
+        self.ids = [value]
+        return self
+
+    def execute(self):
+        if self.fields is not None:
+            if self.client.missing_columns & set(self.fields):
+                raise APIError({"code": "PGRST204", "message": "column not found"})
+            self.client.updates.append((sorted(self.ids), self.fields))
+            return MockSupabaseResponse([])
+        if self.client.select_error:
+            raise APIError({"code": self.client.select_error, "message": "column does not exist"})
+        return MockSupabaseResponse(self.client.rows)
+
+
+class FakePendingClient:
+    def __init__(self, rows, rpc_available=True, select_error=None):
+        self.rows = rows
+        self.rpc_available = rpc_available
+        self.select_error = select_error
+        self.missing_columns = set()
+        self.updates = []
+        self.rpc_batches = []
+
+    def table(self, name):
+        return FakePendingQuery(self)
+
+    def rpc(self, fn, params):
+        if not self.rpc_available:
+            return MockSupabaseRpc(fn, {})
+        self.rpc_batches.append(params["p_updates"])
+        return MockSupabaseRpc(fn, {fn: len(params["p_updates"])})
+
+
+@pytest.fixture(autouse=True)
+def vercel_token(monkeypatch):
+    monkeypatch.setenv("VERCEL_TOKEN", "test-token")
+
+
+@pytest.fixture
+async def stub():
+    stub = VercelStub()
+    client = stub.client()
+    set_vercel_client(client)
+    yield stub
+    set_vercel_client(None)
+    await client.aclose()
+
+
+def add_deployment(stub, deployment_id, ready_state):
+    stub.deployments[deployment_id] = {"id": deployment_id, "url": "x.vercel.app", "readyState": ready_state}
+
+
+class TestStatusUpdate:
+    """Testy status_update."""
+
+    def test_transitions(self):
+        version = {"id": "v1"}
+
+        ready = deployment_poller.status_update(version, {"ready_state": "READY"}, "t")
+        error = deployment_poller.status_update(version, {"ready_state": "ERROR"}, "t")
+        building = deployment_poller.status_update(version, {"ready_state": "BUILDING"}, "t")
+        deleted = deployment_poller.status_update(version, None, "t")
+
+        assert ready["deployment_status"] == "deployed"
+        assert error["deployment_status"] == "failed"
+        assert "deployment_status" not in building
+        assert building["deployment_ready_state"] == "BUILDING"
+        assert deleted["deployment_status"] == "failed"
+
+
+class TestPollDeploymentStatuses:
+    """Testy poll_deployment_statuses."""
+
+    async def test_polls_and_batches(self, stub):
+        rows = []
+        for i, state in enumerate(["READY"] * 60 + ["BUILDING", "ERROR"]):
+            add_deployment(stub, f"dpl_{i}", state)
+            rows.append({"id": f"v{i}", "deployment_id": f"dpl_{i}", "deployment_status": "deployed"})
+        rows.append({"id": "gone", "deployment_id": "dpl_gone", "deployment_status": "deployed"})
+        client = FakePendingClient(rows)
+
+        with patch("app.services.deployment_poller.get_supabase", return_value=client):
+            stats = await deployment_poller.poll_deployment_statuses()
+
+        assert stats == {"checked": 63, "ready": 60, "failed": 2, "pending": 1, "errors": 0}
+        assert [len(b) for b in client.rpc_batches] == [50, 13]
+
+    async def test_fallback_groups_equal_updates(self, stub):
+        for i in range(3):
+            add_deployment(stub, f"dpl_{i}", "READY")
+        rows = [{"id": f"v{i}", "deployment_id": f"dpl_{i}"} for i in range(3)]
+        client = FakePendingClient(rows, rpc_available=False)
+
+        with patch("app.services.deployment_poller.get_supabase", return_value=client):
+            await deployment_poller.poll_deployment_statuses()
+
+        assert len(client.updates) == 1
+        ids, fields = client.updates[0]
+        assert ids == ["v0", "v1", "v2"]
+        assert fields["deployment_status"] == "deployed"
+
+    async def test_status_errors_counted(self, stub):
+        stub.fail_next(400)
+        client = FakePendingClient([{"id": "v1", "deployment_id": "dpl_1"}])
+
+        with patch("app.services.deployment_poller.get_supabase", return_value=client):
+            stats = await deployment_poller.poll_deployment_statuses()
+
+        assert stats["errors"] == 1
+        assert client.rpc_batches == []
+
+    async def test_missing_migration(self, stub):
+        client = FakePendingClient([], select_error="42703")
+
+        with patch("app.services.deployment_poller.get_supabase", return_value=client):
+            stats = await deployment_poller.poll_deployment_statuses()
+
+        assert stats["checked"] == 0
+
+
+class TestWithoutMigration013:
+    """Nasazení a plánování pollu bez sloupců z migrace 013."""
+
+    def test_deploy_update_drops_ready_state(self):
+        client = FakePendingClient([])
+        client.missing_columns = set(deployment.READY_STATE_COLUMNS)
+        fields = deployment.deployed_fields(
+            {"url": "https://x.vercel.app", "deployment_id": "dpl_1", "ready_state": "BUILDING"}
+        )
+
+        deployment.update_versions(client, ["v1"], fields)
+
+        assert len(client.updates) == 1
+        ids, written = client.updates[0]
+        assert ids == ["v1"]
+        assert written["deployment_status"] == "deployed"
+        assert "deployment_ready_state" not in written
+
+    def test_no_poll_without_pending_deployments(self):
+        with patch("app.services.deployment_poller.get_supabase", return_value=FakePendingClient([])):
+            assert deployment_poller.has_pending_deployments() is False
+
+        rows = [{"id": "v1", "deployment_id": "dpl_1"}]
+        with patch("app.services.deployment_poller.get_supabase", return_value=FakePendingClient(rows)):
+            assert deployment_poller.has_pending_deployments() is True
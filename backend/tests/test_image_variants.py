@@ -0,0 +1,43 @@
+"""
+Unit testy pro kompresi screenshotů (app/services/image_variants.py).
+"""
+import io
+
+from PIL import Image
+
+from app.services.image_variants import encode_variants, variant_widths
+
+
+def png(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), (30, 120, 200)).save(output, format="PNG")
+    return output.getvalue()
+
+
+class TestImageVariants:
+    """Testy variant."""
+
+    def test_widths_never_upscale(self):
+        assert variant_widths(1920) == [400, 800, 1200, 1920]
+        assert variant_widths(375) == [375]
+
+    def test_webp_variants_smaller_than_png(self):
+        source = png(1920, 3000)
+
+        variants = encode_variants(source, [800, 1920], formats=["webp"])
+
+        assert set(variants) == {("webp", 800), ("webp", 1920)}
+        assert Image.open(io.BytesIO(variants[("webp", 800)])).size == (800, 1250)
+        assert len(variants[("webp", 1920)]) < len(source)
+
+    def test_avif_optional(self):
+        variants = encode_variants(png(400, 300), [400], formats=["webp", "avif"])
+
+        assert ("webp", 400) in variants
+        if ("avif", 400) in variants:
+            assert Image.open(io.BytesIO(variants[("avif", 400)])).format == "AVIF"
+
+    def test_very_long_page_cut(self):
+        variants = encode_variants(png(375, 20000), [375], formats=["webp"])
+
+        assert Image.open(io.BytesIO(variants[("webp", 375)])).height == 16383
@@ -0,0 +1,42 @@
+"""
+Unit testy pro číslování vydaných faktur (app/services/invoice_numbers.py).
+
+Testuje:
+- Přidělení čísla přes SQL funkci next_invoice_number
+- Fallback bez migrace 016 (navazuje na nejvyšší vydané číslo, i pětimístné)
+"""
+from app.services.invoice_numbers import allocate_invoice_number, format_invoice_number
+from tests.conftest import MockSupabase
+
+
+class TestAllocateInvoiceNumber:
+    """Testy allocate_invoice_number."""
+
+    def test_uses_database_counter(self):
+        supabase = MockSupabase()
+        supabase.set_rpc_result("next_invoice_number", "2025-0042")
+
+        assert allocate_invoice_number(supabase, 2025) == "2025-0042"
+
+    def test_fallback_continues_after_last_number(self):
+        supabase = MockSupabase()
+        supabase.set_table_data("invoices_issued", [{"invoice_number": "2025-0041"}])
+
+        assert allocate_invoice_number(supabase, 2025) == "2025-0042"
+
+    def test_fallback_compares_numbers_not_text(self):
+        supabase = MockSupabase()
+        supabase.set_table_data("invoices_issued", [
+            {"invoice_number": "2025-9999"},
+            {"invoice_number": "2025-10000"},
+        ])
+
+        assert allocate_invoice_number(supabase, 2025) == "2025-10001"
+
+    def test_five_digit_format(self):
+        assert format_invoice_number(2025, 10000) == "2025-10000"
+
+    def test_fallback_first_number_of_year(self):
+        supabase = MockSupabase()
+
+        assert allocate_invoice_number(supabase, 2026) == "2026-0001"
@@ -0,0 +1,286 @@
+"""
+Unit testy pro hromadné generování PDF faktur (app/services/invoice_pdf_batch.py).
+
+Testuje:
+- Výběr faktur podle období, stavu a chybějícího PDF
+- Souběžný render, upload a zápis pdf_path s otiskem vstupů
+- Přeskočení faktur s aktuálním PDF
+- Chyby jednotlivých faktur nezastaví dávku
+- Endpoint jen spočítá faktury, job si je vybere sám podle filtru
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+
+from app.services import invoice_pdf_batch
+from app.services.pdf_executor import PdfRenderExecutor
+from tests.conftest import MockSupabaseResponse
+
+
+class FakeQuery:
+    """Query builder nad řádky v paměti (filtry eq/in_/gte/lte/is_)."""
+
+    def __init__(self, client, table):
+        self.client = client
+        self.table = table
+        self.filters = []
+        self.fields = None
+        self.count = None
+
+    def select(self, *args, count=None, **kwargs):
+        self.count = count
+        return self
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row.get(column) >= value)
+        return self
+
+    def lte(self, column, value):
+        self.filters.append(lambda row: row.get(column) <= value)
+        return self
+
+    def is_(self, column, value):
+        self.filters.append(lambda row: row.get(column) is None)
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def range(self, start, end):
+        return self
+
+    def limit(self, count):
+        return self
+
+    def execute(self):
+        rows = [
+            row for row in self.client.tables[self.table]
+            if all(f(row) for f in self.filters)
+        ]
+        if self.fields is not None:
+            for row in rows:
+                row.update(self.fields)
+            self.client.updates.append(self.table)
+        return MockSupabaseResponse(rows, len(rows) if self.count else None)
+
+
+class AsyncFakeQuery(FakeQuery):
+    async def execute(self):
+        return super().execute()
+
+
+class AsyncFakeClient:
+    """Async pohled na FakeClient (get_async_supabase)."""
+
+    def __init__(self, client):
+        self.client = client
+
+    def table(self, name):
+        return AsyncFakeQuery(self.client, name)
+
+
+class FakeBucket:
+    def __init__(self, client):
+        self.client = client
+
+    def upload(self, path, file, file_options):
+        self.client.uploads[path] = file
+
+    def get_public_url(self, path):
+        return f"https://storage.test/{path}"
+
+
+class FakeStorage:
+    def __init__(self, client):
+        self.client = client
+
+    def from_(self, bucket):
+        return FakeBucket(self.client)
+
+
+class FakeClient:
+    def __init__(self, invoices):
+        self.tables = {
+            "invoices_issued": invoices,
+            "businesses": [{"id": "biz-1", "name": "Firma s.r.o."}],
+            "website_projects": [],
+            "platform_settings": [{"key": "billing_info", "value": {"company_name": "Webomat"}}],
+        }
+        self.uploads = {}
+        self.updates = []
+        self.storage = FakeStorage(self)
+
+    def table(self, name):
+        return FakeQuery(self, name)
+
+
+def make_invoices(count, **fields):
+    return [
+        {
+            "id": f"inv-{i:03d}",
+            "invoice_number": f"2025-{i + 1:04d}",
+            "business_id": "biz-1",
+            "project_id": None,
+            "issue_date": "2025-01-31",
+            "status": "issued",
+            "pdf_path": None,
+            **fields,
+        }
+        for i in range(count)
+    ]
+
+
+def fake_render(invoice, business, platform_billing, project=None):
+    if invoice["invoice_number"] == "2025-0002":
+        raise RuntimeError("render failed")
+    return f"%PDF-{invoice['invoice_number']}".encode()
+
+
+@pytest.fixture
+def executor():
+    with patch("app.services.invoice_pdf_batch.get_pdf_executor", return_value=PdfRenderExecutor(workers=0)):
+        yield
+
+
+class TestSelectInvoices:
+    """Testy select_invoices."""
+
+    def test_filters_period_status_and_missing(self):
+        invoices = make_invoices(2) + [
+            {**make_invoices(1, issue_date="2025-02-01")[0], "id": "feb"},
+            {**make_invoices(1, status="cancelled")[0], "id": "cancelled"},
+            {**make_invoices(1, pdf_path="https://storage.test/x.pdf")[0], "id": "has-pdf"},
+        ]
+        client = FakeClient(invoices)
+
+        selected = invoice_pdf_batch.select_invoices(
+            client,
+            date_from="2025-01-01",
+            date_to="2025-01-31",
+            statuses=["issued", "paid"],
+            only_missing=True,
+        )
+
+        assert [i["id"] for i in selected] == ["inv-000", "inv-001"]
+
+
+class TestGenerateInvoicePdfs:
+    """Testy generate_invoice_pdfs."""
+
+    async def test_generates_uploads_and_links(self, executor):
+        client = FakeClient(make_invoices(30))
+        progress = []
+
+        async def on_progress(p):
+            progress.append(p)
+
+        with patch("app.services.invoice_pdf_batch.get_supabase", return_value=client), \
+             patch("app.services.invoice_pdf_batch.generate_invoice_issued_pdf", fake_render):
+            result = await invoice_pdf_batch.generate_invoice_pdfs(
+                client.tables["invoices_issued"], on_progress=on_progress
+            )
+
+        assert result["total"] == 30 and result["done"] == 30
+        assert result["generated"] == 29 and result["failed"] == 1
+        assert result["failures"] == [
+            {"invoice_id": "inv-001", "invoice_number": "2025-0002", "error": "render failed"}
+        ]
+        assert client.uploads["invoices/issued/2025/2025-0001.pdf"] == b"%PDF-2025-0001"
+        assert client.tables["invoices_issued"][0]["pdf_path"] == (
+            "https://storage.test/invoices/issued/2025/2025-0001.pdf"
+        )
+        assert client.tables["invoices_issued"][1]["pdf_path"] is None
+        assert client.tables["invoices_issued"][0]["pdf_fingerprint"]
+        assert progress == [{"total": 30, "done": 25, "generated": 24, "skipped": 0, "failed": 1}]
+
+    async def test_skips_unchanged_invoices(self, executor):
+        client = FakeClient(make_invoices(1))
+
+        with patch("app.services.invoice_pdf_batch.get_supabase", return_value=client), \
+             patch("app.services.invoice_pdf_batch.generate_invoice_issued_pdf", fake_render):
+            first = await invoice_pdf_batch.generate_invoice_pdfs(client.tables["invoices_issued"])
+            client.uploads.clear()
+            second = await invoice_pdf_batch.generate_invoice_pdfs(client.tables["invoices_issued"])
+            client.tables["businesses"][0]["name"] = "Nový název s.r.o."
+            third = await invoice_pdf_batch.generate_invoice_pdfs(client.tables["invoices_issued"])
+
+        assert first["generated"] == 1
+        assert second["skipped"] == 1 and second["generated"] == 0
+        assert third["generated"] == 1
+        assert list(client.uploads) == ["invoices/issued/2025/2025-0001.pdf"]
+
+    async def test_missing_business_fails_invoice(self, executor):
+        client = FakeClient(make_invoices(1, business_id="unknown"))
+
+        with patch("app.services.invoice_pdf_batch.get_supabase", return_value=client), \
+             patch("app.services.invoice_pdf_batch.generate_invoice_issued_pdf", fake_render):
+            result = await invoice_pdf_batch.generate_invoice_pdfs(client.tables["invoices_issued"])
+
+        assert result["failed"] == 1
+        assert "Business not found" in result["failures"][0]["error"]
+        assert client.uploads == {}
+
+
+class TestBatchJob:
+    """Testy endpointu a handleru generate_invoice_pdfs."""
+
+    @pytest.fixture
+    def admin(self):
+        from app.schemas.auth import User
+
+        return User(
+            id="123e4567-e89b-12d3-a456-426614174001",
+            email="admin@test.com",
+            first_name="Admin",
+            last_name="User",
+            role="admin",
+            is_active=True,
+            must_change_password=False,
+        )
+
+    async def test_endpoint_queues_filter_not_ids(self, admin):
+        from app.routers import crm
+        from app.schemas.crm import InvoicePdfBatchRequest
+
+        client = FakeClient(make_invoices(3) + make_invoices(1, status="cancelled"))
+        enqueue = AsyncMock(return_value="job-1")
+
+        with patch("app.services.jobs.enqueue_job", enqueue):
+            response = await crm.generate_invoice_pdfs_batch(
+                InvoicePdfBatchRequest(statuses=["issued"]),
+                current_user=admin,
+                db=AsyncFakeClient(client),
+            )
+
+        assert response["invoice_count"] == 3
+        payload = enqueue.await_args.kwargs["payload"]
+        assert payload["filter"] == {"statuses": ["issued"], "only_missing": True}
+        assert "invoice_ids" not in payload
+
+    async def test_handler_selects_invoices(self, executor):
+        from app.services.jobs import get_job_handler
+
+        client = FakeClient(make_invoices(3) + [
+            {**make_invoices(1, status="cancelled")[0], "id": "cancelled"},
+        ])
+        job = {"id": "job-1", "payload": {"filter": {"statuses": ["issued"], "only_missing": True}}}
+
+        with patch("app.services.jobs.get_supabase", return_value=client), \
+             patch("app.services.invoice_pdf_batch.get_supabase", return_value=client), \
+             patch("app.services.invoice_pdf_batch.generate_invoice_issued_pdf", fake_render):
+            result = await get_job_handler("generate_invoice_pdfs")(job)
+
+        assert result["total"] == 3
+        assert client.tables["invoices_issued"][3]["pdf_path"] is None
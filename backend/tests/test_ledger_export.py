@@ -0,0 +1,139 @@
+"""
+Unit testy pro streamovaný CSV export ledgeru (app/services/ledger_export.py).
+
+Testuje:
+- Keyset stránkování přes (created_at, id)
+- Průběžný zůstatek v jednom průchodu
+- Sloupce pro admin / sales export
+"""
+import csv
+import re
+from io import StringIO
+
+from app.services.ledger_export import apply_entry, iter_ledger_csv, iter_ledger_pages
+from app.utils.balance_calculator import calculate_seller_balance
+
+
+class FakeLedgerQuery:
+    """Query builder nad seznamem řádků, který opravdu filtruje."""
+    def __init__(self, client):
+        self.client = client
+        self.rows = list(client.rows)
+        self.limit_n = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r[column] == value]
+        return self
+
+    def gte(self, column, value):
+        self.rows = [r for r in self.rows if r[column] >= value]
+        return self
+
+    def or_(self, expr):
+        created_at, last_id = re.findall(r'"([^"]+)"', expr)[1:3]
+        self.rows = [r for r in self.rows if (r["created_at"], r["id"]) > (created_at, last_id)]
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        self.client.queries += 1
+        rows = sorted(self.rows, key=lambda r: (r["created_at"], r["id"]))[: self.limit_n]
+        return type("Response", (), {"data": rows})()
+
+
+class FakeLedgerClient:
+    def __init__(self, rows):
+        self.rows = rows
+        self.queries = 0
+
+    def table(self, name):
+        return FakeLedgerQuery(self)
+
+
+def make_entries(count, seller_id="seller-123"):
+    types = ["commission_earned", "commission_earned", "payout_reserved", "payout_paid", "admin_adjustment"]
+    return [
+        {
+            "id": f"entry-{i:05d}",
+            "seller_id": seller_id,
+            # Po dvou záznamech se stejným časem - test tie-breaku přes id
+            "created_at": f"2025-01-{1 + (i // 2) % 28:02d}T10:{(i // 56) % 60:02d}:00+00:00",
+            "entry_type": types[i % len(types)],
+            "amount": -200.0 if types[i % len(types)].startswith("payout") else 500.0,
+            "description": f"Položka {i}",
+            "related_invoice_id": None,
+            "related_project_id": None,
+        }
+        for i in range(count)
+    ]
+
+
+class TestLedgerPages:
+    """Testy keyset stránkování."""
+
+    def test_pages_cover_all_rows_once(self):
+        entries = make_entries(55)
+        client = FakeLedgerClient(entries)
+
+        pages = list(iter_ledger_pages(client, "seller-123", page_size=10))
+
+        ids = [r["id"] for page in pages for r in page]
+        assert sorted(ids) == sorted(e["id"] for e in entries)
+        assert len(ids) == len(set(ids))
+        assert [len(p) for p in pages] == [10, 10, 10, 10, 10, 5]
+
+    def test_exact_multiple_of_page_size(self):
+        client = FakeLedgerClient(make_entries(20))
+
+        pages = list(iter_ledger_pages(client, "seller-123", page_size=10))
+
+        assert [len(p) for p in pages] == [10, 10]
+        assert client.queries == 3
+
+    def test_other_seller_excluded(self):
+        client = FakeLedgerClient(make_entries(5) + make_entries(5, seller_id="seller-999"))
+
+        rows = [r for page in iter_ledger_pages(client, "seller-123") for r in page]
+
+        assert len(rows) == 5
+
+
+class TestLedgerCsv:
+    """Testy CSV exportu."""
+
+    def test_running_balance_matches_calculator(self):
+        """Zůstatek na posledním řádku odpovídá calculate_seller_balance."""
+        entries = make_entries(137)
+        client = FakeLedgerClient(entries)
+
+        text = "".join(iter_ledger_csv(client, "seller-123", include_references=True, page_size=25))
+        rows = list(csv.reader(StringIO(text)))
+
+        assert rows[0][-1] == "Zůstatek"
+        assert len(rows) == 138
+        expected = calculate_seller_balance(entries)["available_balance"]
+        assert float(rows[-1][-1]) == expected
+
+    def test_sales_export_without_balance(self):
+        client = FakeLedgerClient(make_entries(3))
+
+        text = "".join(iter_ledger_csv(client, "seller-123", include_balance=False))
+        rows = list(csv.reader(StringIO(text)))
+
+        assert rows[0] == ["Datum", "Typ", "Popis", "Částka", "Zůstatek"]
+        assert all(len(r) == 5 and r[-1] == "" for r in rows[1:])
+
+    def test_apply_entry_rules(self):
+        assert apply_entry(0, {"entry_type": "commission_earned", "amount": 100}) == 100
+        assert apply_entry(100, {"entry_type": "payout_reserved", "amount": -50}) == 100
+        assert apply_entry(100, {"entry_type": "payout_paid", "amount": -50}) == 50
+        assert apply_entry(50, {"entry_type": "admin_adjustment", "amount": -10}) == 40
@@ -0,0 +1,81 @@
+"""
+Unit testy pro QR platbu SPAYD (app/services/pdf.py).
+
+Testuje:
+- Sestavení SPAYD řetězce
+- Cache zakódovaných QR kódů (stejná platba se nekóduje znovu)
+- Výstup PNG i SVG
+- Validace PDF_QR_FORMAT v Settings
+"""
+import base64
+from unittest.mock import patch
+
+import pytest
+from pydantic import ValidationError
+
+from app.config import Settings
+from app.services import pdf
+
+pytestmark = pytest.mark.skipif(not pdf.QRCODE_AVAILABLE, reason="qrcode není nainstalován")
+
+IBAN = "CZ65 0800 0000 1920 0014 5399"
+
+
+@pytest.fixture(autouse=True)
+def clear_qr_cache(monkeypatch):
+    monkeypatch.setattr(pdf, "_qr_encoder", None)
+
+
+class TestSpayd:
+    """Testy build_spayd."""
+
+    def test_builds_spayd_string(self):
+        spayd = pdf.build_spayd(IBAN, 12100, "20250001", message="Faktura *2025-0001")
+
+        assert spayd == (
+            "SPD*1.0*ACC:CZ6508000000192000145399*AM:12100.00*CC:CZK"
+            "*X-VS:20250001*MSG:Faktura 2025-0001"
+        )
+
+
+class TestPaymentQr:
+    """Testy generate_payment_qr."""
+
+    def test_same_payment_encoded_once(self):
+        first = pdf.generate_payment_qr(IBAN, 12100, "20250001", image_format="png")
+        second = pdf.generate_payment_qr(IBAN, 12100, "20250001", image_format="png")
+        other = pdf.generate_payment_qr(IBAN, 12100, "20250002", image_format="png")
+
+        assert first == second != other
+        assert base64.b64decode(first).startswith(b"\x89PNG")
+        info = pdf.get_qr_encoder().cache_info()
+        assert info.hits == 1 and info.misses == 2
+
+    def test_svg_output(self):
+        qr = pdf.generate_payment_qr(IBAN, 12100, "20250001", image_format="svg")
+
+        assert b"<svg" in base64.b64decode(qr)
+
+    def test_unknown_format_returns_none(self):
+        assert pdf.generate_payment_qr(IBAN, 12100, "20250001", image_format="gif") is None
+
+
+class TestQrSettings:
+    """Testy nastavení PDF_QR_FORMAT."""
+
+    def test_invalid_format_rejected(self, monkeypatch):
+        monkeypatch.setenv("PDF_QR_FORMAT", "gif")
+
+        with pytest.raises(ValidationError):
+            Settings()
+
+    def test_cache_size_read_on_first_use(self):
+        settings = Settings().model_copy(update={"pdf_qr_cache_size": 2})
+
+        with patch("app.services.pdf.get_settings", return_value=settings):
+            assert pdf.get_qr_encoder().cache_info().maxsize == 2
+
+    def test_format_from_env(self, monkeypatch):
+        monkeypatch.setenv("PDF_QR_FORMAT", "svg")
+
+        assert Settings().pdf_qr_format == "svg"
@@ -0,0 +1,132 @@
+"""
+Unit testy pro PDF executor (app/services/pdf_executor.py).
+
+Testuje:
+- Render mimo event loop (vlákno i proces)
+- Omezení fronty a backpressure (PdfRenderQueueFull)
+- Výměna poolu po pádu workeru
+- Výchozí velikost poolu a fronty ze Settings
+"""
+import asyncio
+import os
+import time
+from concurrent.futures import Future
+from concurrent.futures.process import BrokenProcessPool
+from unittest.mock import patch
+
+import pytest
+
+from app.config import get_settings
+from app.services.pdf_executor import PdfRenderExecutor, PdfRenderQueueFull
+
+
+def slow_render(seconds: float) -> bytes:
+    time.sleep(seconds)
+    return b"%PDF-"
+
+
+class BrokenPool:
+    """Pool, jehož worker spadl - každý submit skončí BrokenProcessPool."""
+
+    def __init__(self):
+        self.shut_down = False
+        self.on_submit = None
+
+    def submit(self, fn, *args):
+        if self.on_submit:
+            self.on_submit()
+        future = Future()
+        future.set_exception(BrokenProcessPool("worker died"))
+        return future
+
+    def shutdown(self, wait=True, cancel_futures=False):
+        self.shut_down = True
+
+
+class TestPdfRenderExecutor:
+    """Testy PdfRenderExecutor."""
+
+    def test_defaults_from_settings(self):
+        settings = get_settings().model_copy(
+            update={"pdf_workers": 0, "pdf_max_queue": 3, "pdf_queue_timeout": 0.5}
+        )
+
+        with patch("app.services.pdf_executor.get_settings", return_value=settings):
+            executor = PdfRenderExecutor(max_queue=5)
+
+        assert executor.workers == 0
+        assert executor.max_queue == 5
+        assert executor.queue_timeout == 0.5
+
+    async def test_thread_mode_does_not_block_loop(self):
+        executor = PdfRenderExecutor(workers=0)
+        ticks = 0
+
+        async def ticker():
+            nonlocal ticks
+            while True:
+                await asyncio.sleep(0.01)
+                ticks += 1
+
+        task = asyncio.create_task(ticker())
+        result = await executor.submit(slow_render, 0.2)
+        task.cancel()
+
+        assert result == b"%PDF-"
+        assert ticks >= 5
+
+    async def test_queue_full_raises(self):
+        executor = PdfRenderExecutor(workers=0, max_queue=1, queue_timeout=0.05)
+
+        first = asyncio.create_task(executor.submit(slow_render, 0.3))
+        await asyncio.sleep(0.01)
+
+        with pytest.raises(PdfRenderQueueFull):
+            await executor.submit(slow_render, 0)
+
+        assert await first == b"%PDF-"
+        assert executor.in_flight == 0
+
+    async def test_waits_for_free_slot(self):
+        executor = PdfRenderExecutor(workers=0, max_queue=1, queue_timeout=2)
+
+        results = await asyncio.gather(
+            executor.submit(slow_render, 0.05),
+            executor.submit(slow_render, 0.05),
+        )
+
+        assert results == [b"%PDF-", b"%PDF-"]
+
+    async def test_process_pool(self):
+        executor = PdfRenderExecutor(workers=1)
+        try:
+            pid = await executor.submit(os.getpid)
+        finally:
+            executor.shutdown()
+
+        assert pid != os.getpid()
+
+    async def test_broken_pool_replaced(self):
+        executor = PdfRenderExecutor(workers=1)
+        broken = BrokenPool()
+        executor._pool = broken
+
+        with pytest.raises(RuntimeError, match="died"):
+            await executor.submit(os.getpid)
+
+        assert broken.shut_down
+        assert executor._pool is None
+
+    async def test_late_failure_keeps_fresh_pool(self):
+        executor = PdfRenderExecutor(workers=1)
+        broken = BrokenPool()
+        fresh = BrokenPool()
+        executor._pool = broken
+        # Another render already replaced the broken pool before this one fails
+        broken.on_submit = lambda: setattr(executor, "_pool", fresh)
+
+        with pytest.raises(RuntimeError, match="died"):
+            await executor.submit(os.getpid)
+
+        assert executor._pool is fresh
+        assert not fresh.shut_down
@@ -0,0 +1,203 @@
+"""
+Unit testy pro šablony faktur (app/services/pdf.py) bez WeasyPrint.
+
+Testuje:
+- Sdílené Jinja2 prostředí s bytecode cache
+- Předkompilované šablony faktur
+- CSS inline jen mimo PDF render (PDF dostává předparsovaný stylesheet)
+- Otisk vstupů PDF (pdf_fingerprint) a znovupoužití uloženého PDF
+- Stažení uloženého PDF bez migrace 015
+"""
+from unittest.mock import AsyncMock, patch
+
+import pytest
+from postgrest.exceptions import APIError
+
+from app.services import pdf
+from tests.conftest import CountingSupabase
+
+
+@pytest.fixture
+def fresh_env(monkeypatch, tmp_path):
+    monkeypatch.setattr(pdf, "_jinja_env", None)
+    monkeypatch.setattr(pdf, "TEMPLATE_CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+def issued_context():
+    return dict(
+        invoice={
+            "invoice_number": "2025-0001",
+            "issue_date": "2025-01-31",
+            "due_date": "2025-02-14",
+            "amount_without_vat": 10000,
+            "vat_rate": 21,
+            "vat_amount": 2100,
+            "amount_total": 12100,
+        },
+        business={"name": "Firma s.r.o."},
+        platform={},
+        project=None,
+        seller=None,
+        qr_code=None,
+    )
+
+
+def render_issued():
+    return pdf.get_jinja_env().get_template("invoices/invoice_issued.html").render(**issued_context())
+
+
+class TestJinjaEnv:
+    """Testy get_jinja_env."""
+
+    def test_env_is_shared(self, fresh_env):
+        assert pdf.get_jinja_env() is pdf.get_jinja_env()
+
+    def test_invoice_templates_precompiled(self, fresh_env):
+        env = pdf.get_jinja_env()
+
+        assert len(env.cache) == len(pdf.INVOICE_TEMPLATES)
+        # Bytecode pro další proces je uložený na disku
+        assert any(fresh_env.iterdir())
+
+    def test_renders_invoice(self, fresh_env):
+        html = render_issued()
+
+        assert "2025-0001" in html
+        assert "12 100,00" in html
+        assert "31.01.2025" in html
+
+    @pytest.mark.parametrize("template_name", pdf.INVOICE_TEMPLATES)
+    def test_css_not_inlined_for_pdf(self, fresh_env, template_name):
+        css_marker = "@page"
+        template = pdf.get_jinja_env().get_template(template_name)
+        context = issued_context()
+
+        assert css_marker in template.render(**context)
+        assert css_marker not in template.render(**context, inline_css=False)
+
+
+
+class FakeUpdate:
+    def __init__(self, client):
+        self.client = client
+
+    def update(self, fields):
+        self.fields = fields
+        return self
+
+    def eq(self, column, value):
+        return self
+
+    def execute(self):
+        if "pdf_fingerprint" in self.fields and not self.client.has_column:
+            raise APIError({"code": "PGRST204", "message": "column not found"})
+        self.client.updates.append(self.fields)
+
+
+class FakeClient:
+    def __init__(self, has_column=True):
+        self.has_column = has_column
+        self.updates = []
+
+    def table(self, name):
+        return FakeUpdate(self)
+
+
+class TestPdfFingerprint:
+    """Testy otisku vstupů PDF."""
+
+    def test_ignores_bookkeeping_fields(self):
+        context = issued_context()
+        fingerprint = pdf.invoice_issued_fingerprint(context["invoice"], context["business"], {})
+
+        invoice = {
+            **context["invoice"],
+            "updated_at": "2025-02-01T10:00:00",
+            "pdf_path": "https://storage.test/x.pdf",
+        }
+
+        assert pdf.invoice_issued_fingerprint(invoice, context["business"], {}) == fingerprint
+
+    def test_changes_with_printed_data(self):
+        context = issued_context()
+        fingerprint = pdf.invoice_issued_fingerprint(context["invoice"], context["business"], {})
+
+        assert pdf.invoice_issued_fingerprint(
+            {**context["invoice"], "amount_total": 12200}, context["business"], {}
+        ) != fingerprint
+        assert pdf.invoice_issued_fingerprint(
+            context["invoice"], context["business"], {"iban": "CZ6508000000192000145399"}
+        ) != fingerprint
+
+    def test_stored_pdf_url(self):
+        invoice = {"pdf_path": "https://storage.test/x.pdf", "pdf_fingerprint": "abc"}
+
+        assert pdf.stored_pdf_url(invoice, "abc") == "https://storage.test/x.pdf"
+        assert pdf.stored_pdf_url(invoice, "def") is None
+        assert pdf.stored_pdf_url({**invoice, "pdf_path": None}, "abc") is None
+
+    def test_save_without_migration(self):
+        client = FakeClient(has_column=False)
+
+        pdf.save_pdf_path(client, "invoices_issued", "inv-1", "https://storage.test/x.pdf", "abc")
+
+        assert client.updates[0]["pdf_path"] == "https://storage.test/x.pdf"
+        assert "pdf_fingerprint" not in client.updates[0]
+
+
+class TestDownloadWithoutMigration:
+    """Stažení PDF bez migrace 015 (sloupec pdf_fingerprint chybí)."""
+
+    @pytest.fixture
+    def admin(self):
+        from app.schemas.auth import User
+
+        return User(
+            id="123e4567-e89b-12d3-a456-426614174001",
+            email="admin@test.com",
+            first_name="Admin",
+            last_name="User",
+            role="admin",
+            is_active=True,
+            must_change_password=False,
+        )
+
+    async def test_redirects_to_stored_pdf(self, admin):
+        from app.routers import crm
+
+        client = CountingSupabase()
+        client.set_table_data("invoices_received", [
+            {"id": "inv-1", "seller_id": "seller-1", "pdf_path": "https://storage.test/x.pdf"},
+        ])
+
+        with patch("app.routers.crm.get_supabase", return_value=client), \
+             patch("app.services.pdf_executor.render_pdf") as render:
+            response = await crm.download_invoice_received_pdf("inv-1", current_user=admin)
+
+        assert response.status_code == 307
+        assert response.headers["location"] == "https://storage.test/x.pdf"
+        assert client.table_calls == {"invoices_received": 1}
+        render.assert_not_called()
+
+    async def test_stale_pdf_rendered_after_migration(self, admin):
+        from app.routers import crm
+
+        client = CountingSupabase()
+        client.set_table_data("invoices_received", [{
+            "id": "inv-1",
+            "seller_id": "seller-1",
+            "invoice_number": "FP-2025-001",
+            "issue_date": "2025-01-31",
+            "pdf_path": "https://storage.test/x.pdf",
+            "pdf_fingerprint": None,
+        }])
+        client.set_table_data("sellers", [{"id": "seller-1"}])
+
+        with patch("app.routers.crm.get_supabase", return_value=client), \
+             patch("app.services.pdf_executor.render_pdf", AsyncMock(return_value=b"%PDF")) as render, \
+             patch("app.services.pdf.upload_pdf_to_storage", AsyncMock(return_value=None)):
+            response = await crm.download_invoice_received_pdf("inv-1", current_user=admin)
+
+        render.assert_awaited_once()
+        assert response.body == b"%PDF"
@@ -0,0 +1,204 @@
+"""
+Unit testy pro screenshot pipeline verzí (app/services/screenshot.py).
+
+Testuje:
+- Jedno načtení stránky pro desktop, mobil i thumbnail
+- Thumbnail zmenšený z desktopového screenshotu
+- Souběžný upload a zápis URL do website_versions
+- Cache podle hashe HTML - shodná verze nespouští Chromium ani upload
+- WebP varianty v responzivních šířkách
+"""
+import io
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, patch
+
+from PIL import Image
+
+from app.services import screenshot
+from tests.conftest import MockSupabase, MockSupabaseQuery
+
+
+def png(width, height):
+    output = io.BytesIO()
+    Image.new("RGB", (width, height), "white").save(output, format="PNG")
+    return output.getvalue()
+
+
+class FakePage:
+    """Stránka, která vrací PNG o velikosti aktuálního viewportu (full page = 3x výška)."""
+    def __init__(self, viewport):
+        self.viewport = viewport
+        self.loads = 0
+
+    async def set_content(self, html, **kwargs):
+        self.loads += 1
+
+    async def goto(self, url, **kwargs):
+        self.loads += 1
+
+    async def set_viewport_size(self, viewport):
+        self.viewport = viewport
+
+    async def screenshot(self, **kwargs):
+        return png(self.viewport["width"], self.viewport["height"] * 3)
+
+
+class FakePool:
+    def __init__(self):
+        self.pages = []
+
+    @asynccontextmanager
+    async def page(self, viewport, device_scale_factor=1):
+        page = FakePage(viewport)
+        self.pages.append(page)
+        yield page
+
+
+class TestCaptureScreenshots:
+    """Testy vícenásobného capture z jednoho renderu."""
+
+    async def test_single_page_load(self):
+        pool = FakePool()
+
+        with patch("app.services.screenshot.get_browser_pool", return_value=pool), \
+                patch("app.services.screenshot.asyncio.sleep", new=AsyncMock()):
+            images = await screenshot.capture_screenshots(html_content="<html></html>")
+
+        assert len(pool.pages) == 1
+        assert pool.pages[0].loads == 1
+        assert Image.open(io.BytesIO(images["desktop"])).size == (1920, 3240)
+        assert Image.open(io.BytesIO(images["mobile"])).size == (375, 2436)
+        assert Image.open(io.BytesIO(images["thumbnail"])).size == (800, 600)
+
+    def test_thumbnail_of_short_page(self):
+        """Stránka nižší než poměr 4:3 se nepřeořezává."""
+        thumb = screenshot.make_thumbnail(png(1920, 500))
+
+        assert Image.open(io.BytesIO(thumb)).size == (800, 600)
+
+
+def version_images():
+    return {"desktop": png(1920, 1200), "mobile": png(375, 900), "thumbnail": png(800, 600)}
+
+
+class TestVersionScreenshots:
+    """Testy pro capture_and_upload_version_screenshots."""
+
+    async def test_uploads_variants_and_updates_version(self):
+        db = MockSupabase()
+        db.set_table_data("website_versions", [
+            {"id": "version-1", "version_number": 3, "html_content": "<html></html>", "public_url": None},
+        ])
+
+        with patch("app.services.screenshot.get_supabase", return_value=db), \
+                patch("app.services.screenshot.capture_screenshots", new=AsyncMock(return_value=version_images())):
+            result = await screenshot.capture_and_upload_version_screenshots("version-1")
+
+        bucket = db.storage.from_("webomat")
+        prefix = screenshot.screenshot_cache_prefix("<html></html>", "desktop")
+        assert result["screenshot_desktop_url"] == bucket.get_public_url(f"{prefix}/1920.webp")
+        assert set(result) == {"screenshot_desktop_url", "screenshot_mobile_url", "thumbnail_url"}
+        # desktop 400/800/1200/1920, mobile 375, thumbnail 400/800
+        assert len(bucket.uploads) == 7
+        assert all(path.endswith(".webp") for path in bucket.uploads)
+        # Primární varianta se nahrává poslední (značí kompletní sadu)
+        desktop_uploads = [p for p in bucket.uploads if p.startswith(prefix)]
+        assert desktop_uploads[-1] == f"{prefix}/1920.webp"
+
+    async def test_failed_upload_skipped(self):
+        db = MockSupabase()
+        db.set_table_data("website_versions", [
+            {"id": "version-1", "version_number": 1, "html_content": "<html></html>",
+             "screenshot_mobile_url": "https://old/mobile.webp",
+             "screenshot_images": {"mobile": {"webp": {"375": "https://old/mobile.webp"}}}},
+        ])
+        real_upload = screenshot.upload_screenshot
+
+        async def upload(data, filename, folder="screenshots", path=None, content_type="image/png"):
+            if path.startswith(screenshot.screenshot_cache_prefix("<html></html>", "mobile")):
+                raise RuntimeError("Failed to upload screenshot")
+            return await real_upload(data, filename, folder, path, content_type)
+
+        updates = []
+        real_update = MockSupabaseQuery.update
+
+        def record_update(query, data):
+            updates.append(data)
+            return real_update(query, data)
+
+        with patch("app.services.screenshot.get_supabase", return_value=db), \
+                patch("app.services.screenshot.capture_screenshots", new=AsyncMock(return_value=version_images())), \
+                patch("app.services.screenshot.upload_screenshot", new=upload), \
+                patch.object(MockSupabaseQuery, "update", record_update):
+            result = await screenshot.capture_and_upload_version_screenshots("version-1")
+
+        assert set(result) == {"screenshot_desktop_url", "thumbnail_url"}
+        # Mobil si ponechá starou URL i sadu variant
+        images = updates[0]["screenshot_images"]
+        assert images["mobile"] == {"webp": {"375": "https://old/mobile.webp"}}
+        assert set(images) == {"desktop", "mobile", "thumbnail"}
+
+
+class TestScreenshotCache:
+    """Testy content-hash cache."""
+
+    def test_prefix_depends_on_html_and_viewport(self):
+        html = "<html><body>A</body></html>"
+        prefix = screenshot.screenshot_cache_prefix
+
+        assert prefix(html, "desktop") == prefix(html, "desktop")
+        assert prefix(html, "desktop") != prefix(html, "mobile")
+        assert prefix(html, "desktop") != prefix(html + " ", "desktop")
+        assert prefix(html, "desktop").startswith("screenshots/cache/")
+
+    async def test_identical_html_reuses_files(self):
+        """Druhá verze se stejným HTML nepořizuje ani nenahrává screenshoty."""
+        db = MockSupabase()
+        html = "<html><body>Klon</body></html>"
+        db.set_table_data("website_versions", [
+            {"id": "version-2", "version_number": 2, "html_content": html, "public_url": None},
+        ])
+        capture = AsyncMock(return_value=version_images())
+
+        with patch("app.services.screenshot.get_supabase", return_value=db), \
+                patch("app.services.screenshot.capture_screenshots", new=capture):
+            first = await screenshot.capture_and_upload_version_screenshots("version-2")
+            second = await screenshot.capture_and_upload_version_screenshots("version-2")
+
+        bucket = db.storage.from_("webomat")
+        assert capture.await_count == 1
+        assert len(bucket.uploads) == 7
+        assert first == second
+
+    async def test_captures_html_not_live_url(self):
+        """Klíč cache je HTML, proto se snímá HTML i u nasazené verze."""
+        db = MockSupabase()
+        html = "<html><body>Nasazeno</body></html>"
+        db.set_table_data("website_versions", [
+            {"id": "version-1", "version_number": 1, "html_content": html,
+             "public_url": "https://web.example.cz"},
+        ])
+        capture = AsyncMock(return_value=version_images())
+
+        with patch("app.services.screenshot.get_supabase", return_value=db), \
+                patch("app.services.screenshot.capture_screenshots", new=capture):
+            await screenshot.capture_and_upload_version_screenshots("version-1")
+
+        capture.assert_awaited_once_with(html_content=html)
+
+    async def test_partial_cache_uploads_missing_only(self):
+        db = MockSupabase()
+        html = "<html></html>"
+        db.set_table_data("website_versions", [
+            {"id": "version-1", "version_number": 1, "html_content": html},
+        ])
+        bucket = db.storage.from_("webomat")
+        bucket.files[f"{screenshot.screenshot_cache_prefix(html, 'desktop')}/1920.webp"] = b"d"
+
+        with patch("app.services.screenshot.get_supabase", return_value=db), \
+                patch("app.services.screenshot.capture_screenshots", new=AsyncMock(return_value=version_images())):
+            result = await screenshot.capture_and_upload_version_screenshots("version-1")
+
+        assert len(result) == 3
+        assert not any(p.startswith(screenshot.screenshot_cache_prefix(html, "desktop")) for p in bucket.uploads)
+        assert len(bucket.uploads) == 3
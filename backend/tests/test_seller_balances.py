@@ -0,0 +1,124 @@
+"""
+Unit testy pro snapshot zůstatků obchodníků (app/services/balances.py).
+
+Testuje:
+- Čtení zůstatku z tabulky seller_balances jedním dotazem
+- Dopočet z ledgeru, když snapshot chybí
+- Rekonciliaci snapshotu proti ledgeru (job handler)
+"""
+from unittest.mock import patch
+
+from app.services.balances import (
+    get_seller_balance,
+    get_seller_balance_async,
+    reconcile_seller_balances,
+)
+from app.services.jobs import get_job_handler
+from tests.conftest import AsyncMockSupabase, CountingSupabase
+
+LEDGER = [
+    {"entry_type": "commission_earned", "amount": 3000.0},
+    {"entry_type": "payout_reserved", "amount": -1000.0},
+    {"entry_type": "payout_paid", "amount": -1000.0},
+    {"entry_type": "admin_adjustment", "amount": 250.0},
+]
+
+
+class TestGetSellerBalance:
+    """Testy čtení zůstatku."""
+
+    def test_reads_snapshot_row(self):
+        """Existující snapshot se čte bez dotazu na ledger."""
+        db = CountingSupabase()
+        db.set_table_data("seller_balances", [{
+            "seller_id": "seller-123",
+            "total_earned": "3000.00",
+            "total_paid_out": "1000.00",
+            "available_balance": "2250.00",
+            "pending_commissions": "1000.00",
+            "admin_adjustments": "250.00",
+        }])
+        db.set_table_data("ledger_entries", LEDGER)
+
+        balance = get_seller_balance(db, "seller-123")
+
+        assert balance["available_balance"] == 2250.0
+        assert balance["pending_commissions"] == 1000.0
+        assert "ledger_entries" not in db.table_calls
+
+    def test_missing_row_recomputes_from_ledger(self):
+        db = CountingSupabase()
+        db.set_table_data("ledger_entries", LEDGER)
+
+        balance = get_seller_balance(db, "seller-123")
+
+        assert balance == {
+            "total_earned": 3000.0,
+            "total_paid_out": 1000.0,
+            "available_balance": 2250.0,
+            "pending_commissions": 1000.0,
+            "admin_adjustments": 250.0,
+        }
+
+    async def test_async_variant(self):
+        db = CountingSupabase()
+        db.set_table_data("seller_balances", [{
+            "seller_id": "seller-123",
+            "total_earned": 500,
+            "total_paid_out": 0,
+            "available_balance": 500,
+            "pending_commissions": 0,
+            "admin_adjustments": 0,
+        }])
+
+        balance = await get_seller_balance_async(AsyncMockSupabase(db), "seller-123")
+
+        assert balance["available_balance"] == 500.0
+
+
+class TestReconcileSellerBalances:
+    """Testy rekonciliace."""
+
+    def test_reports_mismatches(self):
+        db = CountingSupabase()
+        db.set_rpc_result("reconcile_seller_balances", [
+            {"mismatch_seller_id": "seller-123", "stored_balance": "100.00", "actual_balance": "150.00"},
+        ])
+
+        mismatches = reconcile_seller_balances(db)
+
+        assert mismatches == [
+            {"seller_id": "seller-123", "stored_balance": 100.0, "actual_balance": 150.0}
+        ]
+
+    async def test_job_handler(self):
+        db = CountingSupabase()
+        db.set_rpc_result("reconcile_seller_balances", [])
+        handler = get_job_handler("reconcile_seller_balances")
+
+        with patch("app.services.jobs.get_supabase", return_value=db):
+            result = await handler({"payload": {}})
+
+        assert result == {"mismatch_count": 0, "mismatches": []}
+
+
+class TestClaimsUseSnapshot:
+    """GET /crm/seller/claims čte total_earned ze snapshotu."""
+
+    def test_claims_total_earned_from_snapshot(self, app_client, mock_supabase):
+        mock_supabase.set_table_data("seller_balances", [{
+            "seller_id": "seller-123",
+            "total_earned": 4000,
+            "total_paid_out": 0,
+            "available_balance": 4000,
+            "pending_commissions": 0,
+            "admin_adjustments": 0,
+        }])
+        mock_supabase.set_table_data("invoices_received", [{"amount_total": 1500}])
+
+        with patch("app.routers.crm.get_supabase", return_value=mock_supabase):
+            response = app_client.get("/crm/seller/claims")
+
+        assert response.status_code == 200
+        assert response.json()["total_earned"] == 4000
+        assert response.json()["available_to_claim"] == 2500
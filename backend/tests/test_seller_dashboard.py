@@ -251,6 +251,63 @@ class TestSellerDashboard:
         # recent_invoices jsou vráceny z invoices_received
 
 
+class TestSellerDashboardRpc:
+    """Dashboard přes SQL funkci get_seller_dashboard (migrace 006)."""
+
+    def test_dashboard_uses_rpc_result(self, app_client, mock_supabase):
+        """Výsledek SQL funkce se mapuje na SellerDashboard bez dotazů na tabulky."""
+        mock_supabase.set_rpc_result("get_seller_dashboard", {
+            "available_balance": 2500.0,
+            "pending_projects_amount": 15000.0,
+            "pending_projects": [{
+                "id": "project-abc",
+                "business_id": "business-789",
+                "business_name": "Testovací firma s.r.o.",
+                "status": "won",
+                "package": "start",
+                "latest_version_number": 3,
+                "latest_version_date": "2025-01-10T12:00:00+00:00",
+            }],
+            "unpaid_client_invoices": [{
+                "id": "invoice-1",
+                "business_id": "business-789",
+                "business_name": "Testovací firma s.r.o.",
+                "invoice_number": "2025001",
+                "amount_total": 12100.0,
+                "due_date": "2025-01-15",
+                "days_overdue": 5,
+            }],
+            "recent_invoices": [],
+            "total_leads": 1200,
+            "follow_ups_today": 7,
+        })
+        # Tabulky záměrně obsahují jiná data - nesmí se použít
+        mock_supabase.data_store["businesses"] = []
+
+        response = app_client.get("/crm/seller/dashboard")
+
+        assert response.status_code == 200
+        data = response.json()
+        assert data["available_balance"] == 2500.0
+        assert data["total_leads"] == 1200
+        assert data["follow_ups_today"] == 7
+        assert data["pending_projects"][0]["latest_version_number"] == 3
+        assert data["unpaid_client_invoices"][0]["days_overdue"] == 5
+        assert len(data["weekly_rewards"]) == 4
+
+    def test_dashboard_falls_back_without_function(
+        self, app_client, mock_supabase, sample_business
+    ):
+        """Bez SQL funkce (migrace neaplikována) dashboard skládá data z tabulek."""
+        sample_business["owner_seller_id"] = "seller-123"
+        mock_supabase.data_store["businesses"] = [sample_business]
+
+        response = app_client.get("/crm/seller/dashboard")
+
+        assert response.status_code == 200
+        assert response.json()["total_leads"] == 1
+
+
 class TestSellerDashboardSchema:
     """Testy pro SellerDashboard schema — ověření správných polí."""
 
@@ -0,0 +1,132 @@
+"""
+Unit testy pro sdílený lookup jmen obchodníků (app/services/sellers.py).
+
+Testuje:
+- Jeden dotaz na sellers pro celou stránku řádků
+- Cache mezi požadavky
+- Invalidaci cache po změně obchodníka
+- TTL cache ze Settings (SELLER_CACHE_TTL)
+"""
+import pytest
+from unittest.mock import patch
+
+from app.config import get_settings
+from app.services.sellers import (
+    get_seller_name,
+    get_seller_names,
+    get_seller_names_async,
+    get_sellers,
+    invalidate_seller_cache,
+)
+from tests.conftest import AsyncMockSupabase, CountingSupabase
+
+
+@pytest.fixture
+def sellers_db():
+    db = CountingSupabase()
+    db.set_table_data("sellers", [
+        {"id": "seller-1", "first_name": "Jan", "last_name": "Novák", "email": "jan@test.cz"},
+        {"id": "seller-2", "first_name": "Eva", "last_name": "Malá", "email": "eva@test.cz"},
+    ])
+    return db
+
+
+class TestSellerLookup:
+    """Testy pro dávkové načtení jmen."""
+
+    def test_one_query_for_many_ids(self, sellers_db):
+        """Duplicitní a prázdná ID se vyřeší jedním dotazem."""
+        names = get_seller_names(
+            sellers_db, ["seller-1", "seller-2", "seller-1", None, "seller-2"]
+        )
+
+        assert names == {"seller-1": "Jan Novák", "seller-2": "Eva Malá"}
+        assert sellers_db.table_calls["sellers"] == 1
+
+    def test_unknown_seller_is_none(self, sellers_db):
+        """Neexistující obchodník vrací None."""
+        assert get_seller_name(sellers_db, "seller-missing") is None
+        assert get_seller_name(sellers_db, None) is None
+
+    def test_cached_between_calls(self, sellers_db):
+        """Druhé volání nejde do databáze."""
+        get_seller_names(sellers_db, ["seller-1", "seller-2"])
+        get_seller_names(sellers_db, ["seller-1"])
+        assert get_seller_name(sellers_db, "seller-2") == "Eva Malá"
+
+        assert sellers_db.table_calls["sellers"] == 1
+
+    def test_zero_ttl_disables_cache(self, sellers_db):
+        """SELLER_CACHE_TTL=0 vypne cache."""
+        settings = get_settings().model_copy(update={"seller_cache_ttl": 0})
+
+        with patch("app.services.sellers.get_settings", return_value=settings):
+            get_seller_names(sellers_db, ["seller-1"])
+            get_seller_names(sellers_db, ["seller-1"])
+
+        assert sellers_db.table_calls["sellers"] == 2
+
+    def test_invalidate_refreshes_name(self, sellers_db):
+        """Po invalidaci se načte nové jméno."""
+        assert get_seller_name(sellers_db, "seller-1") == "Jan Novák"
+
+        sellers_db.set_table_data("sellers", [
+            {"id": "seller-1", "first_name": "Jan", "last_name": "Nový", "email": "jan@test.cz"},
+        ])
+        assert get_seller_name(sellers_db, "seller-1") == "Jan Novák"
+
+        invalidate_seller_cache("seller-1")
+        assert get_seller_name(sellers_db, "seller-1") == "Jan Nový"
+
+    def test_get_sellers_includes_email(self, sellers_db):
+        """Řádek obsahuje i email (faktury přijaté)."""
+        sellers = get_sellers(sellers_db, ["seller-2"])
+        assert sellers["seller-2"]["email"] == "eva@test.cz"
+
+    async def test_async_lookup_shares_cache(self, sellers_db):
+        """Async varianta používá stejnou cache."""
+        names = await get_seller_names_async(
+            AsyncMockSupabase(sellers_db), ["seller-1", "seller-2"]
+        )
+        assert names["seller-1"] == "Jan Novák"
+
+        get_seller_names(sellers_db, ["seller-1", "seller-2"])
+        assert "sellers" not in sellers_db.table_calls
+
+
+class TestListEndpointsBatch:
+    """Seznamové endpointy dělají jeden dotaz na sellers na stránku."""
+
+    def test_list_activities_single_sellers_query(
+        self, app_client, sample_business, sample_activity, sellers_db
+    ):
+        sellers_db.set_table_data("businesses", [sample_business])
+        sellers_db.set_table_data("crm_activities", [
+            {**sample_activity, "id": f"activity-{i}", "seller_id": f"seller-{i % 2 + 1}"}
+            for i in range(10)
+        ])
+
+        with patch("app.routers.crm.get_supabase", return_value=sellers_db):
+            response = app_client.get(
+                f"/crm/businesses/{sample_business['id']}/activities"
+            )
+
+        assert response.status_code == 200
+        assert {a["seller_name"] for a in response.json()} == {"Jan Novák", "Eva Malá"}
+        # Jeden dotaz pro vlastníka firmy (kontrola přístupu), jeden pro celou stránku aktivit
+        assert sellers_db.table_calls["sellers"] == 2
+
+    def test_admin_profile_change_invalidates(self, admin_client, sellers_db):
+        """Změna obchodníka adminem zneplatní cache."""
+        assert get_seller_name(sellers_db, "seller-1") == "Jan Novák"
+        sellers_db.set_table_data("sellers", [
+            {"id": "seller-1", "first_name": "Jan", "last_name": "Nový",
+             "email": "jan@test.cz", "is_active": True},
+        ])
+        sellers_db.set_table_data("ledger_entries", [])
+
+        with patch("app.routers.admin.get_supabase", return_value=sellers_db):
+            response = admin_client.post("/admin/users/seller-1/toggle-active")
+
+        assert response.status_code == 200
+        assert get_seller_name(sellers_db, "seller-1") == "Jan Nový"
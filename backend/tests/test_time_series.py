@@ -0,0 +1,121 @@
+"""
+Unit testy pro agregaci časových řad (app/services/time_series.py).
+
+Testuje:
+- Zarovnání bucketů (týden, měsíc, kvartál)
+- Doplnění prázdných bucketů nulami
+- Agregaci přes SQL funkci i fallback na jeden dotaz
+- Admin dashboard - 12 týdnů jedním dotazem
+"""
+import pytest
+from datetime import date
+from unittest.mock import patch
+
+from app.services.time_series import (
+    aggregate_buckets,
+    bucket_start,
+    last_buckets,
+    next_bucket_start,
+)
+from tests.conftest import CountingSupabase
+
+
+class TestBuckets:
+    """Testy zarovnání bucketů."""
+
+    def test_week_starts_on_monday(self):
+        assert bucket_start(date(2025, 3, 13), "week") == date(2025, 3, 10)
+
+    def test_month_and_quarter(self):
+        assert bucket_start(date(2025, 3, 13), "month") == date(2025, 3, 1)
+        assert bucket_start(date(2025, 5, 20), "quarter") == date(2025, 4, 1)
+
+    def test_next_bucket_crosses_year(self):
+        assert next_bucket_start(date(2024, 12, 1), "month") == date(2025, 1, 1)
+        assert next_bucket_start(date(2024, 10, 1), "quarter") == date(2025, 1, 1)
+
+    def test_last_buckets_range(self):
+        start, end = last_buckets(12, "week", date(2025, 3, 13))
+        assert start == date(2024, 12, 23)
+        assert end == date(2025, 3, 17)
+
+    def test_unknown_bucket(self):
+        with pytest.raises(ValueError):
+            aggregate_buckets(CountingSupabase(), "invoices_issued", "day",
+                              date(2025, 1, 1), date(2025, 2, 1))
+
+
+class TestAggregateBuckets:
+    """Testy agregace."""
+
+    def test_rpc_result_fills_gaps(self):
+        """Výsledek SQL funkce se doplní o prázdné týdny."""
+        db = CountingSupabase()
+        db.set_rpc_result("aggregate_time_buckets", [
+            {"bucket_start": "2025-01-13", "total": 12100, "row_count": 2},
+        ])
+
+        series = aggregate_buckets(
+            db, "invoices_issued", "week", date(2025, 1, 6), date(2025, 1, 27)
+        )
+
+        assert [b["bucket_start"] for b in series] == [
+            date(2025, 1, 6), date(2025, 1, 13), date(2025, 1, 20)
+        ]
+        assert [b["total"] for b in series] == [0.0, 12100.0, 0.0]
+        assert series[1]["count"] == 2
+        assert series[1]["bucket_end"] == date(2025, 1, 19)
+        assert db.table_calls == {}
+
+    def test_fallback_single_query(self):
+        """Bez SQL funkce se agreguje z jednoho dotazu na tabulku."""
+        db = CountingSupabase()
+        db.set_table_data("ledger_entries", [
+            {"created_at": "2025-01-02T10:00:00+00:00", "amount": 500},
+            {"created_at": "2025-01-30T10:00:00+00:00", "amount": 700},
+            {"created_at": "2025-03-03T10:00:00+00:00", "amount": 300},
+        ])
+
+        series = aggregate_buckets(
+            db, "ledger_entries", "month", date(2025, 1, 1), date(2025, 4, 1),
+            seller_id="seller-123", entry_types=["commission_earned"],
+        )
+
+        assert [b["total"] for b in series] == [1200.0, 0.0, 300.0]
+        assert [b["count"] for b in series] == [2, 0, 1]
+        assert db.table_calls["ledger_entries"] == 1
+
+    def test_quarter_buckets(self):
+        db = CountingSupabase()
+        db.set_table_data("invoices_issued", [
+            {"issue_date": "2025-02-10", "amount_total": 1000},
+            {"issue_date": "2025-08-10", "amount_total": 2000},
+        ])
+
+        series = aggregate_buckets(
+            db, "invoices_issued", "quarter", date(2025, 1, 1), date(2026, 1, 1)
+        )
+
+        assert [b["total"] for b in series] == [1000.0, 0.0, 2000.0, 0.0]
+
+
+class TestAdminDashboardStats:
+    """GET /admin/dashboard/stats - týdenní fakturace jedním dotazem."""
+
+    def test_weekly_invoices_one_query(self, admin_client):
+        db = CountingSupabase()
+        db.set_table_data("website_projects", [{"status": "won"}])
+        db.set_table_data("invoices_issued", [
+            {"issue_date": date.today().isoformat(), "amount_total": 12100},
+        ])
+
+        with patch("app.routers.admin.get_supabase", return_value=db):
+            response = admin_client.get("/admin/dashboard/stats")
+
+        assert response.status_code == 200
+        weeks = response.json()["weekly_invoices"]
+        assert len(weeks) == 12
+        assert weeks[-1]["total_amount"] == 12100
+        assert weeks[-1]["invoice_count"] == 1
+        assert weeks[0]["week_start"] < weeks[-1]["week_start"]
+        assert db.table_calls["invoices_issued"] == 1
@@ -0,0 +1,105 @@
+"""
+Unit testy pro cache uživatelského kontextu v autentizaci (app/dependencies.py).
+
+Testuje:
+- Opakovaná autentizace nečte tabulku sellers
+- Invalidaci po deaktivaci / změně profilu
+- Vypnutí cache přes TTL 0
+"""
+import pytest
+from fastapi import HTTPException
+from unittest.mock import patch
+
+from app.config import get_settings
+from app.dependencies import (
+    create_access_token,
+    get_current_user,
+    invalidate_user_cache,
+)
+from tests.conftest import CountingSupabase
+
+
+@pytest.fixture
+def auth_db(sample_seller):
+    db = CountingSupabase()
+    db.set_table_data("sellers", [sample_seller])
+    return db
+
+
+@pytest.fixture
+def token(sample_seller):
+    return create_access_token({"sub": sample_seller["id"], "role": "sales"})
+
+
+class TestUserContextCache:
+    """Testy pro get_current_user s cache."""
+
+    async def test_second_request_hits_cache(self, auth_db, token):
+        """Druhá autentizace už nejde do databáze."""
+        settings = get_settings()
+
+        with patch("app.dependencies.get_supabase", return_value=auth_db):
+            first = await get_current_user(token, settings)
+            second = await get_current_user(token, settings)
+
+        assert first.id == second.id == "seller-123"
+        assert auth_db.table_calls["sellers"] == 1
+
+    async def test_cached_user_is_copy(self, auth_db, token):
+        """Úprava vráceného uživatele nemění cache."""
+        settings = get_settings()
+
+        with patch("app.dependencies.get_supabase", return_value=auth_db):
+            user = await get_current_user(token, settings)
+            user.first_name = "Změněno"
+            again = await get_current_user(token, settings)
+
+        assert again.first_name == "Jan"
+
+    async def test_invalidate_after_deactivation(self, auth_db, token, sample_seller):
+        """Deaktivovaný uživatel je po invalidaci odmítnut."""
+        settings = get_settings()
+
+        with patch("app.dependencies.get_supabase", return_value=auth_db):
+            await get_current_user(token, settings)
+
+            auth_db.set_table_data("sellers", [{**sample_seller, "is_active": False}])
+            invalidate_user_cache(sample_seller["id"])
+
+            with pytest.raises(HTTPException) as exc:
+                await get_current_user(token, settings)
+
+        assert exc.value.status_code == 403
+
+    async def test_ttl_zero_disables_cache(self, auth_db, token):
+        """TTL 0 - každá autentizace čte z databáze."""
+        settings = get_settings().model_copy(update={"user_cache_ttl_seconds": 0})
+
+        with patch("app.dependencies.get_supabase", return_value=auth_db):
+            await get_current_user(token, settings)
+            await get_current_user(token, settings)
+
+        assert auth_db.table_calls["sellers"] == 2
+
+
+class TestInvalidationEndpoints:
+    """Endpointy měnící obchodníka zneplatní cache."""
+
+    async def test_toggle_active_invalidates(self, admin_client, sample_seller):
+        db = CountingSupabase()
+        db.set_table_data("sellers", [sample_seller])
+        db.set_table_data("ledger_entries", [])
+        settings = get_settings()
+        token = create_access_token({"sub": sample_seller["id"], "role": "sales"})
+
+        with patch("app.dependencies.get_supabase", return_value=db):
+            await get_current_user(token, settings)
+
+        with patch("app.routers.admin.get_supabase", return_value=db):
+            response = admin_client.post(f"/admin/users/{sample_seller['id']}/toggle-active")
+        assert response.status_code == 200
+
+        db.set_table_data("sellers", [{**sample_seller, "is_active": False}])
+        with patch("app.dependencies.get_supabase", return_value=db):
+            with pytest.raises(HTTPException):
+                await get_current_user(token, settings)
@@ -0,0 +1,186 @@
+"""
+Unit testy pro sdíleného Vercel klienta (app/services/vercel_client.py)
+a deployment službu proti lokální náhradě Vercel API.
+
+Testuje:
+- Retry na 429/5xx s respektováním Retry-After
+- Omezení souběžných požadavků
+- deploy/status/delete přes sdílený klient
+- Upload souborů podle SHA digestu a manifest nahraných souborů
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import deployment
+from app.services.deployment import UploadManifest, file_digest
+from app.services.vercel_client import retry_after_seconds, set_vercel_client
+from tests.vercel_stub import VercelStub
+
+
+@pytest.fixture(autouse=True)
+def vercel_token(monkeypatch):
+    monkeypatch.setenv("VERCEL_TOKEN", "test-token")
+
+
+@pytest.fixture(autouse=True)
+def upload_manifest(monkeypatch):
+    manifest = UploadManifest()
+    monkeypatch.setattr(deployment, "_upload_manifest", manifest)
+    return manifest
+
+
+@pytest.fixture
+async def stub():
+    stub = VercelStub()
+    client = stub.client()
+    set_vercel_client(client)
+    yield stub
+    set_vercel_client(None)
+    await client.aclose()
+
+
+class TestRetry:
+    """Testy retry a backoff."""
+
+    async def test_retries_429_then_succeeds(self, stub):
+        stub.fail_next(429, count=2, retry_after="0")
+
+        result = await deployment.deploy_html_to_vercel("abcdef123456", "<html></html>")
+
+        assert result["deployment_id"] == "dpl_1"
+        assert len(stub.requests) == 4  # upload + 2x 429 + deployment
+
+    async def test_gives_up_after_max_retries(self, stub):
+        stub.fail_next(503, count=10)
+
+        with pytest.raises(RuntimeError, match="503"):
+            await deployment.get_deployment_status("dpl_1")
+
+        assert len(stub.requests) == 5  # 1 + VERCEL_MAX_RETRIES
+
+    async def test_deployment_post_not_retried_on_5xx(self, stub):
+        # Soubor je už nahraný (manifest), další deploy pošle jen POST deploymentu
+        await deployment.deploy_html_to_vercel("abcdef123456", "<html></html>")
+        stub.requests.clear()
+        stub.fail_next(503)
+
+        with pytest.raises(RuntimeError, match="503"):
+            await deployment.deploy_html_to_vercel("abcdef123456", "<html></html>")
+
+        # Deployment mohl vzniknout - POST se neopakuje
+        assert stub.requests == [("POST", "/v13/deployments")]
+
+    async def test_file_upload_retried_on_5xx(self, stub):
+        stub.fail_next(502)
+
+        await deployment.upload_file(b"<html></html>")
+
+        assert stub.requests == [("POST", "/v2/files")] * 2
+
+    async def test_client_error_not_retried(self, stub):
+        stub.fail_next(400)
+
+        with pytest.raises(RuntimeError):
+            await deployment.get_deployment_status("dpl_1")
+
+        assert len(stub.requests) == 1
+
+    def test_retry_after_formats(self):
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": "7"})) == 7
+        assert retry_after_seconds(httpx.Response(429)) is None
+        past = "Wed, 21 Oct 2015 07:28:00 GMT"
+        assert retry_after_seconds(httpx.Response(429, headers={"Retry-After": past})) == 0
+
+
+class TestDeploymentService:
+    """deploy / status / delete přes sdílený klient."""
+
+    async def test_deploy_status_delete(self, stub):
+        created = await deployment.deploy_html_to_vercel("abcdef123456", "<html></html>", "Kavárna U Nás")
+        status = await deployment.get_deployment_status(created["deployment_id"])
+        deleted = await deployment.delete_deployment(created["deployment_id"])
+
+        assert created["url"].startswith("https://webomat-kavárna-u-nás-abcdef12")
+        assert status["ready_state"] == "BUILDING"
+        assert deleted is True
+        assert stub.deployments == {}
+
+    async def test_concurrency_bounded(self):
+        stub = VercelStub(latency=0.02)
+        client = stub.client(max_concurrency=3)
+        set_vercel_client(client)
+        try:
+            await asyncio.gather(*(
+                deployment.deploy_html_to_vercel(f"version-{i:04d}", "<html></html>")
+                for i in range(10)
+            ))
+        finally:
+            set_vercel_client(None)
+            await client.aclose()
+
+        assert len(stub.deployments) == 10
+        assert stub.peak_in_flight == 3
+
+
+def uploads(stub):
+    return [r for r in stub.requests if r == ("POST", "/v2/files")]
+
+
+class TestContentAddressedUpload:
+    """Upload podle digestu, přeskakování již nahraných souborů."""
+
+    async def test_redeploy_skips_uploaded_files(self, stub):
+        await deployment.deploy_html_to_vercel("abcdef123456", "<html>A</html>")
+        await deployment.deploy_html_to_vercel("abcdef123456", "<html>A</html>")
+
+        assert len(uploads(stub)) == 1
+        created = stub.deployments["dpl_2"]["files"]
+        assert created == [{"file": "index.html", "sha": file_digest(b"<html>A</html>"), "size": 14}]
+
+    async def test_multi_file_site_dedupes_content(self, stub):
+        logo = b"\x89PNG fake"
+        await deployment.deploy_files_to_vercel("abcdef123456", {
+            "index.html": "<html><link href=style.css></html>",
+            "style.css": "body { color: red }",
+            "img/logo.png": logo,
+            "img/logo-copy.png": logo,
+        })
+
+        assert len(uploads(stub)) == 3
+        assert stub.files[file_digest(logo)] == logo
+
+    async def test_stale_manifest_reuploads(self, stub, upload_manifest):
+        await deployment.deploy_html_to_vercel("abcdef123456", "<html>A</html>")
+        stub.files.clear()  # Vercel smazal nahrané soubory
+
+        result = await deployment.deploy_html_to_vercel("abcdef123456", "<html>A</html>")
+
+        assert result["deployment_id"] == "dpl_2"
+        assert len(uploads(stub)) == 2
+
+    async def test_index_html_required(self, stub):
+        with pytest.raises(ValueError):
+            await deployment.deploy_files_to_vercel("abcdef123456", {"style.css": "body {}"})
+
+
+class TestUploadManifest:
+    """Testy UploadManifest."""
+
+    def test_persists_and_expires(self, tmp_path):
+        path = str(tmp_path / "manifest.json")
+        manifest = UploadManifest(path)
+        manifest.add("aaa")
+        manifest.save()
+
+        assert UploadManifest(path).has("aaa")
+        assert not UploadManifest(path, ttl_seconds=0).has("aaa")
+
+    def test_bounded(self):
+        manifest = UploadManifest(max_entries=2)
+        for digest in ("a", "b", "c"):
+            manifest.add(digest)
+
+        assert not manifest.has("a")
+        assert manifest.has("b") and manifest.has("c")
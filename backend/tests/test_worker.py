@@ -0,0 +1,295 @@
+"""
+Unit testy pro background worker (worker.py) a dávkové claimování jobů.
+
+Testuje:
+- Claimování více jobů najednou (app/services/jobs.claim_jobs)
+- Souběžné zpracování v rámci limitů (celkový i per job type)
+- Heartbeat - prodloužení locked_until běžících jobů
+- Dokončení/selhání jen u jobu, který worker stále drží
+- Probuzení workeru přes LISTEN/NOTIFY
+- Plánování periodických jobů (schedule_loop)
+"""
+import asyncio
+import time
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, patch
+
+import worker
+from app.services.job_notify import JobNotifier
+from app.services.jobs import claim_jobs, claim_next_job, complete_job, extend_job_locks, fail_job
+from tests.conftest import CountingSupabase, MockSupabaseRpc
+
+
+class FakeJobsQuery:
+    """Query builder nad background_jobs, který zaznamenává update."""
+    def __init__(self, client):
+        self.client = client
+        self.rows = list(client.rows)
+        self.update_data = None
+        self.limit_n = None
+
+    def select(self, *args, **kwargs):
+        return self
+
+    def update(self, data):
+        self.update_data = data
+        return self
+
+    def in_(self, column, values):
+        self.rows = [r for r in self.rows if r[column] in values]
+        return self
+
+    def eq(self, column, value):
+        self.rows = [r for r in self.rows if r.get(column) == value]
+        return self
+
+    def lte(self, *args):
+        return self
+
+    def or_(self, *args):
+        return self
+
+    def order(self, *args, **kwargs):
+        return self
+
+    def limit(self, n):
+        self.limit_n = n
+        return self
+
+    def execute(self):
+        rows = self.rows[: self.limit_n]
+        if self.update_data is not None:
+            self.client.updates.append(self.update_data)
+            for row in rows:
+                row.update(self.update_data)
+        else:
+            self.client.selects += 1
+        return type("Response", (), {"data": [dict(r) for r in rows]})()
+
+
+class FakeJobsClient:
+    """background_jobs bez SQL funkce claim_jobs (fallback na select + update)."""
+    def __init__(self, rows):
+        self.rows = rows
+        self.selects = 0
+        self.updates = []
+
+    def table(self, name):
+        return FakeJobsQuery(self)
+
+    def rpc(self, fn, params=None):
+        return MockSupabaseRpc(fn, {})
+
+
+def make_job(job_id, job_type="screenshot_capture", attempts=0, status="pending"):
+    return {
+        "id": job_id,
+        "job_type": job_type,
+        "status": status,
+        "attempts": attempts,
+        "max_attempts": 3,
+        "payload": {},
+    }
+
+
+class TestClaimJobs:
+    """Testy pro claim_jobs."""
+
+    async def test_claims_batch_via_rpc(self):
+        """SQL funkce claim_jobs vrátí celou dávku jedním voláním."""
+        db = CountingSupabase()
+        db.set_rpc_result("claim_jobs", [make_job("job-1", status="processing", attempts=1)])
+
+        with patch("app.services.jobs.get_supabase", return_value=db):
+            job = await claim_next_job(["screenshot_capture"], "worker-1")
+
+        assert job["id"] == "job-1"
+        assert db.table_calls == {}
+
+    async def test_claims_batch_in_one_update(self):
+        db = FakeJobsClient([make_job(f"job-{i}") for i in range(5)])
+
+        with patch("app.services.jobs.get_supabase", return_value=db):
+            jobs = await claim_jobs(["screenshot_capture"], "worker-1", limit=3)
+
+        assert [j["id"] for j in jobs] == ["job-0", "job-1", "job-2"]
+        assert all(j["status"] == "processing" and j["attempts"] == 1 for j in jobs)
+        assert db.selects == 1
+        assert len(db.updates) == 1
+
+    async def test_skips_exhausted_jobs(self):
+        db = FakeJobsClient([make_job("job-1", attempts=3), make_job("job-2", attempts=1)])
+
+        with patch("app.services.jobs.get_supabase", return_value=db):
+            jobs = await claim_jobs(["screenshot_capture"], "worker-1", limit=5)
+
+        assert [j["id"] for j in jobs] == ["job-2"]
+        assert jobs[0]["attempts"] == 2
+        assert "started_at" not in db.updates[0]
+
+    async def test_extend_locks_only_own_jobs(self):
+        db = FakeJobsClient([
+            {**make_job("job-1", status="processing"), "worker_id": "worker-1"},
+            {**make_job("job-2", status="processing"), "worker_id": "worker-2"},
+        ])
+
+        with patch("app.services.jobs.get_supabase", return_value=db):
+            renewed = await extend_job_locks(["job-1", "job-2"], "worker-1")
+            assert await extend_job_locks([], "worker-1") == 0
+
+        assert renewed == 1
+        assert len(db.updates) == 1
+
+
+    async def test_stale_worker_cannot_finish_reclaimed_job(self):
+        db = FakeJobsClient([
+            {**make_job("job-1", status="processing", attempts=1), "worker_id": "worker-2"},
+        ])
+
+        with patch("app.services.jobs.get_supabase", return_value=db):
+            assert await complete_job("job-1", {"ok": True}, "worker-1") is False
+            await fail_job("job-1", "timeout", "worker-1")
+            assert await complete_job("job-1", {"ok": True}, "worker-2") is True
+
+        assert db.rows[0]["status"] == "completed"
+        assert "error_message" not in db.rows[0]
+
+
+class TestJobPool:
+    """Testy limitů souběžnosti."""
+
+    async def test_claim_groups_respect_type_limits(self):
+        pool = worker.JobPool(4, {"deploy_version": 1})
+        pool.running["job-1"] = ("deploy_version", None)
+
+        groups = pool.claim_groups(["screenshot_capture", "deploy_version", "send_notification"])
+
+        assert groups == [["deploy_version"], ["screenshot_capture", "send_notification"]]
+        assert pool.group_slots(["deploy_version"]) == 0
+        assert pool.group_slots(groups[1]) == 3
+
+    async def test_jobs_run_concurrently(self):
+        """Čtyři pomalé joby běží souběžně, ne za sebou."""
+        active = 0
+        peak = 0
+
+        async def slow_job(job):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.05)
+            active -= 1
+
+        pool = worker.JobPool(4)
+        with patch("worker.process_job", side_effect=slow_job):
+            for i in range(4):
+                pool.start(make_job(f"job-{i}"))
+            assert pool.free_slots() == 0
+            await pool.drain()
+
+        assert peak == 4
+        assert pool.running == {}
+
+    async def test_claim_into_pool_fills_free_slots(self):
+        pool = worker.JobPool(3, {"deploy_version": 1})
+        claimed = {
+            "deploy_version": [make_job("d-1", "deploy_version")],
+        }
+
+        async def fake_claim(job_types, worker_id, limit, lock_duration_minutes):
+            if job_types == ["deploy_version"]:
+                return claimed["deploy_version"][:limit]
+            return [make_job(f"s-{i}") for i in range(limit)]
+
+        with patch("worker.claim_jobs", side_effect=fake_claim), \
+                patch("worker.process_job", new=AsyncMock()):
+            count = await worker.claim_into_pool(pool)
+            claimed_ids = list(pool.running)
+            await pool.drain()
+
+        assert count == 3
+        assert claimed_ids == ["d-1", "s-0", "s-1"]
+
+
+class TestScheduleLoop:
+    """Testy schedule_loop."""
+
+    async def run_once(self, *args, **kwargs):
+        enqueue = AsyncMock(return_value="job-1")
+        with patch("worker.enqueue_job_if_idle", enqueue), \
+             patch("worker.asyncio.sleep", AsyncMock(side_effect=asyncio.CancelledError)):
+            try:
+                await worker.schedule_loop(*args, **kwargs)
+            except asyncio.CancelledError:
+                pass
+        return enqueue
+
+    async def test_enqueues_reconcile(self):
+        enqueue = await self.run_once("reconcile_seller_balances", 86400)
+
+        enqueue.assert_awaited_once_with("reconcile_seller_balances")
+
+    async def test_skips_when_condition_false(self):
+        enqueue = await self.run_once(
+            "poll_deployment_status", 60, when=AsyncMock(return_value=False)
+        )
+
+        enqueue.assert_not_awaited()
+
+
+class FakeListenConnection:
+    """psycopg2 spojení s frontou notifikací."""
+    def __init__(self, payloads, fail=False):
+        self.notifies = [SimpleNamespace(payload=p) for p in payloads]
+        self.fail = fail
+
+    def poll(self):
+        if self.fail:
+            raise OSError("connection lost")
+
+    def fileno(self):
+        return -1
+
+    def close(self):
+        pass
+
+
+class TestJobNotifier:
+    """Testy probuzení přes LISTEN/NOTIFY."""
+
+    async def test_without_dsn_polls_only(self):
+        notifier = JobNotifier(None, lambda job_type: None)
+
+        assert notifier.start() is False
+        assert notifier.active is False
+
+    async def test_notifications_call_back(self):
+        received = []
+        notifier = JobNotifier("postgresql://test", received.append)
+        notifier._conn = FakeListenConnection(["screenshot_capture", "deploy_version"])
+
+        notifier._on_readable()
+
+        assert received == ["screenshot_capture", "deploy_version"]
+
+    async def test_lost_connection_reconnects(self):
+        received = []
+        notifier = JobNotifier("postgresql://test", received.append, reconnect_delay=60)
+        notifier._loop = asyncio.get_running_loop()
+        notifier._conn = FakeListenConnection([], fail=True)
+
+        notifier._on_readable()
+
+        assert notifier.active is False
+        assert notifier._reconnect is not None
+        assert received == [""]
+        notifier.close()
+
+    async def test_wake_ends_wait_early(self):
+        pool = worker.JobPool(2)
+        asyncio.get_running_loop().call_later(0.01, pool.wake)
+
+        started = time.perf_counter()
+        await pool.wait(5)
+
+        assert time.perf_counter() - started < 1
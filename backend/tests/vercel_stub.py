@@ -0,0 +1,126 @@
+"""
+Lokální náhrada Vercel API pro testy a benchmarky deployment služby.
+
+V testech se připojuje přes httpx.ASGITransport (bez sítě). Lze ji spustit
+i jako server a nasměrovat na ni VERCEL_API_URL:
+
+    python -m tests.vercel_stub --port 54397
+    VERCEL_API_URL=http://127.0.0.1:54397 VERCEL_TOKEN=x python worker.py
+"""
+import argparse
+import asyncio
+import hashlib
+import itertools
+
+import httpx
+from fastapi import FastAPI, Request, Response
+from fastapi.responses import JSONResponse
+
+from app.services.vercel_client import VercelClient
+
+
+class VercelStub:
+    """Stav náhradního API + vkládání chyb (429/5xx s Retry-After)."""
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.deployments: dict[str, dict] = {}
+        self.files: dict[str, bytes] = {}
+        self.requests: list[tuple[str, str]] = []
+        self.failures: list[tuple[int, str | None]] = []
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._ids = itertools.count(1)
+        self.app = self._create_app()
+
+    def fail_next(self, status: int, count: int = 1, retry_after: str | None = None) -> None:
+        """Dalších `count` požadavků skončí se `status`."""
+        self.failures.extend([(status, retry_after)] * count)
+
+    def client(self, **kwargs) -> VercelClient:
+        """VercelClient napojený na tuto náhradu."""
+        kwargs.setdefault("backoff_base", 0.001)
+        return VercelClient(
+            base_url="http://vercel.test",
+            transport=httpx.ASGITransport(app=self.app),
+            **kwargs,
+        )
+
+    def _create_app(self) -> FastAPI:
+        app = FastAPI()
+
+        @app.middleware("http")
+        async def track(request: Request, call_next):
+            self.requests.append((request.method, request.url.path))
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+            try:
+                if self.latency:
+                    await asyncio.sleep(self.latency)
+                if self.failures:
+                    status, retry_after = self.failures.pop(0)
+                    headers = {"Retry-After": retry_after} if retry_after is not None else {}
+                    return JSONResponse({"error": {"code": "rate_limited"}}, status, headers=headers)
+                return await call_next(request)
+            finally:
+                self.in_flight -= 1
+
+        @app.post("/v2/files")
+        async def upload_file(request: Request):
+            data = await request.body()
+            digest = request.headers.get("x-vercel-digest")
+            if digest != hashlib.sha1(data).hexdigest():
+                return JSONResponse({"error": {"code": "invalid_digest"}}, 400)
+            self.files[digest] = data
+            return {"urls": []}
+
+        @app.post("/v13/deployments")
+        async def create_deployment(request: Request):
+            body = await request.json()
+            missing = [
+                f["sha"] for f in body.get("files", [])
+                if "sha" in f and f["sha"] not in self.files
+            ]
+            if missing:
+                return JSONResponse({"error": {"code": "missing_files", "missing": missing}}, 400)
+            deployment_id = f"dpl_{next(self._ids)}"
+            deployment = {
+                "id": deployment_id,
+                "name": body.get("name"),
+                "url": f"{body.get('name')}-{deployment_id}.vercel.app",
+                "readyState": "BUILDING",
+                "state": "BUILDING",
+                "createdAt": 1700000000000,
+                "files": body.get("files", []),
+            }
+            self.deployments[deployment_id] = deployment
+            return deployment
+
+        @app.get("/v13/deployments/{deployment_id}")
+        async def get_deployment(deployment_id: str):
+            deployment = self.deployments.get(deployment_id)
+            if not deployment:
+                return JSONResponse({"error": {"code": "not_found"}}, 404)
+            return deployment
+
+        @app.delete("/v13/deployments/{deployment_id}")
+        async def delete_deployment(deployment_id: str):
+            if self.deployments.pop(deployment_id, None) is None:
+                return JSONResponse({"error": {"code": "not_found"}}, 404)
+            return Response(status_code=200)
+
+        return app
+
+
+def main():
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description="Local stand-in Vercel API")
+    parser.add_argument("--port", type=int, default=54397)
+    parser.add_argument("--latency", type=float, default=0.0)
+    args = parser.parse_args()
+    uvicorn.run(VercelStub(latency=args.latency).app, host="127.0.0.1", port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -16,23 +16,58 @@ import sys
 import signal
 import uuid
 from datetime import datetime, UTC
+from typing import Awaitable, Callable
 
 # Add app to path
 sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
 
+from app.services.browser_pool import close_browser_pool
+from app.services.deployment import is_vercel_configured
+from app.services.deployment_poller import has_pending_deployments
+from app.services.job_notify import JobNotifier
+from app.services.pdf_executor import close_pdf_executor
+from app.services.vercel_client import close_vercel_client
 from app.services.jobs import (
-    claim_next_job,
+    claim_jobs,
     complete_job,
+    enqueue_job_if_idle,
+    extend_job_locks,
     fail_job,
     get_job_handler,
     get_queue_stats,
 )
 
 
+def parse_type_limits(value: str) -> dict[str, int]:
+    """Parse "deploy_version=2,screenshot_capture=1" into {job_type: limit}."""
+    limits = {}
+    for item in value.split(","):
+        if "=" not in item:
+            continue
+        job_type, limit = item.split("=", 1)
+        limits[job_type.strip()] = max(1, int(limit))
+    return limits
+
+
 # Worker configuration
 POLL_INTERVAL = int(os.getenv("WORKER_POLL_INTERVAL", "10"))  # seconds
 WORKER_ID = os.getenv("WORKER_ID", f"worker-{uuid.uuid4().hex[:8]}")
 MAX_CONSECUTIVE_ERRORS = int(os.getenv("WORKER_MAX_ERRORS", "10"))
+WORKER_CONCURRENCY = int(os.getenv("WORKER_CONCURRENCY", "4"))  # jobs running at once
+# Per-type caps within WORKER_CONCURRENCY (browsers are memory-heavy, Vercel is rate-limited)
+JOB_TYPE_CONCURRENCY = parse_type_limits(
+    os.getenv("WORKER_TYPE_CONCURRENCY", "screenshot_capture=2,deploy_version=2,undeploy_version=2,bulk_deploy=1,generate_invoice_pdfs=1")
+)
+# Poll interval while LISTEN/NOTIFY wakeups are active (safety net only)
+FALLBACK_POLL_INTERVAL = int(os.getenv("WORKER_FALLBACK_POLL_INTERVAL", "60"))  # seconds
+# Direct Postgres connection for LISTEN (session mode, not the transaction pooler)
+DATABASE_URL = os.getenv("DATABASE_URL")
+LOCK_DURATION_MINUTES = int(os.getenv("WORKER_LOCK_MINUTES", "5"))
+HEARTBEAT_INTERVAL = int(os.getenv("WORKER_HEARTBEAT_INTERVAL", "60"))  # seconds
+# How often to queue poll_deployment_status (0 = never)
+DEPLOYMENT_POLL_INTERVAL = int(os.getenv("DEPLOYMENT_POLL_INTERVAL", "60"))  # seconds
+# How often to queue reconcile_seller_balances (0 = never)
+RECONCILE_INTERVAL = int(os.getenv("RECONCILE_INTERVAL", "86400"))  # seconds
 
 # Job types this worker handles
 SUPPORTED_JOB_TYPES = [
@@ -42,6 +77,10 @@ SUPPORTED_JOB_TYPES = [
     "cleanup_expired_links",
     "generate_thumbnail",
     "send_notification",
+    "reconcile_seller_balances",
+    "bulk_deploy",
+    "poll_deployment_status",
+    "generate_invoice_pdfs",
 ]
 
 # Graceful shutdown flag
@@ -51,7 +90,7 @@ _shutdown_requested = False
 def handle_shutdown(signum, frame):
     """Handle shutdown signals."""
     global _shutdown_requested
-    print(f"\n[{datetime.now(UTC).isoformat()}] Shutdown signal received, finishing current job...")
+    print(f"\n[{datetime.now(UTC).isoformat()}] Shutdown signal received, finishing running jobs...")
     _shutdown_requested = True
 
 
@@ -64,23 +103,143 @@ async def process_job(job: dict) -> None:
     """
     job_id = job["id"]
     job_type = job["job_type"]
+    worker_id = job.get("worker_id")  # set by claim_jobs; guards against a reclaimed job
 
     print(f"[{datetime.now(UTC).isoformat()}] Processing job {job_id} ({job_type})")
 
     handler = get_job_handler(job_type)
     if not handler:
-        await fail_job(job_id, f"No handler registered for job type: {job_type}")
+        await fail_job(job_id, f"No handler registered for job type: {job_type}", worker_id)
         return
 
     try:
         result = await handler(job)
-        await complete_job(job_id, result)
+        await complete_job(job_id, result, worker_id)
         print(f"[{datetime.now(UTC).isoformat()}] Job {job_id} completed successfully")
 
     except Exception as e:
         error_message = f"{type(e).__name__}: {str(e)}"
         print(f"[{datetime.now(UTC).isoformat()}] Job {job_id} failed: {error_message}")
-        await fail_job(job_id, error_message)
+        await fail_job(job_id, error_message, worker_id)
+
+
+class JobPool:
+    """
+    Jobs running concurrently on this worker.
+
+    Capacity is WORKER_CONCURRENCY in total, and job types listed in
+    type_limits get at most that many of those slots.
+    """
+
+    def __init__(self, concurrency: int, type_limits: dict[str, int] | None = None):
+        self.concurrency = concurrency
+        self.type_limits = type_limits or {}
+        self.running: dict[str, tuple[str, asyncio.Task]] = {}
+        self._wakeup = asyncio.Event()
+
+    def free_slots(self, job_type: str | None = None) -> int:
+        """Free slots in total, or for one job type."""
+        free = self.concurrency - len(self.running)
+        if job_type in self.type_limits:
+            busy = sum(1 for t, _ in self.running.values() if t == job_type)
+            free = min(free, self.type_limits[job_type] - busy)
+        return max(free, 0)
+
+    def claim_groups(self, job_types: list[str]) -> list[list[str]]:
+        """
+        Split job_types into separately claimed groups.
+
+        Each capped type is its own group, so its limit can be passed to the
+        claim; all uncapped types share the last group.
+        """
+        groups = [[t] for t in job_types if t in self.type_limits]
+        uncapped = [t for t in job_types if t not in self.type_limits]
+        if uncapped:
+            groups.append(uncapped)
+        return groups
+
+    def group_slots(self, job_types: list[str]) -> int:
+        """Free slots for a claim group."""
+        if len(job_types) == 1:
+            return self.free_slots(job_types[0])
+        return self.free_slots()
+
+    def start(self, job: dict) -> None:
+        """Run a claimed job in the background."""
+        task = asyncio.create_task(process_job(job))
+        self.running[job["id"]] = (job["job_type"], task)
+        task.add_done_callback(lambda _: self._finished(job["id"]))
+
+    def _finished(self, job_id: str) -> None:
+        self.running.pop(job_id, None)
+        self.wake()
+
+    def wake(self) -> None:
+        """End the current wait() early."""
+        self._wakeup.set()
+
+    async def wait(self, timeout: float | None) -> None:
+        """Sleep until a running job finishes, wake() is called or the timeout passes."""
+        try:
+            await asyncio.wait_for(self._wakeup.wait(), timeout)
+        except asyncio.TimeoutError:
+            pass
+        self._wakeup.clear()
+
+    async def drain(self) -> None:
+        """Wait for all running jobs to finish."""
+        tasks = [task for _, task in self.running.values()]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+
+async def heartbeat_loop(pool: JobPool) -> None:
+    """Keep locked_until of running jobs in the future while they run."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        try:
+            await extend_job_locks(list(pool.running), WORKER_ID, LOCK_DURATION_MINUTES)
+        except Exception as e:
+            print(f"[{datetime.now(UTC).isoformat()}] Heartbeat failed: {type(e).__name__}: {e}")
+
+
+async def deployments_pending() -> bool:
+    """Only poll while something is still building: no empty job every interval."""
+    return is_vercel_configured() and await asyncio.to_thread(has_pending_deployments)
+
+
+async def schedule_loop(
+    job_type: str,
+    interval: int,
+    when: Callable[[], Awaitable[bool]] | None = None,
+) -> None:
+    """Queue job_type every interval seconds (one pending instance at a time across all workers)."""
+    while True:
+        try:
+            if when is None or await when():
+                await enqueue_job_if_idle(job_type)
+        except Exception as e:
+            print(f"[{datetime.now(UTC).isoformat()}] Scheduling {job_type} failed: {type(e).__name__}: {e}")
+        await asyncio.sleep(interval)
+
+
+async def claim_into_pool(pool: JobPool) -> int:
+    """Claim as many jobs as the pool has room for and start them."""
+    claimed = 0
+    for job_types in pool.claim_groups(SUPPORTED_JOB_TYPES):
+        limit = pool.group_slots(job_types)
+        if not limit:
+            continue
+        jobs = await claim_jobs(
+            job_types=job_types,
+            worker_id=WORKER_ID,
+            limit=limit,
+            lock_duration_minutes=LOCK_DURATION_MINUTES,
+        )
+        for job in jobs:
+            pool.start(job)
+        claimed += len(jobs)
+    return claimed
 
 
 async def worker_loop():
@@ -89,24 +248,46 @@ async def worker_loop():
 
     print(f"[{datetime.now(UTC).isoformat()}] Worker {WORKER_ID} starting")
     print(f"  Poll interval: {POLL_INTERVAL}s")
+    print(f"  Concurrency: {WORKER_CONCURRENCY} (per type: {JOB_TYPE_CONCURRENCY})")
     print(f"  Supported job types: {', '.join(SUPPORTED_JOB_TYPES)}")
-
+    print(f"  Balance reconciliation: {f'every {RECONCILE_INTERVAL}s' if RECONCILE_INTERVAL > 0 else 'off'}")
+
+    pool = JobPool(WORKER_CONCURRENCY, JOB_TYPE_CONCURRENCY)
+    heartbeat = asyncio.create_task(heartbeat_loop(pool))
+    schedulers = []
+    if DEPLOYMENT_POLL_INTERVAL > 0:
+        schedulers.append(asyncio.create_task(schedule_loop(
+            "poll_deployment_status", DEPLOYMENT_POLL_INTERVAL, when=deployments_pending
+        )))
+    if RECONCILE_INTERVAL > 0:
+        schedulers.append(asyncio.create_task(schedule_loop(
+            "reconcile_seller_balances", RECONCILE_INTERVAL
+        )))
+
+    def on_notify(job_type: str) -> None:
+        if not job_type or job_type in SUPPORTED_JOB_TYPES:
+            pool.wake()
+
+    notifier = JobNotifier(DATABASE_URL, on_notify)
+    if notifier.start():
+        print(f"  Listening for new jobs (fallback poll every {FALLBACK_POLL_INTERVAL}s)")
+    else:
+        print("  DATABASE_URL not set or unreachable - polling only")
     consecutive_errors = 0
 
     while not _shutdown_requested:
         try:
-            # Claim next job
-            job = await claim_next_job(
-                job_types=SUPPORTED_JOB_TYPES,
-                worker_id=WORKER_ID,
-            )
+            claimed = await claim_into_pool(pool)
 
-            if job:
+            if claimed:
                 consecutive_errors = 0
-                await process_job(job)
-            else:
-                # No jobs available, wait before polling again
-                await asyncio.sleep(POLL_INTERVAL)
+
+            if not pool.free_slots():
+                # Full, wait for a job to finish
+                await pool.wait(None)
+            elif not claimed:
+                # No jobs available, wait for a notification (or poll again)
+                await pool.wait(FALLBACK_POLL_INTERVAL if notifier.active else POLL_INTERVAL)
 
         except KeyboardInterrupt:
             _shutdown_requested = True
@@ -123,6 +304,15 @@ async def worker_loop():
             wait_time = min(POLL_INTERVAL * (2 ** consecutive_errors), 300)
             await asyncio.sleep(wait_time)
 
+    notifier.close()
+    await pool.drain()
+    heartbeat.cancel()
+    for scheduler in schedulers:
+        scheduler.cancel()
+    await close_browser_pool()
+    await close_vercel_client()
+    await close_pdf_executor()
+
     print(f"[{datetime.now(UTC).isoformat()}] Worker {WORKER_ID} stopped")
 
 
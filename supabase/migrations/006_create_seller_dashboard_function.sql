@@ -0,0 +1,156 @@
+-- Migration 006: Seller dashboard aggregate function
+-- Serves GET /crm/seller/dashboard in one round-trip instead of ~8 queries
+-- plus one website_versions query per pending project.
+
+-- Indexes backing the aggregates below
+CREATE INDEX IF NOT EXISTS idx_ledger_seller_type_amount
+    ON ledger_entries(seller_id, entry_type) INCLUDE (amount);
+
+CREATE INDEX IF NOT EXISTS idx_businesses_owner_follow_up
+    ON businesses(owner_seller_id, next_follow_up_at);
+
+CREATE INDEX IF NOT EXISTS idx_website_projects_seller_status
+    ON website_projects(seller_id, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_website_projects_business_status
+    ON website_projects(business_id, status, created_at DESC);
+
+CREATE INDEX IF NOT EXISTS idx_website_versions_project_number
+    ON website_versions(project_id, version_number DESC);
+
+CREATE INDEX IF NOT EXISTS idx_inv_issued_business_status_due
+    ON invoices_issued(business_id, status, due_date);
+
+CREATE INDEX IF NOT EXISTS idx_inv_received_seller_created
+    ON invoices_received(seller_id, created_at DESC);
+
+-- Function returning the whole dashboard as one JSON document.
+-- Businesses visible to a seller: owned by them or without an owner.
+CREATE OR REPLACE FUNCTION get_seller_dashboard(
+    p_seller_id UUID,
+    p_today DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_balance NUMERIC;
+    v_total_leads INTEGER;
+    v_follow_ups INTEGER;
+    v_pending_projects JSONB;
+    v_pending_amount NUMERIC;
+    v_unpaid_invoices JSONB;
+    v_recent_invoices JSONB;
+BEGIN
+    -- Balance: earned + admin adjustments - paid out (see utils/balance_calculator.py)
+    SELECT COALESCE(SUM(
+        CASE entry_type
+            WHEN 'commission_earned' THEN amount
+            WHEN 'admin_adjustment' THEN amount
+            WHEN 'payout_paid' THEN -ABS(amount)
+            ELSE 0
+        END
+    ), 0)
+    INTO v_balance
+    FROM ledger_entries
+    WHERE seller_id = p_seller_id;
+
+    -- Lead counts
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (
+            WHERE next_follow_up_at IS NOT NULL
+              AND next_follow_up_at < p_today + 1
+              AND status_crm NOT IN ('won', 'lost', 'dnc')
+        )
+    INTO v_total_leads, v_follow_ups
+    FROM businesses
+    WHERE owner_seller_id = p_seller_id OR owner_seller_id IS NULL;
+
+    -- 10 newest pending projects (own businesses or own deals) with latest version
+    WITH pending AS (
+        SELECT p.id, p.business_id, p.status, p.package, p.price_setup, p.created_at
+        FROM website_projects p
+        -- LEFT JOIN: own deals whose business is gone still count (as 'Neznámá firma')
+        LEFT JOIN businesses b ON b.id = p.business_id
+        WHERE p.status IN ('offer', 'won', 'in_production')
+          AND (
+              p.seller_id = p_seller_id
+              OR b.owner_seller_id = p_seller_id
+              OR (b.id IS NOT NULL AND b.owner_seller_id IS NULL)
+          )
+        ORDER BY p.created_at DESC
+        LIMIT 10
+    )
+    SELECT
+        COALESCE(jsonb_agg(jsonb_build_object(
+            'id', p.id,
+            'business_id', p.business_id,
+            'business_name', COALESCE(b.name, 'Neznámá firma'),
+            'status', p.status,
+            'package', COALESCE(p.package, 'start'),
+            'latest_version_number', v.version_number,
+            'latest_version_date', v.created_at
+        ) ORDER BY p.created_at DESC), '[]'::jsonb),
+        COALESCE(SUM(p.price_setup), 0)
+    INTO v_pending_projects, v_pending_amount
+    FROM pending p
+    LEFT JOIN businesses b ON b.id = p.business_id
+    LEFT JOIN LATERAL (
+        SELECT wv.version_number, wv.created_at
+        FROM website_versions wv
+        WHERE wv.project_id = p.id
+        ORDER BY wv.version_number DESC
+        LIMIT 1
+    ) v ON TRUE;
+
+    -- 10 unpaid client invoices by due date
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', i.id,
+        'business_id', i.business_id,
+        'business_name', COALESCE(i.business_name, 'Neznámá firma'),
+        'invoice_number', i.invoice_number,
+        'amount_total', i.amount_total,
+        'due_date', i.due_date,
+        'days_overdue', p_today - i.due_date
+    ) ORDER BY i.due_date), '[]'::jsonb)
+    INTO v_unpaid_invoices
+    FROM (
+        SELECT inv.id, inv.business_id, b.name AS business_name,
+               inv.invoice_number, inv.amount_total, inv.due_date
+        FROM invoices_issued inv
+        JOIN businesses b ON b.id = inv.business_id
+        WHERE inv.status IN ('issued', 'overdue')
+          AND (b.owner_seller_id = p_seller_id OR b.owner_seller_id IS NULL)
+        ORDER BY inv.due_date
+        LIMIT 10
+    ) i;
+
+    -- 5 most recent commission invoices from the seller
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', r.id,
+        'invoice_number', r.invoice_number,
+        'amount_total', r.amount_total,
+        'status', r.status,
+        'issue_date', r.issue_date
+    ) ORDER BY r.created_at DESC), '[]'::jsonb)
+    INTO v_recent_invoices
+    FROM (
+        SELECT id, invoice_number, amount_total, status, issue_date, created_at
+        FROM invoices_received
+        WHERE seller_id = p_seller_id
+        ORDER BY created_at DESC
+        LIMIT 5
+    ) r;
+
+    RETURN jsonb_build_object(
+        'available_balance', v_balance,
+        'pending_projects_amount', v_pending_amount,
+        'pending_projects', v_pending_projects,
+        'unpaid_client_invoices', v_unpaid_invoices,
+        'recent_invoices', v_recent_invoices,
+        'total_leads', v_total_leads,
+        'follow_ups_today', v_follow_ups
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION get_seller_dashboard IS 'Seller dashboard aggregates (balance, leads, pending projects, unpaid invoices) in one call';
@@ -0,0 +1,74 @@
+-- Migration 007: Bucketed time-series aggregation
+-- One GROUP BY date_trunc(...) query for dashboard charts instead of one
+-- query per week. Called from app/services/time_series.py.
+
+-- Indexes for the range scans below
+CREATE INDEX IF NOT EXISTS idx_inv_issued_issue_status
+    ON invoices_issued(issue_date, status) INCLUDE (amount_total);
+
+CREATE INDEX IF NOT EXISTS idx_ledger_seller_created
+    ON ledger_entries(seller_id, created_at) INCLUDE (entry_type, amount);
+
+-- Sums and counts rows of a whitelisted source table per week/month/quarter.
+-- Range is half-open: p_start <= date < p_end. Only non-empty buckets are
+-- returned; the caller fills the gaps.
+CREATE OR REPLACE FUNCTION aggregate_time_buckets(
+    p_source TEXT,
+    p_bucket TEXT,
+    p_start TIMESTAMP WITH TIME ZONE,
+    p_end TIMESTAMP WITH TIME ZONE,
+    p_seller_id UUID DEFAULT NULL,
+    p_statuses TEXT[] DEFAULT NULL,
+    p_entry_types TEXT[] DEFAULT NULL
+)
+RETURNS TABLE (
+    bucket_start DATE,
+    total NUMERIC,
+    row_count BIGINT
+) AS $$
+DECLARE
+    v_date_column TEXT;
+    v_amount_column TEXT;
+    v_sql TEXT;
+BEGIN
+    IF p_bucket NOT IN ('week', 'month', 'quarter') THEN
+        RAISE EXCEPTION 'Unsupported bucket: %', p_bucket;
+    END IF;
+
+    CASE p_source
+        WHEN 'invoices_issued' THEN
+            v_date_column := 'issue_date';
+            v_amount_column := 'amount_total';
+        WHEN 'ledger_entries' THEN
+            v_date_column := 'created_at';
+            v_amount_column := 'amount';
+        ELSE
+            RAISE EXCEPTION 'Unsupported source: %', p_source;
+    END CASE;
+
+    v_sql := format(
+        'SELECT date_trunc(%L, %I)::date, COALESCE(SUM(%I), 0)::numeric, COUNT(*)
+         FROM %I
+         WHERE %I >= $1 AND %I < $2',
+        p_bucket, v_date_column, v_amount_column,
+        p_source, v_date_column, v_date_column
+    );
+
+    IF p_seller_id IS NOT NULL THEN
+        v_sql := v_sql || ' AND seller_id = $3';
+    END IF;
+    IF p_statuses IS NOT NULL THEN
+        v_sql := v_sql || ' AND status = ANY($4)';
+    END IF;
+    IF p_entry_types IS NOT NULL THEN
+        v_sql := v_sql || ' AND entry_type = ANY($5)';
+    END IF;
+
+    v_sql := v_sql || ' GROUP BY 1 ORDER BY 1';
+
+    RETURN QUERY EXECUTE v_sql
+        USING p_start, p_end, p_seller_id, p_statuses, p_entry_types;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+COMMENT ON FUNCTION aggregate_time_buckets IS 'Sum/count of invoices_issued or ledger_entries per week, month or quarter';
@@ -0,0 +1,305 @@
+-- Migration 008: Per-seller balance snapshot
+-- seller_balances holds the totals calculate_seller_balance() derives from
+-- the full ledger. A trigger on ledger_entries keeps it current inside the
+-- same transaction as every ledger write; reconcile_seller_balances()
+-- compares it against a full recomputation.
+
+CREATE TABLE IF NOT EXISTS seller_balances (
+    seller_id UUID PRIMARY KEY REFERENCES sellers(id) ON DELETE CASCADE,
+    total_earned DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    total_paid_out DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    pending_commissions DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    admin_adjustments DECIMAL(12, 2) NOT NULL DEFAULT 0,
+    -- Same rule as utils/balance_calculator.py
+    available_balance DECIMAL(12, 2) GENERATED ALWAYS AS (
+        total_earned + admin_adjustments - total_paid_out
+    ) STORED,
+    entry_count INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Add (p_sign = 1) or remove (p_sign = -1) one ledger entry from the snapshot
+CREATE OR REPLACE FUNCTION seller_balance_apply(
+    p_seller_id UUID,
+    p_entry_type VARCHAR(50),
+    p_amount DECIMAL(12, 2),
+    p_sign INTEGER
+)
+RETURNS VOID AS $$
+BEGIN
+    INSERT INTO seller_balances AS sb (
+        seller_id, total_earned, total_paid_out,
+        pending_commissions, admin_adjustments, entry_count
+    )
+    VALUES (
+        p_seller_id,
+        CASE WHEN p_entry_type = 'commission_earned' THEN p_sign * p_amount ELSE 0 END,
+        CASE WHEN p_entry_type = 'payout_paid' THEN p_sign * ABS(p_amount) ELSE 0 END,
+        CASE WHEN p_entry_type = 'payout_reserved' THEN p_sign * ABS(p_amount) ELSE 0 END,
+        CASE WHEN p_entry_type = 'admin_adjustment' THEN p_sign * p_amount ELSE 0 END,
+        p_sign
+    )
+    ON CONFLICT (seller_id) DO UPDATE SET
+        total_earned = sb.total_earned + EXCLUDED.total_earned,
+        total_paid_out = sb.total_paid_out + EXCLUDED.total_paid_out,
+        pending_commissions = sb.pending_commissions + EXCLUDED.pending_commissions,
+        admin_adjustments = sb.admin_adjustments + EXCLUDED.admin_adjustments,
+        entry_count = sb.entry_count + EXCLUDED.entry_count,
+        updated_at = NOW();
+END;
+$$ LANGUAGE plpgsql;
+
+CREATE OR REPLACE FUNCTION update_seller_balance_on_ledger_change()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM seller_balance_apply(OLD.seller_id, OLD.entry_type, OLD.amount, -1);
+    END IF;
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM seller_balance_apply(NEW.seller_id, NEW.entry_type, NEW.amount, 1);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_ledger_entries_seller_balance ON ledger_entries;
+CREATE TRIGGER trigger_ledger_entries_seller_balance
+    AFTER INSERT OR UPDATE OF seller_id, entry_type, amount OR DELETE ON ledger_entries
+    FOR EACH ROW
+    EXECUTE FUNCTION update_seller_balance_on_ledger_change();
+
+-- Full recomputation from the ledger, per seller
+CREATE OR REPLACE VIEW seller_balances_actual AS
+SELECT
+    seller_id,
+    COALESCE(SUM(amount) FILTER (WHERE entry_type = 'commission_earned'), 0) AS total_earned,
+    COALESCE(SUM(ABS(amount)) FILTER (WHERE entry_type = 'payout_paid'), 0) AS total_paid_out,
+    COALESCE(SUM(ABS(amount)) FILTER (WHERE entry_type = 'payout_reserved'), 0) AS pending_commissions,
+    COALESCE(SUM(amount) FILTER (WHERE entry_type = 'admin_adjustment'), 0) AS admin_adjustments,
+    COUNT(*)::INTEGER AS entry_count
+FROM ledger_entries
+GROUP BY seller_id;
+
+-- Backfill
+INSERT INTO seller_balances (
+    seller_id, total_earned, total_paid_out,
+    pending_commissions, admin_adjustments, entry_count
+)
+SELECT seller_id, total_earned, total_paid_out,
+       pending_commissions, admin_adjustments, entry_count
+FROM seller_balances_actual
+ON CONFLICT (seller_id) DO UPDATE SET
+    total_earned = EXCLUDED.total_earned,
+    total_paid_out = EXCLUDED.total_paid_out,
+    pending_commissions = EXCLUDED.pending_commissions,
+    admin_adjustments = EXCLUDED.admin_adjustments,
+    entry_count = EXCLUDED.entry_count,
+    updated_at = NOW();
+
+-- Compare the snapshot with a full recomputation. Returns the sellers that
+-- drifted; with p_fix they are overwritten with the recomputed totals.
+CREATE OR REPLACE FUNCTION reconcile_seller_balances(p_fix BOOLEAN DEFAULT TRUE)
+RETURNS TABLE (
+    mismatch_seller_id UUID,
+    stored_balance DECIMAL(12, 2),
+    actual_balance DECIMAL(12, 2)
+) AS $$
+BEGIN
+    IF p_fix THEN
+        -- Block ledger triggers (ROW EXCLUSIVE) until commit and wait for
+        -- in-flight ones, so the totals below include every committed entry
+        -- and no concurrent increment is overwritten by the repair. A table
+        -- lock also covers sellers that do not have a balance row yet.
+        LOCK TABLE seller_balances IN SHARE ROW EXCLUSIVE MODE;
+    END IF;
+
+    CREATE TEMP TABLE IF NOT EXISTS _seller_balance_drift (
+        seller_id UUID,
+        total_earned DECIMAL(12, 2),
+        total_paid_out DECIMAL(12, 2),
+        pending_commissions DECIMAL(12, 2),
+        admin_adjustments DECIMAL(12, 2),
+        entry_count INTEGER,
+        stored_balance DECIMAL(12, 2)
+    ) ON COMMIT DROP;
+    TRUNCATE _seller_balance_drift;
+
+    INSERT INTO _seller_balance_drift
+    SELECT
+        COALESCE(a.seller_id, s.seller_id),
+        COALESCE(a.total_earned, 0),
+        COALESCE(a.total_paid_out, 0),
+        COALESCE(a.pending_commissions, 0),
+        COALESCE(a.admin_adjustments, 0),
+        COALESCE(a.entry_count, 0),
+        COALESCE(s.available_balance, 0)
+    FROM seller_balances_actual a
+    FULL OUTER JOIN seller_balances s ON s.seller_id = a.seller_id
+    WHERE s.seller_id IS NULL
+       OR a.seller_id IS NULL AND s.entry_count <> 0
+       OR (a.total_earned, a.total_paid_out, a.pending_commissions, a.admin_adjustments, a.entry_count)
+          IS DISTINCT FROM
+          (s.total_earned, s.total_paid_out, s.pending_commissions, s.admin_adjustments, s.entry_count)
+          AND a.seller_id IS NOT NULL;
+
+    IF p_fix THEN
+        INSERT INTO seller_balances AS sb (
+            seller_id, total_earned, total_paid_out,
+            pending_commissions, admin_adjustments, entry_count
+        )
+        SELECT d.seller_id, d.total_earned, d.total_paid_out,
+               d.pending_commissions, d.admin_adjustments, d.entry_count
+        FROM _seller_balance_drift d
+        ON CONFLICT (seller_id) DO UPDATE SET
+            total_earned = EXCLUDED.total_earned,
+            total_paid_out = EXCLUDED.total_paid_out,
+            pending_commissions = EXCLUDED.pending_commissions,
+            admin_adjustments = EXCLUDED.admin_adjustments,
+            entry_count = EXCLUDED.entry_count,
+            updated_at = NOW();
+    END IF;
+
+    RETURN QUERY
+    SELECT d.seller_id,
+           d.stored_balance,
+           d.total_earned + d.admin_adjustments - d.total_paid_out
+    FROM _seller_balance_drift d;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Dashboard reads the balance from the snapshot instead of summing the ledger
+CREATE OR REPLACE FUNCTION get_seller_dashboard(
+    p_seller_id UUID,
+    p_today DATE DEFAULT CURRENT_DATE
+)
+RETURNS JSONB AS $$
+DECLARE
+    v_balance NUMERIC;
+    v_total_leads INTEGER;
+    v_follow_ups INTEGER;
+    v_pending_projects JSONB;
+    v_pending_amount NUMERIC;
+    v_unpaid_invoices JSONB;
+    v_recent_invoices JSONB;
+BEGIN
+    -- Balance from the maintained snapshot (one row lookup)
+    SELECT COALESCE(
+        (SELECT available_balance FROM seller_balances WHERE seller_id = p_seller_id),
+        0
+    )
+    INTO v_balance;
+
+    -- Lead counts
+    SELECT
+        COUNT(*),
+        COUNT(*) FILTER (
+            WHERE next_follow_up_at IS NOT NULL
+              AND next_follow_up_at < p_today + 1
+              AND status_crm NOT IN ('won', 'lost', 'dnc')
+        )
+    INTO v_total_leads, v_follow_ups
+    FROM businesses
+    WHERE owner_seller_id = p_seller_id OR owner_seller_id IS NULL;
+
+    -- 10 newest pending projects (own businesses or own deals) with latest version
+    WITH pending AS (
+        SELECT p.id, p.business_id, p.status, p.package, p.price_setup, p.created_at
+        FROM website_projects p
+        -- LEFT JOIN: own deals whose business is gone still count (as 'Neznámá firma')
+        LEFT JOIN businesses b ON b.id = p.business_id
+        WHERE p.status IN ('offer', 'won', 'in_production')
+          AND (
+              p.seller_id = p_seller_id
+              OR b.owner_seller_id = p_seller_id
+              OR (b.id IS NOT NULL AND b.owner_seller_id IS NULL)
+          )
+        ORDER BY p.created_at DESC
+        LIMIT 10
+    )
+    SELECT
+        COALESCE(jsonb_agg(jsonb_build_object(
+            'id', p.id,
+            'business_id', p.business_id,
+            'business_name', COALESCE(b.name, 'Neznámá firma'),
+            'status', p.status,
+            'package', COALESCE(p.package, 'start'),
+            'latest_version_number', v.version_number,
+            'latest_version_date', v.created_at
+        ) ORDER BY p.created_at DESC), '[]'::jsonb),
+        COALESCE(SUM(p.price_setup), 0)
+    INTO v_pending_projects, v_pending_amount
+    FROM pending p
+    LEFT JOIN businesses b ON b.id = p.business_id
+    LEFT JOIN LATERAL (
+        SELECT wv.version_number, wv.created_at
+        FROM website_versions wv
+        WHERE wv.project_id = p.id
+        ORDER BY wv.version_number DESC
+        LIMIT 1
+    ) v ON TRUE;
+
+    -- 10 unpaid client invoices by due date
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', i.id,
+        'business_id', i.business_id,
+        'business_name', COALESCE(i.business_name, 'Neznámá firma'),
+        'invoice_number', i.invoice_number,
+        'amount_total', i.amount_total,
+        'due_date', i.due_date,
+        'days_overdue', p_today - i.due_date
+    ) ORDER BY i.due_date), '[]'::jsonb)
+    INTO v_unpaid_invoices
+    FROM (
+        SELECT inv.id, inv.business_id, b.name AS business_name,
+               inv.invoice_number, inv.amount_total, inv.due_date
+        FROM invoices_issued inv
+        JOIN businesses b ON b.id = inv.business_id
+        WHERE inv.status IN ('issued', 'overdue')
+          AND (b.owner_seller_id = p_seller_id OR b.owner_seller_id IS NULL)
+        ORDER BY inv.due_date
+        LIMIT 10
+    ) i;
+
+    -- 5 most recent commission invoices from the seller
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+        'id', r.id,
+        'invoice_number', r.invoice_number,
+        'amount_total', r.amount_total,
+        'status', r.status,
+        'issue_date', r.issue_date
+    ) ORDER BY r.created_at DESC), '[]'::jsonb)
+    INTO v_recent_invoices
+    FROM (
+        SELECT id, invoice_number, amount_total, status, issue_date, created_at
+        FROM invoices_received
+        WHERE seller_id = p_seller_id
+        ORDER BY created_at DESC
+        LIMIT 5
+    ) r;
+
+    RETURN jsonb_build_object(
+        'available_balance', v_balance,
+        'pending_projects_amount', v_pending_amount,
+        'pending_projects', v_pending_projects,
+        'unpaid_client_invoices', v_unpaid_invoices,
+        'recent_invoices', v_recent_invoices,
+        'total_leads', v_total_leads,
+        'follow_ups_today', v_follow_ups
+    );
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Allow the reconciliation job type
+ALTER TABLE background_jobs DROP CONSTRAINT IF EXISTS background_jobs_job_type_check;
+ALTER TABLE background_jobs ADD CONSTRAINT background_jobs_job_type_check CHECK (job_type IN (
+    'screenshot_capture',
+    'deploy_version',
+    'undeploy_version',
+    'generate_thumbnail',
+    'send_notification',
+    'cleanup_expired_links',
+    'reconcile_seller_balances'
+));
+
+COMMENT ON TABLE seller_balances IS 'Per-seller ledger totals, maintained by trigger on ledger_entries';
+COMMENT ON FUNCTION reconcile_seller_balances IS 'Verify seller_balances against a full ledger recomputation (and fix drift)';
@@ -0,0 +1,78 @@
+-- Migration 009: Batch job claiming
+-- claim_jobs() picks and claims up to p_limit jobs in one statement.
+-- FOR UPDATE SKIP LOCKED lets competing workers take different rows instead
+-- of colliding on the same one. Jobs left in 'processing' by a dead worker
+-- (lock expired, no heartbeat) are claimed again; if that was their last
+-- attempt they are marked failed instead of staying in 'processing'.
+-- complete_job()/fail_job() only update a job still held by their worker,
+-- so a stale worker cannot finish a job that was claimed again.
+
+CREATE OR REPLACE FUNCTION claim_jobs(
+    p_job_types VARCHAR(50)[],
+    p_worker_id VARCHAR(100),
+    p_limit INTEGER DEFAULT 1,
+    p_lock_duration INTERVAL DEFAULT INTERVAL '5 minutes'
+)
+RETURNS SETOF background_jobs AS $$
+BEGIN
+    -- Worker died on the last attempt: nothing left to retry
+    UPDATE background_jobs
+    SET status = 'failed',
+        error_message = 'Worker lock expired on the last attempt',
+        completed_at = NOW(),
+        locked_until = NULL,
+        updated_at = NOW()
+    WHERE job_type = ANY(p_job_types)
+      AND status = 'processing'
+      AND locked_until < NOW()
+      AND attempts >= max_attempts;
+
+    RETURN QUERY
+    WITH picked AS (
+        SELECT j.id
+        FROM background_jobs j
+        WHERE j.job_type = ANY(p_job_types)
+          AND j.attempts < j.max_attempts
+          AND (
+              (j.status = 'pending'
+               AND j.scheduled_for <= NOW()
+               AND (j.locked_until IS NULL OR j.locked_until < NOW()))
+              OR (j.status = 'processing' AND j.locked_until < NOW())
+          )
+        ORDER BY j.priority DESC, j.scheduled_for ASC
+        LIMIT GREATEST(p_limit, 0)
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE background_jobs b
+    SET status = 'processing',
+        worker_id = p_worker_id,
+        locked_until = NOW() + p_lock_duration,
+        started_at = COALESCE(b.started_at, NOW()),
+        attempts = b.attempts + 1,
+        updated_at = NOW()
+    FROM picked
+    WHERE b.id = picked.id
+    RETURNING b.*;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Single-job variant keeps its signature, implemented on top of claim_jobs
+CREATE OR REPLACE FUNCTION claim_next_job(
+    p_job_types VARCHAR(50)[],
+    p_worker_id VARCHAR(100),
+    p_lock_duration INTERVAL DEFAULT INTERVAL '5 minutes'
+)
+RETURNS TABLE (
+    job_id UUID,
+    job_type VARCHAR(50),
+    payload JSONB,
+    attempts INTEGER
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT c.id, c.job_type, c.payload, c.attempts
+    FROM claim_jobs(p_job_types, p_worker_id, 1, p_lock_duration) c;
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON FUNCTION claim_jobs IS 'Atomically claim up to p_limit jobs (SKIP LOCKED), including expired processing locks';
@@ -0,0 +1,23 @@
+-- Migration 010: Wake workers on new jobs
+-- Every insert of a job that is due now sends NOTIFY on the background_jobs
+-- channel (payload = job_type). Workers LISTEN on it and claim immediately;
+-- polling remains as a slow fallback.
+
+CREATE OR REPLACE FUNCTION notify_background_job()
+RETURNS TRIGGER AS $$
+BEGIN
+    IF NEW.status = 'pending' AND NEW.scheduled_for <= NOW() THEN
+        -- Identical notifications within one transaction are delivered once
+        PERFORM pg_notify('background_jobs', NEW.job_type);
+    END IF;
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS trigger_background_jobs_notify ON background_jobs;
+CREATE TRIGGER trigger_background_jobs_notify
+    AFTER INSERT ON background_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION notify_background_job();
+
+COMMENT ON FUNCTION notify_background_job IS 'NOTIFY background_jobs with the job_type of a newly inserted due job';
@@ -0,0 +1,10 @@
+-- Migration 011: Responsive screenshot variants
+-- Screenshots are stored as WebP (optionally AVIF) in several widths.
+-- screenshot_images holds every variant URL for srcset; the existing
+-- *_url columns keep pointing at the full-width primary variant.
+
+ALTER TABLE website_versions
+ADD COLUMN IF NOT EXISTS screenshot_images JSONB;
+
+COMMENT ON COLUMN website_versions.screenshot_images IS
+    'Screenshot variants: {"desktop"|"mobile"|"thumbnail": {"webp"|"avif": {"<width>": url}}}';
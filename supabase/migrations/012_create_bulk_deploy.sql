@@ -0,0 +1,47 @@
+-- Migration 012: Bulk deployments
+-- A bulk_deploy job deploys many website versions at once and writes the
+-- results back in batches through apply_version_deployments(): one UPDATE
+-- per batch instead of one per version.
+
+-- p_updates: [{"id": ..., "deployment_status": ..., "public_url": ..., ...}]
+-- Columns missing from an element keep their current value.
+CREATE OR REPLACE FUNCTION apply_version_deployments(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE website_versions wv SET
+        deployment_status = u.deployment_status,
+        public_url = COALESCE(u.public_url, wv.public_url),
+        deployment_id = COALESCE(u.deployment_id, wv.deployment_id),
+        deployment_platform = COALESCE(u.deployment_platform, wv.deployment_platform),
+        published_at = COALESCE(u.published_at, wv.published_at)
+    FROM jsonb_to_recordset(p_updates) AS u(
+        id UUID,
+        deployment_status VARCHAR(50),
+        public_url TEXT,
+        deployment_id TEXT,
+        deployment_platform VARCHAR(50),
+        published_at TIMESTAMP WITH TIME ZONE
+    )
+    WHERE wv.id = u.id;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Allow the bulk deploy job type
+ALTER TABLE background_jobs DROP CONSTRAINT IF EXISTS background_jobs_job_type_check;
+ALTER TABLE background_jobs ADD CONSTRAINT background_jobs_job_type_check CHECK (job_type IN (
+    'screenshot_capture',
+    'deploy_version',
+    'undeploy_version',
+    'generate_thumbnail',
+    'send_notification',
+    'cleanup_expired_links',
+    'reconcile_seller_balances',
+    'bulk_deploy'
+));
+
+COMMENT ON FUNCTION apply_version_deployments IS 'Write a batch of deployment results to website_versions';
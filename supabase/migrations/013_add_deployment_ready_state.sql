@@ -0,0 +1,73 @@
+-- Migration 013: Track Vercel deployment readiness
+-- Deployments are created in a BUILDING/QUEUED state. The
+-- poll_deployment_status job checks every version whose deployment is not
+-- yet in a final state and writes the results back in batches through
+-- apply_version_deployments().
+
+ALTER TABLE website_versions
+ADD COLUMN IF NOT EXISTS deployment_ready_state VARCHAR(20),
+ADD COLUMN IF NOT EXISTS deployment_checked_at TIMESTAMP WITH TIME ZONE;
+
+-- Versions the poller still has to check
+CREATE INDEX IF NOT EXISTS idx_website_versions_deployment_pending
+    ON website_versions(deployment_checked_at NULLS FIRST)
+    WHERE deployment_id IS NOT NULL
+      AND deployment_status IN ('deploying', 'deployed')
+      AND (deployment_ready_state IS NULL
+           OR deployment_ready_state NOT IN ('READY', 'ERROR', 'CANCELED'));
+
+-- Same as migration 012, plus the readiness columns
+CREATE OR REPLACE FUNCTION apply_version_deployments(p_updates JSONB)
+RETURNS INTEGER AS $$
+DECLARE
+    v_count INTEGER;
+BEGIN
+    UPDATE website_versions wv SET
+        deployment_status = COALESCE(u.deployment_status, wv.deployment_status),
+        public_url = COALESCE(u.public_url, wv.public_url),
+        deployment_id = COALESCE(u.deployment_id, wv.deployment_id),
+        deployment_platform = COALESCE(u.deployment_platform, wv.deployment_platform),
+        published_at = COALESCE(u.published_at, wv.published_at),
+        deployment_ready_state = COALESCE(u.deployment_ready_state, wv.deployment_ready_state),
+        deployment_checked_at = COALESCE(u.deployment_checked_at, wv.deployment_checked_at)
+    FROM jsonb_to_recordset(p_updates) AS u(
+        id UUID,
+        deployment_status VARCHAR(50),
+        public_url TEXT,
+        deployment_id TEXT,
+        deployment_platform VARCHAR(50),
+        published_at TIMESTAMP WITH TIME ZONE,
+        deployment_ready_state VARCHAR(20),
+        deployment_checked_at TIMESTAMP WITH TIME ZONE
+    )
+    WHERE wv.id = u.id;
+
+    GET DIAGNOSTICS v_count = ROW_COUNT;
+    RETURN v_count;
+END;
+$$ LANGUAGE plpgsql;
+
+-- Allow the poller job type
+ALTER TABLE background_jobs DROP CONSTRAINT IF EXISTS background_jobs_job_type_check;
+ALTER TABLE background_jobs ADD CONSTRAINT background_jobs_job_type_check CHECK (job_type IN (
+    'screenshot_capture',
+    'deploy_version',
+    'undeploy_version',
+    'generate_thumbnail',
+    'send_notification',
+    'cleanup_expired_links',
+    'reconcile_seller_balances',
+    'bulk_deploy',
+    'poll_deployment_status'
+));
+
+-- At most one queued or running periodic job per type, even if several
+-- workers schedule it at the same moment (enqueue_job_if_idle treats the
+-- conflict as "busy")
+CREATE UNIQUE INDEX IF NOT EXISTS idx_background_jobs_one_active_periodic
+ON background_jobs(job_type)
+WHERE job_type IN ('poll_deployment_status', 'reconcile_seller_balances')
+  AND status IN ('pending', 'processing');
+
+COMMENT ON COLUMN website_versions.deployment_ready_state IS 'Last Vercel readyState: QUEUED, BUILDING, INITIALIZING, READY, ERROR, CANCELED';
+COMMENT ON COLUMN website_versions.deployment_checked_at IS 'When deployment_ready_state was last fetched from Vercel';
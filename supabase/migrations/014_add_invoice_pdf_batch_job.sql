@@ -0,0 +1,23 @@
+-- Migration 014: Batch invoice PDF generation job
+-- Month-end close generates PDFs for all issued invoices of a period in one
+-- generate_invoice_pdfs job. The batch selects invoices by issue_date range
+-- (optionally only those without a PDF yet).
+
+CREATE INDEX IF NOT EXISTS idx_invoices_issued_issue_date ON invoices_issued(issue_date);
+
+-- Allow the batch job type
+ALTER TABLE background_jobs DROP CONSTRAINT IF EXISTS background_jobs_job_type_check;
+ALTER TABLE background_jobs ADD CONSTRAINT background_jobs_job_type_check CHECK (job_type IN (
+    'screenshot_capture',
+    'deploy_version',
+    'undeploy_version',
+    'generate_thumbnail',
+    'send_notification',
+    'cleanup_expired_links',
+    'reconcile_seller_balances',
+    'bulk_deploy',
+    'poll_deployment_status',
+    'generate_invoice_pdfs'
+));
+
+COMMENT ON INDEX idx_invoices_issued_issue_date IS 'Invoice selection by period (batch PDF generation)';
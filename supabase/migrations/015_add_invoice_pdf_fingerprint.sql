@@ -0,0 +1,14 @@
+-- Migration 015: Invoice PDF fingerprint
+-- A hash of the render inputs (invoice, client/seller, platform billing
+-- info, templates) is stored next to pdf_path. While it matches, the
+-- generate and download endpoints reuse the stored PDF instead of
+-- rendering and uploading it again.
+
+ALTER TABLE invoices_issued
+ADD COLUMN IF NOT EXISTS pdf_fingerprint VARCHAR(64);
+
+ALTER TABLE invoices_received
+ADD COLUMN IF NOT EXISTS pdf_fingerprint VARCHAR(64);
+
+COMMENT ON COLUMN invoices_issued.pdf_fingerprint IS 'SHA-256 of the inputs pdf_path was rendered from (NULL = placeholder or unknown)';
+COMMENT ON COLUMN invoices_received.pdf_fingerprint IS 'SHA-256 of the inputs pdf_path was rendered from (NULL = unknown)';
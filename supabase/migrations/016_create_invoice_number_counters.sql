@@ -0,0 +1,43 @@
+-- Migration 016: Atomic invoice number allocation
+-- Issued invoice numbers (YYYY-NNNN) come from a per-year counter row that
+-- next_invoice_number() increments with a single upsert. The row lock
+-- serialises concurrent callers, so parallel invoicing never hands out the
+-- same number and allocation does not scan invoices_issued.
+-- A number is consumed even if the invoice insert then fails.
+
+CREATE TABLE IF NOT EXISTS invoice_number_counters (
+    year INTEGER PRIMARY KEY,
+    last_number INTEGER NOT NULL DEFAULT 0,
+    updated_at TIMESTAMP WITH TIME ZONE DEFAULT NOW()
+);
+
+-- Continue after the numbers already issued
+INSERT INTO invoice_number_counters (year, last_number)
+SELECT
+    CAST(SPLIT_PART(invoice_number, '-', 1) AS INTEGER),
+    MAX(CAST(SPLIT_PART(invoice_number, '-', 2) AS INTEGER))
+FROM invoices_issued
+WHERE invoice_number ~ '^[0-9]{4}-[0-9]+$'
+GROUP BY 1
+ON CONFLICT (year) DO UPDATE
+SET last_number = GREATEST(invoice_number_counters.last_number, EXCLUDED.last_number);
+
+CREATE OR REPLACE FUNCTION next_invoice_number(p_year INTEGER)
+RETURNS TEXT AS $$
+DECLARE
+    v_number INTEGER;
+BEGIN
+    INSERT INTO invoice_number_counters (year, last_number)
+    VALUES (p_year, 1)
+    ON CONFLICT (year) DO UPDATE
+    SET last_number = invoice_number_counters.last_number + 1,
+        updated_at = NOW()
+    RETURNING last_number INTO v_number;
+
+    -- At least 4 digits; LPAD alone would truncate 10000 to 1000
+    RETURN p_year::TEXT || '-' || LPAD(v_number::TEXT, GREATEST(4, LENGTH(v_number::TEXT)), '0');
+END;
+$$ LANGUAGE plpgsql;
+
+COMMENT ON TABLE invoice_number_counters IS 'Last issued invoice number per year (next_invoice_number())';
+COMMENT ON FUNCTION next_invoice_number(INTEGER) IS 'Allocate the next YYYY-NNNN invoice number for a year';